@@ -0,0 +1,421 @@
+"""
+Vectorized backtester for harvest interval and fee tuning.
+
+Replays CRV/CVX emissions, token prices and gas prices for every vault of a
+fleet over a grid of harvest intervals x caller fees x platform fees. All
+grid points are simulated at once with NumPy: each array has shape
+(vaults, intervals, caller_fees, platform_fees).
+
+Fees follow `swapper._collect_fee` (platform and caller fees are both taken
+from the gross crvUSD amount, rounded down in wei) and harvested profit is
+streamed to depositors with the locked share accounting of `erc4626`.
+
+Usage:
+    python -m script.backtest --data fleet.npz
+    python -m script.backtest --demo
+"""
+
+import argparse
+import time
+from dataclasses import dataclass
+
+import numpy as np
+from tabulate import tabulate
+
+DECIMALS = 10_000
+WAD = 10**18
+DAY = 86_400
+YEAR = 365 * DAY
+DEFAULT_PROFIT_MAX_UNLOCK_TIME = 7 * DAY
+# erc4626.MAX_BPS_EXTENDED, scale of profit_unlocking_rate
+MAX_BPS_EXTENDED = 10**12
+
+
+def collect_fees(gross, platform_fee, caller_fee):
+    """
+    Split a gross crvUSD amount (wei) like `swapper._collect_fee`: both fees
+    are computed on the gross amount and rounded down
+    @return platform fee, caller fee, amount compounded
+    """
+    platform = np.floor(gross * platform_fee / DECIMALS)
+    caller = np.floor(gross * caller_fee / DECIMALS)
+    return platform, caller, gross - platform - caller
+
+
+class ProfitStreaming:
+    """
+    Vectorized replica of the erc4626 profit streaming state. Every
+    attribute is an array broadcast over the simulated grid; amounts are in
+    wei (float64).
+    """
+
+    def __init__(self, assets, shares, profit_max_unlock_time):
+        shape = np.broadcast_shapes(
+            np.shape(assets),
+            np.shape(shares),
+            np.shape(profit_max_unlock_time),
+        )
+        self.total_assets = np.broadcast_to(assets, shape).astype(float)
+        self.total_supply = np.broadcast_to(shares, shape).astype(float)
+        self.profit_max_unlock_time = np.broadcast_to(
+            profit_max_unlock_time, shape
+        ).astype(float)
+        # shares owned by the vault (locked and not yet burned)
+        self.vault_shares = np.zeros(shape)
+        self.profit_unlocking_rate = np.zeros(shape)
+        self.full_profit_unlock_date = np.zeros(shape)
+        self.last_profit_update = np.zeros(shape)
+
+    def unlocked_shares(self, now):
+        """erc4626._unlocked_shares"""
+        unlocking = self.full_profit_unlock_date > now
+        return np.where(
+            unlocking,
+            np.floor(
+                self.profit_unlocking_rate
+                * (now - self.last_profit_update)
+                / MAX_BPS_EXTENDED
+            ),
+            np.where(self.full_profit_unlock_date != 0, self.vault_shares, 0),
+        )
+
+    def effective_supply(self, now):
+        """erc4626._total_supply"""
+        return self.total_supply - self.unlocked_shares(now)
+
+    def price_per_share(self, now):
+        return self.total_assets / np.maximum(self.effective_supply(now), 1)
+
+    def deposit(self, assets, now, mask=True):
+        """erc4626 deposit, returns the shares minted where `mask` is set"""
+        assets = np.where(mask, assets, 0)
+        shares = np.floor(
+            assets * (self.effective_supply(now) + 1) / (self.total_assets + 1)
+        )
+        self.total_supply = self.total_supply + shares
+        self.total_assets = self.total_assets + assets
+        return shares
+
+    def redeem(self, shares, now, mask=True):
+        """erc4626 redeem, returns the assets paid where `mask` is set"""
+        shares = np.where(mask, shares, 0)
+        assets = np.floor(
+            shares * (self.total_assets + 1) / (self.effective_supply(now) + 1)
+        )
+        self.total_supply = self.total_supply - shares
+        self.total_assets = self.total_assets - assets
+        return assets
+
+    def process_profit(self, profit, now, mask=True):
+        """
+        erc4626._process_profit_streaming followed by the profit being added
+        to total assets, applied where `mask` is set
+        """
+        profit = np.where(mask, profit, 0)
+        streaming = (profit > 0) & (self.profit_max_unlock_time > 0)
+
+        unlocked = self.unlocked_shares(now)
+        shares_to_lock = np.where(
+            streaming,
+            np.floor(
+                profit
+                * (self.total_supply - unlocked + 1)
+                / (self.total_assets + 1)
+            ),
+            0,
+        )
+        streaming &= shares_to_lock > 0
+
+        ending_supply = self.total_supply + shares_to_lock - unlocked
+        minted = np.maximum(ending_supply - self.total_supply, 0)
+        burned = np.minimum(
+            np.maximum(self.total_supply - ending_supply, 0), self.vault_shares
+        )
+        vault_shares = self.vault_shares + minted - burned
+        total_supply = self.total_supply + minted - burned
+
+        previously_locked_time = np.where(
+            self.full_profit_unlock_date > now,
+            (vault_shares - shares_to_lock)
+            * (self.full_profit_unlock_date - now),
+            0,
+        )
+        locked = vault_shares > 0
+        period = np.maximum(
+            np.floor(
+                (
+                    previously_locked_time
+                    + shares_to_lock * self.profit_max_unlock_time
+                )
+                / np.where(locked, vault_shares, 1)
+            ),
+            1,
+        )
+
+        self.vault_shares = np.where(
+            streaming, vault_shares, self.vault_shares
+        )
+        self.total_supply = np.where(
+            streaming, total_supply, self.total_supply
+        )
+        self.profit_unlocking_rate = np.where(
+            streaming & locked,
+            np.floor(vault_shares * MAX_BPS_EXTENDED / period),
+            self.profit_unlocking_rate,
+        )
+        self.full_profit_unlock_date = np.where(
+            streaming,
+            np.where(locked, now + period, 0),
+            self.full_profit_unlock_date,
+        )
+        self.last_profit_update = np.where(
+            streaming & locked, now, self.last_profit_update
+        )
+        self.total_assets = self.total_assets + profit
+
+
+@dataclass
+class FleetData:
+    """
+    Time series sampled every `step` seconds.
+    crv_emissions, cvx_emissions: (vaults, steps) tokens earned by each vault
+        per step for `tvl` assets
+    crv_price, cvx_price, eth_price: (steps,) crvUSD per token
+    gas_price: (steps,) in gwei
+    tvl: (vaults,) total assets in crvUSD the emissions are given for
+    harvest_gas: (vaults,) gas used by a harvest
+    """
+
+    crv_emissions: np.ndarray
+    cvx_emissions: np.ndarray
+    crv_price: np.ndarray
+    cvx_price: np.ndarray
+    eth_price: np.ndarray
+    gas_price: np.ndarray
+    tvl: np.ndarray
+    harvest_gas: np.ndarray
+    step: int = DAY
+
+    @classmethod
+    def load(cls, path):
+        with np.load(path) as data:
+            return cls(**{key: data[key] for key in data.files})
+
+    @property
+    def n_vaults(self):
+        return self.crv_emissions.shape[0]
+
+    @property
+    def n_steps(self):
+        return self.crv_emissions.shape[1]
+
+
+@dataclass
+class BacktestResult:
+    intervals: np.ndarray
+    caller_fees: np.ndarray
+    platform_fees: np.ndarray
+    # (vaults, intervals, caller_fees, platform_fees)
+    net_apy: np.ndarray
+    platform_revenue: np.ndarray
+    caller_profit: np.ndarray
+    # share of harvests where the caller fee covered the gas cost
+    caller_profitable: np.ndarray
+    harvests: np.ndarray
+
+    def fleet_apy(self, tvl):
+        """TVL weighted net APY of the fleet, (intervals, caller, platform)"""
+        weights = np.asarray(tvl, float)[:, None, None, None]
+        return (self.net_apy * weights).sum(axis=0) / weights.sum()
+
+
+def backtest(
+    data: FleetData,
+    intervals,
+    caller_fees,
+    platform_fees,
+    profit_max_unlock_time=DEFAULT_PROFIT_MAX_UNLOCK_TIME,
+):
+    """
+    Simulate every vault for every (interval, caller fee, platform fee).
+    Rewards accrue in proportion to the vault's assets, so harvested
+    profit compounds. Intervals are in steps, fees in basis points.
+    """
+    intervals = np.asarray(intervals, int)
+    caller_fees = np.asarray(caller_fees, float)
+    platform_fees = np.asarray(platform_fees, float)
+    shape = (
+        data.n_vaults,
+        len(intervals),
+        len(caller_fees),
+        len(platform_fees),
+    )
+
+    tvl = np.asarray(data.tvl, float) * WAD
+    # reward value per step per wei of assets, (vaults, steps)
+    reward_rate = (
+        data.crv_emissions * data.crv_price
+        + data.cvx_emissions * data.cvx_price
+    ) / np.asarray(data.tvl, float)[:, None]
+    # caller gas cost of a harvest in crvUSD wei, (vaults, steps)
+    gas_cost = (
+        np.asarray(data.harvest_gas, float)[:, None]
+        * data.gas_price
+        * 1e9
+        * data.eth_price
+    )
+
+    streaming = ProfitStreaming(
+        np.broadcast_to(tvl[:, None, None, None], shape),
+        np.broadcast_to(tvl[:, None, None, None], shape),
+        profit_max_unlock_time,
+    )
+    pending = np.zeros(shape)
+    platform_revenue = np.zeros(shape)
+    caller_profit = np.zeros(shape)
+    profitable = np.zeros(shape)
+    harvests = np.zeros(shape)
+    initial_pps = streaming.price_per_share(0)
+
+    caller_fee = caller_fees[None, None, :, None]
+    platform_fee = platform_fees[None, None, None, :]
+    for t in range(data.n_steps):
+        now = (t + 1) * data.step
+        pending += streaming.total_assets * reward_rate[:, t, None, None, None]
+        due = ((t + 1) % intervals == 0)[None, :, None, None]
+        platform, caller, net = collect_fees(
+            np.floor(pending), platform_fee, caller_fee
+        )
+        cost = gas_cost[:, t, None, None, None]
+        platform_revenue += np.where(due, platform, 0)
+        caller_profit += np.where(due, caller - cost, 0)
+        profitable += due & (caller >= cost)
+        harvests += due
+        streaming.process_profit(net, now, due)
+        pending = np.where(due, 0, pending)
+
+    elapsed = data.n_steps * data.step
+    growth = streaming.price_per_share(elapsed) / initial_pps
+    return BacktestResult(
+        intervals=intervals,
+        caller_fees=caller_fees,
+        platform_fees=platform_fees,
+        net_apy=growth ** (YEAR / elapsed) - 1,
+        platform_revenue=platform_revenue / WAD,
+        caller_profit=caller_profit / WAD,
+        caller_profitable=profitable / np.maximum(harvests, 1),
+        harvests=harvests,
+    )
+
+
+def demo_data(n_vaults=50, n_steps=365, seed=0):
+    """Random fleet with log-normal price and gas paths"""
+    rng = np.random.default_rng(seed)
+
+    def path(start, vol):
+        return start * np.exp(np.cumsum(rng.normal(0, vol, n_steps)))
+
+    tvl = rng.lognormal(np.log(2e6), 1, n_vaults)
+    crv_apr = rng.uniform(0.02, 0.15, n_vaults)
+    crv_price = path(0.5, 0.03)
+    emissions = (
+        tvl[:, None] * crv_apr[:, None] / 365 / crv_price[0]
+    ) * rng.lognormal(0, 0.2, (n_vaults, n_steps))
+    return FleetData(
+        crv_emissions=emissions,
+        cvx_emissions=emissions * 0.03,
+        crv_price=crv_price,
+        cvx_price=path(3.0, 0.04),
+        eth_price=path(3000, 0.03),
+        gas_price=rng.lognormal(np.log(5), 0.6, n_steps),
+        tvl=tvl,
+        harvest_gas=np.full(n_vaults, 1_000_000),
+    )
+
+
+def _parse_args():
+    parser = argparse.ArgumentParser(description=__doc__.split("\n\n")[0])
+    data = parser.add_mutually_exclusive_group(required=True)
+    data.add_argument("--data", help="npz file with the FleetData arrays")
+    data.add_argument("--demo", action="store_true")
+    parser.add_argument(
+        "--intervals", type=int, nargs="+", default=[1, 2, 3, 7, 14, 30]
+    )
+    parser.add_argument(
+        "--caller-fees",
+        type=int,
+        nargs="+",
+        default=[0, 10, 25, 50, 100, 200, 500, 1000],
+    )
+    parser.add_argument(
+        "--platform-fees",
+        type=int,
+        nargs="+",
+        default=[0, 500, 1000, 1500, 2000, 3000],
+    )
+    parser.add_argument(
+        "--profit-max-unlock-time",
+        type=int,
+        default=DEFAULT_PROFIT_MAX_UNLOCK_TIME,
+    )
+    parser.add_argument("--out", help="write the result arrays to a npz file")
+    return parser.parse_args()
+
+
+def main():
+    args = _parse_args()
+    data = demo_data() if args.demo else FleetData.load(args.data)
+    start = time.time()
+    result = backtest(
+        data,
+        args.intervals,
+        args.caller_fees,
+        args.platform_fees,
+        args.profit_max_unlock_time,
+    )
+    print(
+        f"Simulated {result.net_apy.size} vault configurations over "
+        f"{data.n_steps} steps in {time.time() - start:.2f}s"
+    )
+
+    fleet_apy = result.fleet_apy(data.tvl)
+    # only configurations where callers are paid for their gas
+    viable = result.caller_profitable.min(axis=0) >= 0.5
+    rows = []
+    for i, interval in enumerate(result.intervals):
+        for j, caller_fee in enumerate(result.caller_fees):
+            if not viable[i, j].all():
+                continue
+            rows.append(
+                [
+                    interval * data.step / DAY,
+                    int(caller_fee),
+                    *[f"{apy:.3%}" for apy in fleet_apy[i, j]],
+                ]
+            )
+    print(
+        tabulate(
+            rows,
+            headers=[
+                "Interval (days)",
+                "Caller fee",
+                *[f"Platform {int(fee)}" for fee in result.platform_fees],
+            ],
+            tablefmt="grid",
+        )
+    )
+    if args.out:
+        np.savez(
+            args.out,
+            intervals=result.intervals,
+            caller_fees=result.caller_fees,
+            platform_fees=result.platform_fees,
+            net_apy=result.net_apy,
+            platform_revenue=result.platform_revenue,
+            caller_profit=result.caller_profit,
+            caller_profitable=result.caller_profitable,
+        )
+
+
+if __name__ == "__main__":
+    main()
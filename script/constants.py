@@ -0,0 +1,6 @@
+"""
+Mainnet addresses shared by the off-chain scripts.
+"""
+
+CVX_TOKEN = "0x4e3FBD56CD56c3e72c1403e103b45Db9da5B9D2B"
+CRV_TOKEN = "0xD533a949740bb3306d119CC777fa900bA034cd52"
@@ -0,0 +1,418 @@
+"""
+Resumable deployment pipeline with explicit nonces and background
+verification.
+
+A deployment is a list of steps (contract creations or calls) with their
+dependencies. Steps whose dependencies are mined are signed with
+consecutive nonces and broadcast back-to-back, then their receipts are
+awaited together. Every transaction and receipt is written to a JSON
+manifest, so a rerun skips finished steps and picks up transactions still
+in flight. Mined contracts are verified concurrently in a thread pool while
+the next steps are deployed.
+
+`RpcChain` signs and broadcasts raw transactions over JSON-RPC; `BoaChain`
+runs the same pipeline on the active boa environment (local or fork).
+"""
+
+import json
+import os
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from dataclasses import dataclass, field
+from pathlib import Path
+from typing import Callable
+
+import boa
+from boa.util.abi import Address, abi_encode
+from boa.util.eip5202 import generate_blueprint_bytecode
+from eth_utils import keccak, to_checksum_address
+
+from script.watch_tower import JsonRpcClient
+
+RECEIPT_POLL_INTERVAL = 2
+RECEIPT_TIMEOUT = 600
+GAS_LIMIT_MARGIN = 1.2
+
+
+@dataclass
+class Step:
+    """
+    `build(addresses)` returns the creation code (when `to` is None) or the
+    calldata of the step from the addresses of the mined steps. `to` names
+    the step whose contract is called.
+    """
+
+    name: str
+    build: Callable[[dict[str, str]], bytes]
+    depends: tuple[str, ...] = ()
+    to: str | None = None
+    # contract verified once mined: (deployer, constructor calldata)
+    verify: tuple | None = None
+
+
+def blueprint_step(name: str, deployer) -> Step:
+    """Deploy `deployer` as an ERC-5202 blueprint"""
+    return Step(
+        name,
+        lambda _: generate_blueprint_bytecode(deployer.compiler_data.bytecode),
+        verify=(deployer, b""),
+    )
+
+
+def _constructor_calldata(deployer, args: tuple) -> bytes:
+    init_function = deployer.compiler_data.global_ctx.init_function
+    if init_function is None:
+        return b""
+    return abi_encode(
+        "("
+        + ",".join(
+            arg.typ.abi_type.selector_name() for arg in init_function.arguments
+        )
+        + ")",
+        args,
+    )
+
+
+def contract_step(name: str, deployer, args=lambda _: (), depends=()) -> Step:
+    """Deploy `deployer` with the constructor arguments `args(addresses)`"""
+
+    def constructor_calldata(addresses):
+        return _constructor_calldata(deployer, tuple(args(addresses)))
+
+    return Step(
+        name,
+        lambda addresses: (
+            deployer.compiler_data.bytecode + constructor_calldata(addresses)
+        ),
+        depends=tuple(depends),
+        verify=(deployer, constructor_calldata),
+    )
+
+
+def call_step(
+    name: str, to: str, deployer, function: str, args, depends=()
+) -> Step:
+    """Call `function` of the contract deployed by step `to`"""
+
+    def build(addresses):
+        contract = deployer.at(addresses[to])
+        return getattr(contract, function).prepare_calldata(*args(addresses))
+
+    return Step(name, build, depends=tuple({to, *depends}), to=to)
+
+
+class Manifest:
+    """Deployment state, rewritten atomically after every change"""
+
+    def __init__(self, path: str, chain_id: int, sender: str):
+        self.path = path
+        self._lock = threading.Lock()
+        self.steps: dict[str, dict] = {}
+        if os.path.exists(path):
+            with open(path) as f:
+                data = json.load(f)
+            assert data["chain_id"] == chain_id, "Manifest of another chain"
+            assert data["sender"] == sender, "Manifest of another sender"
+            self.steps = data["steps"]
+        self.chain_id = chain_id
+        self.sender = sender
+
+    def update(self, name: str, **values):
+        with self._lock:
+            self.steps.setdefault(name, {}).update(values)
+            tmp = self.path + ".tmp"
+            with open(tmp, "w") as f:
+                json.dump(
+                    {
+                        "chain_id": self.chain_id,
+                        "sender": self.sender,
+                        "steps": self.steps,
+                    },
+                    f,
+                    indent=2,
+                )
+            os.replace(tmp, self.path)
+
+    def get(self, name: str) -> dict:
+        with self._lock:
+            return dict(self.steps.get(name, {}))
+
+    def addresses(self) -> dict[str, str]:
+        with self._lock:
+            return {
+                name: step["address"]
+                for name, step in self.steps.items()
+                if step.get("status") == "mined" and step.get("address")
+            }
+
+
+class RpcChain(JsonRpcClient):
+    """Signs EIP-1559 transactions of `account` and broadcasts them raw"""
+
+    def __init__(self, url: str, account, timeout: int = 30):
+        super().__init__(url, timeout)
+        self.account = account
+        self.sender = to_checksum_address(account.address)
+        self.chain_id = int(self._request("eth_chainId", []), 16)
+
+    def nonce(self, block: str = "pending") -> int:
+        return int(
+            self._request("eth_getTransactionCount", [self.sender, block]), 16
+        )
+
+    def estimate_gas(self, tx: dict) -> int:
+        params = {"from": self.sender, "data": "0x" + tx["data"].hex()}
+        if tx.get("to"):
+            params["to"] = tx["to"]
+        return int(self._request("eth_estimateGas", [params]), 16)
+
+    def send(self, tx: dict) -> str:
+        block = self._request("eth_getBlockByNumber", ["latest", False])
+        tip = int(self._request("eth_maxPriorityFeePerGas", []), 16)
+        signed = self.account.sign_transaction(
+            {
+                "chainId": self.chain_id,
+                "nonce": tx["nonce"],
+                "to": tx.get("to") or b"",
+                "data": tx["data"],
+                "value": 0,
+                "gas": tx["gas"],
+                "maxPriorityFeePerGas": tip,
+                "maxFeePerGas": 2 * int(block["baseFeePerGas"], 16) + tip,
+            }
+        )
+        return self._request(
+            "eth_sendRawTransaction", ["0x" + signed.raw_transaction.hex()]
+        )
+
+    def receipt(self, tx_hash: str) -> dict | None:
+        receipt = self._request("eth_getTransactionReceipt", [tx_hash])
+        if receipt is None:
+            return None
+        return {
+            "status": int(receipt["status"], 16),
+            "contractAddress": receipt.get("contractAddress"),
+            "gasUsed": int(receipt["gasUsed"], 16),
+        }
+
+
+class BoaChain:
+    """
+    Runs the transactions on the active boa environment. Transactions are
+    executed in nonce order when sent, like an automining local node.
+    """
+
+    def __init__(self, sender: str | None = None):
+        self.sender = to_checksum_address(sender or boa.env.eoa)
+        self.chain_id = boa.env.evm.patch.chain_id
+        self.receipts: dict[str, dict] = {}
+
+    def _state(self):
+        return boa.env.evm.vm.state
+
+    def nonce(self, block: str = "pending") -> int:
+        return self._state().get_nonce(Address(self.sender).canonical_address)
+
+    def estimate_gas(self, tx: dict) -> int:
+        # the boa environment does not charge gas limits to the sender
+        return 0
+
+    def send(self, tx: dict) -> str:
+        assert tx["nonce"] == self.nonce(), "Nonce gap"
+        tx_hash = (
+            "0x"
+            + keccak(
+                Address(self.sender).canonical_address
+                + tx["nonce"].to_bytes(32, "big")
+            ).hex()
+        )
+        if tx.get("to"):
+            computation = boa.env.execute_code(
+                to_address=tx["to"], sender=self.sender, data=tx["data"]
+            )
+            # calls do not bump nonces in boa
+            self._state().increment_nonce(
+                Address(self.sender).canonical_address
+            )
+            address = None
+        else:
+            address, computation = boa.env.deploy(
+                sender=self.sender, bytecode=tx["data"]
+            )
+        self.receipts[tx_hash] = {
+            "status": 0 if computation.is_error else 1,
+            "contractAddress": (
+                None if address is None else to_checksum_address(address)
+            ),
+            "gasUsed": computation.get_gas_used(),
+        }
+        return tx_hash
+
+    def receipt(self, tx_hash: str) -> dict | None:
+        return self.receipts.get(tx_hash)
+
+
+@dataclass
+class DeploymentPipeline:
+    chain: object
+    steps: list[Step]
+    manifest_path: str
+    # verify(name, address, deployer, constructor_calldata), None to skip
+    verifier: Callable | None = None
+    verify_workers: int = 4
+    receipt_timeout: int = RECEIPT_TIMEOUT
+    _futures: list = field(default_factory=list)
+
+    def __post_init__(self):
+        self.manifest = Manifest(
+            self.manifest_path, self.chain.chain_id, self.chain.sender
+        )
+        names = [step.name for step in self.steps]
+        assert len(set(names)) == len(names), "Duplicate step"
+        self._pool = ThreadPoolExecutor(self.verify_workers)
+
+    def _mined(self, name: str) -> bool:
+        return self.manifest.get(name).get("status") == "mined"
+
+    def _await_receipts(self, names: list[str]):
+        deadline = time.time() + self.receipt_timeout
+        pending = set(names)
+        while pending:
+            for name in sorted(pending):
+                receipt = self.chain.receipt(
+                    self.manifest.get(name)["tx_hash"]
+                )
+                if receipt is None:
+                    continue
+                pending.discard(name)
+                if receipt["status"] != 1:
+                    self.manifest.update(name, status="failed")
+                    raise RuntimeError(f"{name} reverted")
+                self.manifest.update(
+                    name,
+                    status="mined",
+                    address=receipt["contractAddress"],
+                    gas_used=receipt["gasUsed"],
+                )
+                self._queue_verification(name)
+            if pending:
+                if time.time() > deadline:
+                    raise TimeoutError(f"No receipt for {sorted(pending)}")
+                time.sleep(RECEIPT_POLL_INTERVAL)
+
+    def _in_flight(self, names: list[str]) -> list[str]:
+        """
+        Steps sent by a previous run. Those whose nonce was used by another
+        transaction are sent again.
+        """
+        mined_nonce = self.chain.nonce("latest")
+        in_flight = []
+        for name in names:
+            step = self.manifest.get(name)
+            if step.get("status") != "sent":
+                continue
+            if (
+                self.chain.receipt(step["tx_hash"]) is None
+                and step["nonce"] < mined_nonce
+            ):
+                self.manifest.update(name, status="dropped")
+                continue
+            in_flight.append(name)
+        return in_flight
+
+    def _broadcast(self, steps: list[Step]) -> list[str]:
+        """Sign and send `steps` with consecutive nonces, without waiting"""
+        addresses = self.manifest.addresses()
+        nonce = self.chain.nonce("pending")
+        sent = []
+        for step in steps:
+            tx = {
+                "data": step.build(addresses),
+                "to": addresses[step.to] if step.to else None,
+                "nonce": nonce,
+            }
+            tx["gas"] = int(self.chain.estimate_gas(tx) * GAS_LIMIT_MARGIN)
+            tx_hash = self.chain.send(tx)
+            self.manifest.update(
+                step.name, status="sent", nonce=nonce, tx_hash=tx_hash
+            )
+            print(f"Sent {step.name} (nonce {nonce}): {tx_hash}")
+            sent.append(step.name)
+            nonce += 1
+        return sent
+
+    def _queue_verification(self, name: str):
+        step = next(s for s in self.steps if s.name == name)
+        if (
+            self.verifier is None
+            or step.verify is None
+            or self.manifest.get(name).get("verified")
+        ):
+            return
+        deployer, calldata = step.verify
+        if callable(calldata):
+            calldata = calldata(self.manifest.addresses())
+        address = self.manifest.get(name)["address"]
+
+        def verify():
+            try:
+                self.verifier(name, address, deployer, calldata)
+            except Exception as e:
+                print(f"Verification of {name} failed: {e}")
+                self.manifest.update(name, verified=False, verify_error=str(e))
+                return
+            self.manifest.update(name, verified=True, verify_error=None)
+            print(f"Verified {name} at {address}")
+
+        self._futures.append(self._pool.submit(verify))
+
+    def run(self, wait_for_verification: bool = True) -> dict[str, str]:
+        """Deploy every step not mined yet, returns the step addresses"""
+        # contracts mined by a previous run but not verified
+        for step in self.steps:
+            if self._mined(step.name):
+                self._queue_verification(step.name)
+
+        self._await_receipts(self._in_flight([s.name for s in self.steps]))
+        while True:
+            ready = [
+                step
+                for step in self.steps
+                if self.manifest.get(step.name).get("status")
+                not in ("mined", "sent")
+                and all(self._mined(dep) for dep in step.depends)
+            ]
+            if not ready:
+                break
+            self._await_receipts(self._broadcast(ready))
+
+        missing = [s.name for s in self.steps if not self._mined(s.name)]
+        assert not missing, f"Unresolved dependencies: {missing}"
+        if wait_for_verification:
+            self.wait_for_verification()
+        return self.manifest.addresses()
+
+    def wait_for_verification(self):
+        for future in self._futures:
+            future.result()
+        self._futures.clear()
+
+
+def explorer_verifier(network) -> Callable:
+    """Verifier submitting to the block explorer of a moccasin network"""
+    verifier = network.get_verifier_class()(
+        network.explorer_uri, network.explorer_api_key
+    )
+
+    def verify(name, address, deployer, constructor_calldata):
+        result = verifier.verify(
+            address=address,
+            solc_json=deployer.solc_json,
+            contract_name=Path(deployer.compiler_data.contract_path).stem,
+            constructor_calldata=constructor_calldata,
+            chain_id=network.chain_id,
+        )
+        result.wait_for_verification()
+
+    return verify
@@ -0,0 +1,436 @@
+"""
+Prometheus exporter for the vaults deployed by a vault factory.
+
+Every `interval` seconds the whole fleet is read with Multicall3
+`aggregate3` eth_calls of at most `vaults_per_call` vaults each, so that a
+call stays under the node's eth_call gas cap: vault accounting, profit
+streaming state, strategy fees and pending rewards, and the open CoW orders
+of CoW harvesters. The factory's vault count and the current harvester of
+every strategy are part of the same batches: the vault records are only
+fetched again when the count changes, and the fleet is read again with the
+new harvester when one was migrated. CoW orders are only read from CoW
+harvesters, told apart once per harvester outside of the batches. Scrapes
+are served from the last successful read, so the RPC load does not depend
+on the number of scrapers.
+
+Usage:
+    python -m script.exporter --factory 0x... --port 9464 --interval 60 \
+        [--vaults-per-call 25]
+"""
+
+import argparse
+import os
+import threading
+import time
+from dataclasses import dataclass
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+from eth_abi import decode, encode
+from eth_utils import function_signature_to_4byte_selector, to_checksum_address
+
+from script.constants import CRV_TOKEN, CVX_TOKEN
+from script.watch_tower import (
+    RECORD_PAGE_SIZE,
+    ZERO_ADDRESS,
+    JsonRpcClient,
+    is_cow_harvester,
+)
+
+MULTICALL3 = "0xcA11bde05977b3631167028862bE2a173976CA11"
+WAD = 10**18
+# vaults read per eth_call, pending_rewards_value() reads the Convex rewards
+# and the TriCRV oracle so a batch has to stay under the node's eth_call gas
+# cap (50M by default on geth)
+DEFAULT_VAULTS_PER_CALL = 25
+ORDER_TOKENS = {"CRV": CRV_TOKEN, "CVX": CVX_TOKEN}
+
+
+@dataclass(frozen=True)
+class Call:
+    target: str
+    signature: str
+    args: tuple = ()
+    output: str = "uint256"
+
+    @property
+    def calldata(self) -> bytes:
+        selector = function_signature_to_4byte_selector(self.signature)
+        arg_types = self.signature[self.signature.index("(") + 1 : -1]
+        if not arg_types:
+            return selector
+        return selector + encode(arg_types.split(","), list(self.args))
+
+
+def aggregate(rpc, calls: list[Call]) -> list:
+    """
+    Run `calls` in one Multicall3 eth_call. Failed calls (e.g. CoW views on
+    a curve harvester) return None.
+    """
+    data = function_signature_to_4byte_selector(
+        "aggregate3((address,bool,bytes)[])"
+    ) + encode(
+        ["(address,bool,bytes)[]"],
+        [[(call.target, True, call.calldata) for call in calls]],
+    )
+    (results,) = decode(["(bool,bytes)[]"], rpc.eth_call(MULTICALL3, data))
+    values = []
+    for call, (success, output) in zip(calls, results):
+        if not success or not output:
+            values.append(None)
+            continue
+        values.append(decode([call.output], output)[0])
+    return values
+
+
+@dataclass
+class VaultRecord:
+    vault: str
+    booster_id: int
+    strategy: str
+    harvester: str
+    token: str
+
+
+# (metric, help, type) of the values read for every vault
+VAULT_METRICS = [
+    ("total_assets", "Vault total assets in asset tokens", "gauge"),
+    ("total_supply", "Vault shares excluding unlocked profit", "gauge"),
+    ("price_per_share", "Assets per vault share", "gauge"),
+    ("locked_shares", "Profit shares still locked", "gauge"),
+    (
+        "unlocked_shares",
+        "Profit shares unlocked since the last update",
+        "gauge",
+    ),
+    (
+        "full_profit_unlock_date",
+        "Timestamp the profit is fully unlocked",
+        "gauge",
+    ),
+    ("seconds_since_harvest", "Time since the last harvest", "gauge"),
+    ("pending_rewards_value", "crvUSD value of the pending CRV/CVX", "gauge"),
+    ("platform_fee_bps", "Platform fee in basis points", "gauge"),
+    ("caller_fee_bps", "Caller fee in basis points", "gauge"),
+]
+ORDER_METRICS = [
+    ("cow_order_open", "1 when the harvester has a CoW order", "gauge"),
+    ("cow_order_sell_amount", "Sell amount of the CoW order", "gauge"),
+    ("cow_order_buy_amount", "Minimum crvUSD of the CoW order", "gauge"),
+    ("cow_order_age_seconds", "Time since the CoW order was created", "gauge"),
+]
+
+
+def _vault_calls(record: VaultRecord, cow: bool) -> list[Call]:
+    vault, strategy = record.vault, record.strategy
+    calls = [
+        Call(vault, "totalAssets()"),
+        Call(vault, "totalSupply()"),
+        Call(vault, "convertToAssets(uint256)", (WAD,)),
+        Call(vault, "locked_shares()"),
+        Call(vault, "unlocked_shares()"),
+        Call(vault, "full_profit_unlock_date()"),
+        Call(vault, "last_harvest()"),
+        Call(strategy, "pending_rewards_value()"),
+        Call(strategy, "platform_fee()"),
+        Call(strategy, "caller_fee()"),
+        Call(strategy, "harvester()", output="address"),
+    ]
+    if cow:
+        calls += [
+            Call(
+                record.harvester,
+                "get_order_info(address)",
+                (token,),
+                "(bool,(uint256,uint256,uint256,uint256))",
+            )
+            for token in ORDER_TOKENS.values()
+        ]
+    return calls
+
+
+class FleetReader:
+    """Reads the fleet of a factory, counting the RPC calls made"""
+
+    def __init__(
+        self,
+        rpc,
+        factory: str,
+        vaults_per_call: int = DEFAULT_VAULTS_PER_CALL,
+    ):
+        self.rpc = rpc
+        self.factory = factory
+        self.vaults_per_call = vaults_per_call
+        self.records: list[VaultRecord] = []
+        self.rpc_calls = 0
+        # harvester => True for CoW harvesters
+        self._cow_harvesters: dict[str, bool] = {}
+
+    def _aggregate(self, calls):
+        self.rpc_calls += 1
+        return aggregate(self.rpc, calls)
+
+    def _is_cow(self, harvester: str) -> bool:
+        """
+        Whether `harvester` keeps CoW orders, checked outside of the fleet
+        batch since the check burns the gas of the call on other harvesters
+        """
+        if harvester == ZERO_ADDRESS:
+            return False
+        if harvester not in self._cow_harvesters:
+            self.rpc_calls += 1
+            self._cow_harvesters[harvester] = is_cow_harvester(
+                self.rpc, harvester
+            )
+        return self._cow_harvesters[harvester]
+
+    def _discover(self, vault_count: int):
+        """Fetch every page of vault records in one batch"""
+        pages = [
+            Call(
+                self.factory,
+                "get_vault_records(uint256,uint256)",
+                (start_id, RECORD_PAGE_SIZE),
+                "(address,uint256,address,address,address)[]",
+            )
+            for start_id in range(1, vault_count + 1, RECORD_PAGE_SIZE)
+        ]
+        results = self._aggregate(pages) if pages else []
+        self.records = [
+            VaultRecord(
+                to_checksum_address(vault),
+                booster_id,
+                to_checksum_address(strategy),
+                to_checksum_address(harvester),
+                to_checksum_address(token),
+            )
+            for page in results
+            for vault, booster_id, strategy, harvester, token in page
+        ]
+
+    def read(self) -> dict:
+        """
+        Current metrics: {(metric, labels): value}. One eth_call per
+        `vaults_per_call` vaults while the fleet is unchanged, the records
+        are fetched in one more call when vaults were deployed and the fleet
+        is read twice when a harvester was migrated, plus one call per
+        harvester not seen before.
+        """
+        header = [
+            Call(self.factory, "vaults_deployed()"),
+            Call(MULTICALL3, "getCurrentBlockTimestamp()"),
+        ]
+        per_vault = [
+            _vault_calls(record, self._is_cow(record.harvester))
+            for record in self.records
+        ]
+        chunks = [
+            sum(per_vault[start : start + self.vaults_per_call], [])
+            for start in range(0, len(per_vault), self.vaults_per_call)
+        ] or [[]]
+        # the vault count is checked before the rest of the fleet is read
+        values = self._aggregate(header + chunks[0])
+        vault_count, now = values[0], values[1]
+        if vault_count != len(self.records):
+            self._discover(vault_count)
+            return self.read()
+        for chunk in chunks[1:]:
+            values += self._aggregate(chunk)
+
+        metrics = {("vaults", ()): vault_count}
+        offset = len(header)
+        migrated = False
+        for record, calls in zip(self.records, per_vault):
+            labels = (
+                ("vault", record.vault),
+                ("booster_id", str(record.booster_id)),
+            )
+            result = values[offset : offset + len(calls)]
+            offset += len(calls)
+            harvester = result[10]
+            if harvester is not None:
+                harvester = to_checksum_address(harvester)
+                if harvester != record.harvester:
+                    # the orders were read from the previous harvester
+                    record.harvester = harvester
+                    migrated = True
+            metrics.update(_vault_metrics(labels, result, now))
+        if migrated:
+            return self.read()
+        return metrics
+
+
+def _vault_metrics(labels, result, now) -> dict:
+    (
+        total_assets,
+        total_supply,
+        price_per_share,
+        locked_shares,
+        unlocked_shares,
+        full_profit_unlock_date,
+        last_harvest,
+        pending_rewards_value,
+        platform_fee,
+        caller_fee,
+    ) = result[:10]
+
+    def amount(value):
+        return None if value is None else value / WAD
+
+    values = {
+        "total_assets": amount(total_assets),
+        "total_supply": amount(total_supply),
+        "price_per_share": amount(price_per_share),
+        "locked_shares": amount(locked_shares),
+        "unlocked_shares": amount(unlocked_shares),
+        "full_profit_unlock_date": full_profit_unlock_date,
+        "seconds_since_harvest": (
+            None if not last_harvest else now - last_harvest
+        ),
+        "pending_rewards_value": amount(pending_rewards_value),
+        "platform_fee_bps": platform_fee,
+        "caller_fee_bps": caller_fee,
+    }
+    metrics = {
+        (name, labels): value
+        for name, value in values.items()
+        if value is not None
+    }
+    for symbol, order in zip(ORDER_TOKENS, result[11:]):
+        if order is None:
+            continue
+        exists, (last_order_time, buy_amount, sell_amount, _) = order
+        order_labels = labels + (("token", symbol),)
+        metrics[("cow_order_open", order_labels)] = int(exists)
+        if exists:
+            metrics[("cow_order_sell_amount", order_labels)] = amount(
+                sell_amount
+            )
+            metrics[("cow_order_buy_amount", order_labels)] = amount(
+                buy_amount
+            )
+            metrics[("cow_order_age_seconds", order_labels)] = (
+                now - last_order_time
+            )
+    return metrics
+
+
+def render_metrics(metrics: dict, prefix: str = "raac_") -> str:
+    """Prometheus text exposition format"""
+    descriptions = {
+        name: (help_text, metric_type)
+        for name, help_text, metric_type in VAULT_METRICS + ORDER_METRICS
+    }
+    descriptions["vaults"] = ("Vaults deployed by the factory", "gauge")
+    descriptions["exporter_rpc_calls"] = ("eth_calls made", "counter")
+    descriptions["exporter_last_read_timestamp"] = (
+        "Time of the last successful fleet read",
+        "gauge",
+    )
+    descriptions["exporter_read_errors"] = ("Failed fleet reads", "counter")
+
+    by_name: dict[str, list] = {}
+    for (name, labels), value in metrics.items():
+        by_name.setdefault(name, []).append((labels, value))
+
+    lines = []
+    for name, samples in by_name.items():
+        help_text, metric_type = descriptions[name]
+        lines.append(f"# HELP {prefix}{name} {help_text}")
+        lines.append(f"# TYPE {prefix}{name} {metric_type}")
+        for labels, value in samples:
+            label_text = ",".join(f'{key}="{val}"' for key, val in labels)
+            if label_text:
+                label_text = "{" + label_text + "}"
+            lines.append(f"{prefix}{name}{label_text} {value}")
+    return "\n".join(lines) + "\n"
+
+
+class Exporter:
+    """Refreshes the fleet metrics in the background and caches the text"""
+
+    def __init__(self, reader: FleetReader, interval: int):
+        self.reader = reader
+        self.interval = interval
+        self.metrics: dict = {}
+        self.last_read = 0
+        self.read_errors = 0
+        self._lock = threading.Lock()
+        self._text = render_metrics({})
+
+    def refresh(self):
+        try:
+            metrics = self.reader.read()
+        except Exception as e:
+            print(f"Fleet read failed: {e}")
+            self.read_errors += 1
+        else:
+            self.metrics = metrics
+            self.last_read = time.time()
+        metrics = dict(self.metrics)
+        metrics[("exporter_rpc_calls", ())] = self.reader.rpc_calls
+        metrics[("exporter_read_errors", ())] = self.read_errors
+        metrics[("exporter_last_read_timestamp", ())] = int(self.last_read)
+        text = render_metrics(metrics)
+        with self._lock:
+            self._text = text
+
+    def text(self) -> str:
+        with self._lock:
+            return self._text
+
+    def run(self):
+        while True:
+            start = time.time()
+            self.refresh()
+            time.sleep(max(self.interval - (time.time() - start), 0))
+
+    def serve(self, port: int) -> ThreadingHTTPServer:
+        exporter = self
+
+        class Handler(BaseHTTPRequestHandler):
+            def do_GET(self):
+                if self.path != "/metrics":
+                    self.send_error(404)
+                    return
+                body = exporter.text().encode()
+                self.send_response(200)
+                self.send_header(
+                    "Content-Type", "text/plain; version=0.0.4; charset=utf-8"
+                )
+                self.send_header("Content-Length", str(len(body)))
+                self.end_headers()
+                self.wfile.write(body)
+
+            def log_message(self, *args):
+                pass
+
+        server = ThreadingHTTPServer(("", port), Handler)
+        threading.Thread(target=server.serve_forever, daemon=True).start()
+        return server
+
+
+def _parse_args():
+    parser = argparse.ArgumentParser(description=__doc__.split("\n\n")[0])
+    parser.add_argument("--factory", required=True)
+    parser.add_argument("--rpc-url", default=os.environ.get("MAINNET_RPC_URL"))
+    parser.add_argument("--port", type=int, default=9464)
+    parser.add_argument("--interval", type=int, default=60)
+    parser.add_argument(
+        "--vaults-per-call", type=int, default=DEFAULT_VAULTS_PER_CALL
+    )
+    return parser.parse_args()
+
+
+def main():
+    args = _parse_args()
+    reader = FleetReader(
+        JsonRpcClient(args.rpc_url), args.factory, args.vaults_per_call
+    )
+    exporter = Exporter(reader, args.interval)
+    exporter.serve(args.port)
+    print(f"Serving fleet metrics on :{args.port}/metrics")
+    exporter.run()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,65 @@
+"""
+EIP-712 hashing of CoW Protocol (GPv2) orders and the ERC-1271 signature
+ComposableCoW expects for a single conditional order, shared by the watch
+tower and the tests.
+"""
+
+from eth_abi import encode
+from eth_utils import keccak
+
+EIP712_DOMAIN_TYPEHASH = keccak(
+    text="EIP712Domain(string name,string version,uint256 chainId,address verifyingContract)"
+)
+GPV2_ORDER_TYPEHASH = keccak(
+    text="Order(address sellToken,address buyToken,address receiver,uint256 sellAmount,"
+    "uint256 buyAmount,uint32 validTo,bytes32 appData,uint256 feeAmount,string kind,"
+    "bool partiallyFillable,string sellTokenBalance,string buyTokenBalance)"
+)
+GPV2_ORDER_TYPES = [
+    "address",
+    "address",
+    "address",
+    "uint256",
+    "uint256",
+    "uint32",
+    "bytes32",
+    "uint256",
+    "bytes32",
+    "bool",
+    "bytes32",
+    "bytes32",
+]
+GPV2_ORDER_TUPLE = f"({','.join(GPV2_ORDER_TYPES)})"
+
+
+def gpv2_domain_separator(settlement_address, chain_id=1):
+    return keccak(
+        encode(
+            ["bytes32", "bytes32", "bytes32", "uint256", "address"],
+            [
+                EIP712_DOMAIN_TYPEHASH,
+                keccak(text="Gnosis Protocol"),
+                keccak(text="v2"),
+                chain_id,
+                settlement_address,
+            ],
+        )
+    )
+
+
+def gpv2_order_hash(order, domain_separator):
+    struct_hash = keccak(
+        encode(
+            ["bytes32", *GPV2_ORDER_TYPES],
+            [GPV2_ORDER_TYPEHASH, *order],
+        )
+    )
+    return keccak(b"\x19\x01" + domain_separator + struct_hash)
+
+
+def encode_conditional_order_signature(order, handler, static_input):
+    """ERC-1271 signature for a single ComposableCoW order (no merkle proof)"""
+    return encode(
+        [GPV2_ORDER_TUPLE, "(bytes32[],(address,bytes32,bytes),bytes)"],
+        [tuple(order), ([], (handler, b"\x00" * 32, static_input), b"")],
+    )
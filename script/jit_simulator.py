@@ -0,0 +1,315 @@
+"""
+Monte-Carlo simulator of just-in-time deposits around harvests.
+
+An attacker deposits shortly before a harvest and redeems after it, trying
+to capture profit that belongs to the existing depositors. Each trial draws
+the attacker's deposit size, how long before the harvest it deposits, how
+long it holds and how long ago the previous harvest was. The trials run on
+the `erc4626` streaming replica of `script.backtest`, vectorized over
+(unlock times, harvest sizes, trials).
+
+The report gives attacker profit against `profit_max_unlock_time` and
+harvest size. With `--vault`, the smallest unlock time that keeps the
+attack unprofitable is written as a `set_profit_max_unlock_time`
+transaction for the vault's strategy manager.
+
+Usage:
+    python -m script.jit_simulator --tvl 2000000 --harvest-sizes 0.001 0.005
+    python -m script.jit_simulator --vault 0x... --rpc-url ... --out tx.json
+"""
+
+import argparse
+import json
+import os
+import time
+from dataclasses import dataclass
+
+import numpy as np
+from eth_abi import decode, encode
+from eth_utils import function_signature_to_4byte_selector
+from tabulate import tabulate
+
+from script.backtest import DAY, WAD, YEAR, ProfitStreaming
+
+HOUR = 3600
+# vault.set_profit_max_unlock_time upper bound
+MAX_PROFIT_MAX_UNLOCK_TIME = 31_556_952
+DEFAULT_UNLOCK_TIMES = [
+    0,
+    HOUR,
+    6 * HOUR,
+    DAY,
+    3 * DAY,
+    7 * DAY,
+    14 * DAY,
+    30 * DAY,
+]
+# harvest profit as a fraction of the vault's assets
+DEFAULT_HARVEST_SIZES = [0.0001, 0.0002, 0.0005, 0.001, 0.002]
+# trials simulated per batch, bounds the memory used
+BATCH_SIZE = 20_000
+
+
+@dataclass
+class AttackParams:
+    """
+    Ranges the attacker's behaviour is drawn from. Deposits are a
+    log-uniform fraction of the vault's assets, times are uniform.
+    """
+
+    min_deposit: float = 0.01
+    max_deposit: float = 10.0
+    max_lead_time: int = HOUR
+    max_hold_time: int = 14 * DAY
+    min_harvest_interval: int = DAY
+    max_harvest_interval: int = 7 * DAY
+    # crvUSD paid in gas for the deposit and the redeem
+    gas_cost: float = 20.0
+    # yearly cost of the attacker's capital
+    capital_rate: float = 0.05
+
+
+@dataclass
+class SimulationResult:
+    unlock_times: np.ndarray
+    harvest_sizes: np.ndarray
+    trials: int
+    # (unlock_times, harvest_sizes), profits in crvUSD
+    mean_profit: np.ndarray
+    p99_profit: np.ndarray
+    max_profit: np.ndarray
+    profitable: np.ndarray
+    # attacker gain before costs as a share of the harvest
+    captured: np.ndarray
+
+    def safe_unlock_time(self, max_profitable=0.001):
+        """
+        Smallest simulated unlock time for which at most `max_profitable`
+        of the trials are profitable for every harvest size, None if there
+        is none
+        """
+        safe = (self.profitable <= max_profitable).all(axis=1)
+        if not safe.any():
+            return None
+        return int(self.unlock_times[np.argmax(safe)])
+
+
+def _simulate_batch(rng, tvl, unlock_times, harvest_sizes, size, params):
+    shape = (len(unlock_times), len(harvest_sizes), size)
+    unlock = np.broadcast_to(unlock_times[:, None, None], shape)
+    harvest_profit = np.broadcast_to(
+        np.floor(tvl * harvest_sizes)[None, :, None], shape
+    )
+
+    # common random numbers across the grid
+    deposit = np.floor(
+        tvl
+        * np.exp(
+            rng.uniform(
+                np.log(params.min_deposit), np.log(params.max_deposit), size
+            )
+        )
+    )
+    interval = rng.uniform(
+        params.min_harvest_interval, params.max_harvest_interval, size
+    )
+    lead = rng.uniform(0, np.minimum(params.max_lead_time, interval), size)
+    hold = rng.uniform(0, params.max_hold_time, size)
+
+    vault = ProfitStreaming(np.full(shape, tvl), np.full(shape, tvl), unlock)
+    # the previous harvest is still streaming when the attack starts
+    vault.process_profit(harvest_profit, 0)
+    shares = vault.deposit(deposit, interval - lead)
+    vault.process_profit(harvest_profit, interval)
+    assets = vault.redeem(shares, interval + hold)
+
+    gain = (assets - deposit) / WAD
+    cost = (
+        params.gas_cost
+        + deposit / WAD * params.capital_rate * (lead + hold) / YEAR
+    )
+    return gain - cost, gain / (harvest_profit / WAD)
+
+
+def simulate(
+    tvl,
+    unlock_times=DEFAULT_UNLOCK_TIMES,
+    harvest_sizes=DEFAULT_HARVEST_SIZES,
+    trials=1_000_000,
+    params: AttackParams = AttackParams(),
+    seed=0,
+):
+    """
+    Run `trials` attacks for every (unlock time, harvest size) on a vault
+    holding `tvl` crvUSD
+    """
+    rng = np.random.default_rng(seed)
+    unlock_times = np.asarray(unlock_times, float)
+    harvest_sizes = np.asarray(harvest_sizes, float)
+    tvl = float(tvl) * WAD
+
+    profits = []
+    captured = []
+    for start in range(0, trials, BATCH_SIZE):
+        profit, share = _simulate_batch(
+            rng,
+            tvl,
+            unlock_times,
+            harvest_sizes,
+            min(BATCH_SIZE, trials - start),
+            params,
+        )
+        profits.append(profit.astype(np.float32))
+        captured.append(share.sum(axis=2))
+    profit = np.concatenate(profits, axis=2)
+
+    return SimulationResult(
+        unlock_times=unlock_times.astype(int),
+        harvest_sizes=harvest_sizes,
+        trials=trials,
+        mean_profit=profit.mean(axis=2),
+        p99_profit=np.percentile(profit, 99, axis=2),
+        max_profit=profit.max(axis=2),
+        profitable=(profit > 0).mean(axis=2),
+        captured=sum(captured) / trials,
+    )
+
+
+def set_unlock_time_transaction(vault, unlock_time, result, current=None):
+    """Transaction for the strategy manager, with the simulation attached"""
+    assert unlock_time <= MAX_PROFIT_MAX_UNLOCK_TIME, "unlock time too long"
+    data = function_signature_to_4byte_selector(
+        "set_profit_max_unlock_time(uint256)"
+    ) + encode(["uint256"], [unlock_time])
+    row = list(result.unlock_times).index(unlock_time)
+    return {
+        "to": vault,
+        "value": "0",
+        "data": "0x" + data.hex(),
+        "description": (
+            f"Set profit_max_unlock_time of {vault} to {unlock_time}s"
+            + (f" (currently {current}s)" if current is not None else "")
+        ),
+        "simulation": {
+            "trials": result.trials,
+            "harvest_sizes": result.harvest_sizes.tolist(),
+            "profitable": result.profitable[row].tolist(),
+            "p99_profit": result.p99_profit[row].tolist(),
+        },
+    }
+
+
+def _read_uint(rpc, address, signature):
+    (value,) = decode(
+        ["uint256"],
+        rpc.eth_call(address, function_signature_to_4byte_selector(signature)),
+    )
+    return value
+
+
+def _print_report(result, tvl):
+    def table(title, values, fmt):
+        print(f"\n{title}")
+        print(
+            tabulate(
+                [
+                    [f"{unlock / HOUR:g}h", *[fmt(v) for v in row]]
+                    for unlock, row in zip(result.unlock_times, values)
+                ],
+                headers=[
+                    "Unlock time",
+                    *[f"{size:.2%} harvest" for size in result.harvest_sizes],
+                ],
+                tablefmt="grid",
+            )
+        )
+
+    print(f"Vault TVL: {tvl:,.0f} crvUSD, {result.trials:,} trials per cell")
+    table("Profitable attacks", result.profitable, lambda v: f"{v:.2%}")
+    table(
+        "Mean attacker profit (crvUSD)", result.mean_profit, "{:,.2f}".format
+    )
+    table("p99 attacker profit (crvUSD)", result.p99_profit, "{:,.2f}".format)
+    table("Harvest captured before costs", result.captured, "{:.2%}".format)
+
+
+def _parse_args():
+    parser = argparse.ArgumentParser(description=__doc__.split("\n\n")[0])
+    parser.add_argument("--tvl", type=float, help="vault assets in crvUSD")
+    parser.add_argument(
+        "--vault", help="read the TVL and propose an unlock time"
+    )
+    parser.add_argument("--rpc-url", default=os.environ.get("MAINNET_RPC_URL"))
+    parser.add_argument(
+        "--unlock-times", type=int, nargs="+", default=DEFAULT_UNLOCK_TIMES
+    )
+    parser.add_argument(
+        "--harvest-sizes", type=float, nargs="+", default=DEFAULT_HARVEST_SIZES
+    )
+    parser.add_argument("--trials", type=int, default=1_000_000)
+    parser.add_argument("--gas-cost", type=float, default=20.0)
+    parser.add_argument("--capital-rate", type=float, default=0.05)
+    parser.add_argument("--max-hold-time", type=int, default=14 * DAY)
+    parser.add_argument(
+        "--max-profitable",
+        type=float,
+        default=0.001,
+        help="share of profitable attacks tolerated by the proposal",
+    )
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--out", help="write the proposal transaction here")
+    args = parser.parse_args()
+    if args.tvl is None and args.vault is None:
+        parser.error("one of --tvl or --vault is required")
+    return args
+
+
+def main():
+    args = _parse_args()
+    current = None
+    tvl = args.tvl
+    if args.vault:
+        from script.watch_tower import JsonRpcClient
+
+        rpc = JsonRpcClient(args.rpc_url)
+        current = _read_uint(rpc, args.vault, "profit_max_unlock_time()")
+        if tvl is None:
+            tvl = _read_uint(rpc, args.vault, "totalAssets()") / WAD
+
+    start = time.time()
+    result = simulate(
+        tvl,
+        args.unlock_times,
+        args.harvest_sizes,
+        args.trials,
+        AttackParams(
+            gas_cost=args.gas_cost,
+            capital_rate=args.capital_rate,
+            max_hold_time=args.max_hold_time,
+        ),
+        args.seed,
+    )
+    cells = result.profitable.size
+    print(
+        f"Simulated {cells * args.trials:,} attacks in "
+        f"{time.time() - start:.2f}s"
+    )
+    _print_report(result, tvl)
+
+    unlock_time = result.safe_unlock_time(args.max_profitable)
+    if unlock_time is None:
+        print("\nNo simulated unlock time keeps the attack unprofitable")
+        return
+    print(f"\nRecommended profit_max_unlock_time: {unlock_time}s")
+    if args.vault:
+        transaction = set_unlock_time_transaction(
+            args.vault, unlock_time, result, current
+        )
+        print(transaction["description"])
+        if args.out:
+            with open(args.out, "w") as f:
+                json.dump(transaction, f, indent=2)
+
+
+if __name__ == "__main__":
+    main()
@@ -1,104 +1,106 @@
+"""
+Deploys the blueprints, the add liquidity hook and the factory, then a
+crvUSD/USDT vault, through the resumable deployment pipeline.
+
+Progress is written to DEPLOYMENT_MANIFEST (default
+`deployment-<network>.json`): rerunning the script after a failure only
+sends the transactions and verifications that did not complete.
+"""
+
+import os
+
 import moccasin
 from moccasin.boa_tools import VyperContract
-from moccasin.config import get_config
 
+from script.deploy_pipeline import (
+    BoaChain,
+    DeploymentPipeline,
+    RpcChain,
+    blueprint_step,
+    call_step,
+    contract_step,
+    explorer_verifier,
+)
 from src import factory, raac_vault, strategy
 from src.harvesters import cow_harvester, curve_harvester
 from src.hooks import add_liquidity
 from tests.utils.constants import CRVUSD_POOLS, ZERO_ADDRESS
 
 TREASURY = "0xaef6ea60f6443bad046e825c1d2b0c0b5ebc1f16"
-deployer = moccasin.config.get_active_network().get_default_account()
-
-
-def deploy_as_blueprint(contract: VyperContract, name: str) -> VyperContract:
-    print(f"Deploying {name} as blueprint")
 
-    for attempt in range(3):
-        try:
-            return contract.deploy_as_blueprint()
-        except Exception as e:
-            print(f"Attempt {attempt + 1} failed for {name} blueprint: {e}")
-            if attempt == 2:
-                raise
-
-
-def deploy_contract(
-    contract: VyperContract, name: str, *args, **kwargs
-) -> VyperContract:
-    print(f"Deploying {name}")
-
-    for attempt in range(3):
-        try:
-            return contract.deploy(*args, **kwargs)
-        except Exception as e:
-            print(f"Attempt {attempt + 1} failed for {name}: {e}")
-            if attempt == 2:
-                raise
 
+def core_steps() -> list:
+    """Blueprints, add liquidity hook and factory, no mainnet dependency"""
+    return [
+        blueprint_step("curve_harvester", curve_harvester),
+        blueprint_step("cow_harvester", cow_harvester),
+        blueprint_step("strategy", strategy),
+        blueprint_step("raac_vault", raac_vault),
+        contract_step("add_liquidity_hook", add_liquidity),
+        contract_step(
+            "factory",
+            factory,
+            lambda a: (
+                a["raac_vault"],
+                a["strategy"],
+                [("curve", a["curve_harvester"]), ("cow", a["cow_harvester"])],
+                TREASURY,
+            ),
+            depends=(
+                "raac_vault",
+                "strategy",
+                "curve_harvester",
+                "cow_harvester",
+            ),
+        ),
+    ]
 
-def _verify(contract):
-    print(f"Verifying {contract}")
 
-    for attempt in range(3):
-        try:
-            verifier = (
-                get_config().get_active_network().moccasin_verify(contract)
-            )
-            verifier.wait_for_verification()
-            print(f"Successfully verified {contract}")
-            return
-        except Exception as e:
-            print(f"Attempt {attempt + 1} failed to verify {contract}: {e}")
-            if attempt == 2:
-                print(f"Failed to verify {contract} after 3 attempts")
-                return
+def deployment_steps(manager: str) -> list:
+    """Core steps and a vault on the mainnet Convex Booster"""
+    return core_steps() + [
+        call_step(
+            "usdt_vault",
+            "factory",
+            factory,
+            "deploy_new_vault",
+            lambda a: (
+                CRVUSD_POOLS["usdt"]["booster_id"],
+                1,  # cow harvester index
+                manager,  # harvest manager
+                manager,  # strategy manager
+                ZERO_ADDRESS,
+                a["add_liquidity_hook"],
+                0,
+            ),
+            depends=("add_liquidity_hook",),
+        ),
+    ]
 
 
 def deploy() -> VyperContract:
-
-    curve_harvester_blueprint = deploy_as_blueprint(
-        curve_harvester, "Curve Harvester"
-    )
-    cow_harvester_blueprint = deploy_as_blueprint(
-        cow_harvester, "CoW Harvester"
+    network = moccasin.config.get_active_network()
+    deployer = network.get_default_account()
+    if network.is_local_or_forked_network():
+        chain = BoaChain(deployer.address)
+    else:
+        chain = RpcChain(network.url, deployer)
+
+    pipeline = DeploymentPipeline(
+        chain,
+        deployment_steps(deployer.address),
+        os.environ.get(
+            "DEPLOYMENT_MANIFEST", f"deployment-{network.name}.json"
+        ),
+        verifier=(
+            None
+            if network.is_local_or_forked_network()
+            or not network.has_explorer()
+            else explorer_verifier(network)
+        ),
     )
-    strategy_blueprint = deploy_as_blueprint(strategy, "Strategy")
-    raac_vault_blueprint = deploy_as_blueprint(raac_vault, "RAAC Vault")
-    add_liquidity_hook = deploy_contract(add_liquidity, "Add Liquidity Hook")
-    factory_deployment = deploy_contract(
-        factory,
-        "Factory",
-        raac_vault_blueprint.address,
-        strategy_blueprint.address,
-        [
-            ("curve", curve_harvester_blueprint.address),
-            ("cow", cow_harvester_blueprint.address),
-        ],
-        TREASURY,
-    )
-
-    contracts = [
-        factory_deployment,
-        curve_harvester_blueprint,
-        cow_harvester_blueprint,
-        strategy_blueprint,
-        raac_vault_blueprint,
-        add_liquidity_hook,
-    ]
-
-    factory_deployment.deploy_new_vault(
-        CRVUSD_POOLS["usdt"]["booster_id"],
-        1,  # cow harvester index
-        deployer.address,  # harvest manager
-        deployer.address,  # strategy manager
-        ZERO_ADDRESS,
-        add_liquidity_hook.address,
-        0,
-    )
-
-    for contract in contracts:
-        _verify(contract)
+    addresses = pipeline.run()
+    return factory.at(addresses["factory"])
 
 
 def moccasin_main() -> VyperContract:
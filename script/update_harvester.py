@@ -1,48 +1,449 @@
+"""
+Fleet-wide harvester migration planner and executor.
+
+Planning (on a fork, e.g. `mox run update_harvester --network mainnet-fork`):
+every vault of the factory registry is read, the CRV, CVX and registered
+extra reward balances stranded in its current harvester are collected and
+`factory.migrate_harvesters` is dry-run for each vault on a snapshot of the
+fork. Dry runs are spread over a process pool, each worker forking the same
+block. Successful vaults are grouped into transactions sharing one list of
+migration tokens, within the factory batch size and a gas budget, and the
+plan is written to MIGRATION_PLAN.
+
+Execution (`MIGRATION_MODE=execute mox run update_harvester --network
+mainnet`) sends the batches of the plan from the factory owner.
+
+Progress of both phases is recorded in MIGRATION_CHECKPOINT after every dry
+run and every batch, so a failed run restarts where it stopped.
+
+Environment:
+    MIGRATION_MODE        plan (default) or execute
+    MIGRATION_FACTORY     vault factory, defaults to FACTORY
+    HARVESTER_INDEX       target implementation, defaults to the latest
+    MIGRATION_VAULTS      comma separated vaults, defaults to the whole fleet
+    MIGRATION_WORKERS     dry run processes, 0 to dry-run in process
+    MIGRATION_PLAN        plan file, defaults to migration_plan.json
+    MIGRATION_CHECKPOINT  checkpoint file, defaults to migration_checkpoint.json
+"""
+
+import hashlib
+import json
+import multiprocessing
+import os
+from concurrent.futures import ProcessPoolExecutor
+from dataclasses import asdict, dataclass, field, replace
+
+import boa
 import moccasin
 from boa.contracts.abi.abi_contract import ABIContractFactory
+from boa.contracts.base_evm_contract import BoaError
+from eth_abi import decode, encode
+from eth_utils import function_signature_to_4byte_selector, to_checksum_address
 
-from script.mock_deployment import _verify
-from src import factory, raac_vault
-from src.harvesters import cow_harvester
 from tests.utils.abis import ERC20_ABI
 from tests.utils.constants import CRV_TOKEN, CVX_TOKEN
 
-TREASURY = "0xaef6ea60f6443bad046e825c1d2b0c0b5ebc1f16"
 FACTORY = "0xE1Ca332516A74e136575bac99205C60888982989"
-STRATEGY = "0xc3A520c4dBA00D14a4d3E5AA1719de7878f9cFE5"
-VAULT = "0x66B849ae48EdFeADaE3684f9bCB0EB8565a21EF8"
-CURRENT_HARVESTER = "0x7E96eCB7D835f52328Bf929e83DF103C6022aA46"
-deployer = moccasin.config.get_active_network().get_default_account()
+ZERO_ADDRESS = "0x0000000000000000000000000000000000000000"
+RECORD_PAGE_SIZE = 500
+# factory.MAX_MIGRATION_BATCH
+MAX_MIGRATION_BATCH = 50
+# constants.MAX_REWARD_TOKENS + 2
+MAX_MIGRATION_TOKENS = 12
+DEFAULT_MAX_BATCH_GAS = 12_000_000
 
 
-def deploy():
+@dataclass
+class VaultMigration:
+    vault: str
+    strategy: str
+    harvester: str
+    # reward token => balance stranded in the current harvester
+    stranded: dict[str, int] = field(default_factory=dict)
+    gas_used: int | None = None
+    error: str | None = None
 
-    new_harvester_blueprint = cow_harvester.deploy_as_blueprint()
-    factory_contract = factory.at(FACTORY)
-    factory_contract.add_harvester("cow v2", new_harvester_blueprint.address)
-    new_harvester = factory_contract.deploy_harvester_instance(
-        factory_contract.harvester_count() - 1, VAULT
-    )
-    _verify(cow_harvester.at(new_harvester))
-    print(f"New harvester deployed at {new_harvester}")
-    vault = raac_vault.at(VAULT)
-    cvx_token = ABIContractFactory("ERC20", ERC20_ABI).at(CVX_TOKEN)
-    crv_token = ABIContractFactory("ERC20", ERC20_ABI).at(CRV_TOKEN)
-    print(
-        f"Balance of CRV of old harvester: {crv_token.balanceOf(CURRENT_HARVESTER)}"
+    @property
+    def tokens(self) -> list[str]:
+        return sorted(t for t, balance in self.stranded.items() if balance)
+
+
+@dataclass
+class MigrationBatch:
+    migrations: list[VaultMigration]
+    migration_tokens: list[str]
+    gas: int
+
+    @property
+    def vaults(self) -> list[str]:
+        return [m.vault for m in self.migrations]
+
+
+class Checkpoint:
+    """
+    Progress of a migration, rewritten after every step. Dry runs are only
+    reused for the same block and harvester index, executed batches are
+    recorded per plan (see `plan_key`).
+    """
+
+    def __init__(self, path: str, block: int, harvester_index: int):
+        self.path = path
+        self.block = block
+        self.harvester_index = harvester_index
+        self.dry_runs: dict[str, VaultMigration] = {}
+        # plan key => batch index => vaults migrated and new harvesters
+        self.executed: dict[str, dict[str, dict]] = {}
+        if not os.path.exists(path):
+            return
+        with open(path) as f:
+            data = json.load(f)
+        self.executed = data.get("executed", {})
+        if (data["block"], data["harvester_index"]) == (
+            block,
+            harvester_index,
+        ):
+            self.dry_runs = {
+                vault: VaultMigration(**migration)
+                for vault, migration in data["dry_runs"].items()
+            }
+
+    def save(self):
+        tmp = self.path + ".tmp"
+        with open(tmp, "w") as f:
+            json.dump(
+                {
+                    "block": self.block,
+                    "harvester_index": self.harvester_index,
+                    "dry_runs": {
+                        vault: asdict(migration)
+                        for vault, migration in self.dry_runs.items()
+                    },
+                    "executed": self.executed,
+                },
+                f,
+                indent=2,
+            )
+        os.replace(tmp, self.path)
+
+
+def _static_call(to: str, signature: str, output: str, *args):
+    """eth_call returning None when the call reverts or returns nothing"""
+    data = function_signature_to_4byte_selector(signature)
+    if args:
+        data += encode(
+            signature[signature.index("(") + 1 : -1].split(","), args
+        )
+    computation = boa.env.execute_code(to_address=to, data=data, simulate=True)
+    if computation.is_error or len(computation.output) < 32:
+        return None
+    (value,) = decode([output], computation.output)
+    return to_checksum_address(value) if output == "address" else value
+
+
+def _erc20(token: str):
+    return ABIContractFactory("ERC20", ERC20_ABI).at(token)
+
+
+def reward_tokens(strategy: str) -> list[str]:
+    """CRV, CVX and the extra rewards registered on the Convex staking contract"""
+    tokens = [CRV_TOKEN, CVX_TOKEN]
+    rewards = _static_call(strategy, "rewards_contract()", "address")
+    count = _static_call(rewards, "extraRewardsLength()", "uint256") or 0
+    for i in range(count):
+        pool = _static_call(rewards, "extraRewards(uint256)", "address", i)
+        token = _static_call(pool, "rewardToken()", "address")
+        if token is None:
+            continue
+        # stash token wrappers of newer Convex pools pay out `token()`
+        token = _static_call(token, "token()", "address") or token
+        if token not in tokens:
+            tokens.append(token)
+    return tokens[:MAX_MIGRATION_TOKENS]
+
+
+def read_fleet(factory_contract, vaults=None) -> list[VaultMigration]:
+    """Vaults of the factory with the reward balances of their harvesters"""
+    records = []
+    vault_count = factory_contract.vaults_deployed()
+    for start_id in range(1, vault_count + 1, RECORD_PAGE_SIZE):
+        records += factory_contract.get_vault_records(
+            start_id, RECORD_PAGE_SIZE
+        )
+
+    migrations = []
+    for record in records:
+        if record.harvester == ZERO_ADDRESS:
+            continue
+        if vaults is not None and record.vault not in vaults:
+            continue
+        migrations.append(
+            VaultMigration(
+                vault=record.vault,
+                strategy=record.strategy,
+                harvester=record.harvester,
+                stranded={
+                    token: _erc20(token).balanceOf(record.harvester)
+                    for token in reward_tokens(record.strategy)
+                },
+            )
+        )
+    return migrations
+
+
+def dry_run(
+    factory_contract, migration: VaultMigration, harvester_index: int
+) -> VaultMigration:
+    """Migrate a single vault on a snapshot and check its stranded tokens"""
+    with boa.env.anchor(), boa.env.prank(factory_contract.owner()):
+        try:
+            (new_harvester,) = factory_contract.migrate_harvesters(
+                [migration.vault], harvester_index, migration.tokens
+            )
+        except BoaError as e:
+            return replace(migration, error=str(e).splitlines()[0])
+        gas_used = factory_contract._computation.get_gas_used()
+
+        harvester = _static_call(migration.strategy, "harvester()", "address")
+        if harvester != new_harvester:
+            return replace(migration, error="Harvester not updated")
+        for token in migration.tokens:
+            forwarded = _erc20(token).balanceOf(new_harvester)
+            left = _erc20(token).balanceOf(migration.harvester)
+            if forwarded < migration.stranded[token] or left > 0:
+                return replace(migration, error=f"{token} not forwarded")
+    return replace(migration, gas_used=gas_used, error=None)
+
+
+_worker_factory = None
+
+
+def _init_worker(rpc_url: str, block: int, factory_address: str, abi: list):
+    global _worker_factory
+    boa.fork(rpc_url, block_identifier=block)
+    _worker_factory = ABIContractFactory("factory", abi).at(factory_address)
+
+
+def _dry_run_worker(args) -> VaultMigration:
+    migration, harvester_index = args
+    return dry_run(_worker_factory, migration, harvester_index)
+
+
+def dry_run_fleet(
+    factory_contract,
+    migrations: list[VaultMigration],
+    checkpoint: Checkpoint,
+    workers: int = 0,
+    rpc_url: str | None = None,
+) -> list[VaultMigration]:
+    """
+    Dry-run every migration not already in the checkpoint, in a pool of
+    `workers` processes forking `checkpoint.block` (in process if 0)
+    """
+    pending = [m for m in migrations if m.vault not in checkpoint.dry_runs]
+    args = [(m, checkpoint.harvester_index) for m in pending]
+    if workers and pending:
+        with ProcessPoolExecutor(
+            workers,
+            mp_context=multiprocessing.get_context("spawn"),
+            initializer=_init_worker,
+            initargs=(
+                rpc_url,
+                checkpoint.block,
+                factory_contract.address,
+                factory_contract.abi,
+            ),
+        ) as pool:
+            results = pool.map(_dry_run_worker, args)
+            for result in results:
+                checkpoint.dry_runs[result.vault] = result
+                checkpoint.save()
+    else:
+        for migration, harvester_index in args:
+            result = dry_run(factory_contract, migration, harvester_index)
+            checkpoint.dry_runs[result.vault] = result
+            checkpoint.save()
+    return [checkpoint.dry_runs[m.vault] for m in migrations]
+
+
+def plan_batches(
+    migrations: list[VaultMigration],
+    max_batch_size: int = MAX_MIGRATION_BATCH,
+    max_gas: int = DEFAULT_MAX_BATCH_GAS,
+) -> list[MigrationBatch]:
+    """
+    Group successful dry runs into `migrate_harvesters` calls. Vaults with
+    the same stranded tokens are packed together; a batch forwards the
+    union of its vaults' tokens (zero balances are skipped on-chain).
+    """
+    batches: list[MigrationBatch] = []
+    for migration in sorted(
+        (m for m in migrations if m.error is None),
+        key=lambda m: (len(m.tokens), m.tokens, m.vault),
+    ):
+        batch = batches[-1] if batches else None
+        tokens = (
+            sorted(set(batch.migration_tokens) | set(migration.tokens))
+            if batch
+            else []
+        )
+        if (
+            batch is None
+            or len(batch.migrations) >= max_batch_size
+            or batch.gas + migration.gas_used > max_gas
+            or len(tokens) > MAX_MIGRATION_TOKENS
+        ):
+            batches.append(
+                MigrationBatch(
+                    [migration], migration.tokens, migration.gas_used
+                )
+            )
+            continue
+        batch.migrations.append(migration)
+        batch.migration_tokens = tokens
+        batch.gas += migration.gas_used
+    return batches
+
+
+def write_plan(path, factory_contract, checkpoint, batches, migrations):
+    plan = {
+        "factory": factory_contract.address,
+        "harvester_index": checkpoint.harvester_index,
+        "block": checkpoint.block,
+        "batches": [
+            {
+                "vaults": batch.vaults,
+                "strategies": [m.strategy for m in batch.migrations],
+                "harvesters": [m.harvester for m in batch.migrations],
+                "migration_tokens": batch.migration_tokens,
+                "gas": batch.gas,
+                "calldata": "0x"
+                + factory_contract.migrate_harvesters.prepare_calldata(
+                    batch.vaults,
+                    checkpoint.harvester_index,
+                    batch.migration_tokens,
+                ).hex(),
+            }
+            for batch in batches
+        ],
+        "failed": [
+            {"vault": m.vault, "error": m.error}
+            for m in migrations
+            if m.error is not None
+        ],
+        "stranded": {m.vault: m.stranded for m in migrations},
+    }
+    with open(path, "w") as f:
+        json.dump(plan, f, indent=2)
+    return plan
+
+
+def plan_key(plan: dict) -> str:
+    """Identifies a plan by its factory, block and batch calldata"""
+    content = json.dumps(
+        [
+            plan["factory"],
+            plan["block"],
+            [batch["calldata"] for batch in plan["batches"]],
+        ]
     )
-    print(
-        f"Balance of CVX of old harvester: {cvx_token.balanceOf(CURRENT_HARVESTER)}"
+    return hashlib.sha256(content.encode()).hexdigest()
+
+
+def execute_plan(factory_contract, plan: dict, checkpoint: Checkpoint):
+    """
+    Send every batch of `plan` not yet in the checkpoint. Vaults that no
+    longer use their planned harvester (e.g. a batch mined before the
+    checkpoint was written) are left out.
+    """
+    executed = checkpoint.executed.setdefault(plan_key(plan), {})
+    for i, batch in enumerate(plan["batches"]):
+        if str(i) in executed:
+            continue
+        vaults = [
+            vault
+            for vault, strategy, harvester in zip(
+                batch["vaults"], batch["strategies"], batch["harvesters"]
+            )
+            if _static_call(strategy, "harvester()", "address") == harvester
+        ]
+        new_harvesters = []
+        if vaults:
+            print(f"Migrating batch {i}: {len(vaults)} vaults")
+            new_harvesters = factory_contract.migrate_harvesters(
+                vaults, plan["harvester_index"], batch["migration_tokens"]
+            )
+        executed[str(i)] = {
+            "vaults": vaults,
+            "new_harvesters": list(new_harvesters),
+        }
+        checkpoint.save()
+
+
+def plan_migration(
+    factory_contract,
+    harvester_index: int,
+    plan_path: str,
+    checkpoint_path: str,
+    vaults=None,
+    workers: int = 0,
+    rpc_url: str | None = None,
+) -> dict:
+    block = boa.env.evm.patch.block_number
+    checkpoint = Checkpoint(checkpoint_path, block, harvester_index)
+    migrations = dry_run_fleet(
+        factory_contract,
+        read_fleet(factory_contract, vaults),
+        checkpoint,
+        workers,
+        rpc_url,
     )
-    vault.update_harvester(new_harvester, [CRV_TOKEN, CVX_TOKEN])
-    print(
-        f"Balance of CRV of new harvester: {crv_token.balanceOf(new_harvester)}"
+    batches = plan_batches(migrations)
+    plan = write_plan(
+        plan_path, factory_contract, checkpoint, batches, migrations
     )
     print(
-        f"Balance of CVX of new harvester: {cvx_token.balanceOf(new_harvester)}"
+        f"{sum(len(b.migrations) for b in batches)} vaults in "
+        f"{len(batches)} transactions, {len(plan['failed'])} failed dry runs"
     )
-    print()
+    for failure in plan["failed"]:
+        print(f"  {failure['vault']}: {failure['error']}")
+    return plan
 
 
 def moccasin_main():
-    return deploy()
+    # imported here so that dry run workers do not compile the contracts
+    from src import factory
+
+    factory_contract = factory.at(os.environ.get("MIGRATION_FACTORY", FACTORY))
+    plan_path = os.environ.get("MIGRATION_PLAN", "migration_plan.json")
+    checkpoint_path = os.environ.get(
+        "MIGRATION_CHECKPOINT", "migration_checkpoint.json"
+    )
+
+    if os.environ.get("MIGRATION_MODE", "plan") == "execute":
+        with open(plan_path) as f:
+            plan = json.load(f)
+        checkpoint = Checkpoint(
+            checkpoint_path, plan["block"], plan["harvester_index"]
+        )
+        return execute_plan(factory_contract, plan, checkpoint)
+
+    harvester_index = int(
+        os.environ.get(
+            "HARVESTER_INDEX", factory_contract.harvester_count() - 1
+        )
+    )
+    vaults = os.environ.get("MIGRATION_VAULTS")
+    return plan_migration(
+        factory_contract,
+        harvester_index,
+        plan_path,
+        checkpoint_path,
+        vaults=(
+            [to_checksum_address(v) for v in vaults.split(",")]
+            if vaults
+            else None
+        ),
+        workers=int(os.environ.get("MIGRATION_WORKERS", os.cpu_count())),
+        rpc_url=moccasin.config.get_active_network().url,
+    )
@@ -0,0 +1,413 @@
+"""
+Watch-tower stand-in for the CoW harvesters deployed by a vault factory.
+
+Every CoW harvester registered in the factory is polled with
+`getTradeableOrder` for each of its sell tokens. Tradeable orders are
+appended to a JSON lines file, `PollTryAtEpoch` (and the other ComposableCoW
+poll hints) schedule the next poll of a token, and at most `max_concurrency`
+calls are in flight at any time.
+
+Usage:
+    python -m script.watch_tower --factory 0x... --out orders.jsonl [--once]
+"""
+
+import argparse
+import asyncio
+import heapq
+import itertools
+import json
+import os
+import time
+from dataclasses import dataclass
+
+import requests
+from eth_abi import decode, encode
+from eth_utils import (
+    function_signature_to_4byte_selector,
+    keccak,
+    to_checksum_address,
+)
+
+from script.constants import CRV_TOKEN, CVX_TOKEN
+from script.gpv2 import (
+    GPV2_ORDER_TUPLE,
+    gpv2_order_hash,
+)
+
+COMPOSABLE_COW = "0xfdaFc9d1902f4e0b84f65F49f244b32b31013b74"
+GET_TRADEABLE_ORDER_INTERFACE = bytes.fromhex("b8296fc4")
+ZERO_ADDRESS = "0x0000000000000000000000000000000000000000"
+RECORD_PAGE_SIZE = 500
+BLOCK_TIME = 12
+# delay before polling again after an unexpected error
+RETRY_DELAY = 60
+
+GPV2_ORDER_FIELDS = [
+    "sellToken",
+    "buyToken",
+    "receiver",
+    "sellAmount",
+    "buyAmount",
+    "validTo",
+    "appData",
+    "feeAmount",
+    "kind",
+    "partiallyFillable",
+    "sellTokenBalance",
+    "buyTokenBalance",
+]
+CONDITIONAL_ORDER_CREATED_TOPIC = keccak(
+    text="ConditionalOrderCreated(address,(address,bytes32,bytes))"
+)
+
+
+def _selector(signature: str) -> bytes:
+    return function_signature_to_4byte_selector(signature)
+
+
+POLL_TRY_NEXT_BLOCK = _selector("PollTryNextBlock(string)")
+POLL_TRY_AT_BLOCK = _selector("PollTryAtBlock(uint256,string)")
+POLL_TRY_AT_EPOCH = _selector("PollTryAtEpoch(uint256,string)")
+POLL_NEVER = _selector("PollNever(string)")
+ORDER_NOT_VALID = _selector("OrderNotValid(string)")
+
+
+class CallReverted(Exception):
+    def __init__(self, data: bytes):
+        super().__init__(f"execution reverted: 0x{data.hex()}")
+        self.data = data
+
+
+class JsonRpcClient:
+    """Minimal JSON-RPC client, safe to share between threads"""
+
+    def __init__(self, url: str, timeout: int = 30):
+        self.url = url
+        self.timeout = timeout
+        self._ids = itertools.count()
+
+    def _request(self, method: str, params: list):
+        response = requests.post(
+            self.url,
+            json={
+                "jsonrpc": "2.0",
+                "id": next(self._ids),
+                "method": method,
+                "params": params,
+            },
+            timeout=self.timeout,
+        )
+        response.raise_for_status()
+        payload = response.json()
+        if "error" in payload:
+            error = payload["error"]
+            data = error.get("data")
+            if isinstance(data, dict):
+                data = data.get("data")
+            if isinstance(data, str) and data.startswith("0x"):
+                raise CallReverted(bytes.fromhex(data[2:]))
+            raise RuntimeError(f"{method} failed: {error}")
+        return payload["result"]
+
+    def eth_call(self, to: str, data: bytes) -> bytes:
+        result = self._request(
+            "eth_call", [{"to": to, "data": "0x" + data.hex()}, "latest"]
+        )
+        return bytes.fromhex(result[2:])
+
+    def block_timestamp(self) -> int:
+        block = self._request("eth_getBlockByNumber", ["latest", False])
+        return int(block["timestamp"], 16)
+
+    def chain_id(self) -> int:
+        return int(self._request("eth_chainId", []), 16)
+
+    def get_logs(
+        self, address: str, topics: list, from_block: int
+    ) -> list[dict]:
+        return self._request(
+            "eth_getLogs",
+            [
+                {
+                    "address": address,
+                    "topics": topics,
+                    "fromBlock": hex(from_block),
+                    "toBlock": "latest",
+                }
+            ],
+        )
+
+
+@dataclass(order=True)
+class PollTask:
+    next_poll: int
+    harvester: str
+    sell_token: str
+
+
+@dataclass
+class PollResult:
+    task: PollTask
+    order: dict | None = None
+    next_poll: int | None = None
+    reason: str = ""
+
+
+def parse_poll_hint(data: bytes, now: int) -> tuple[int | None, str]:
+    """
+    Translate a `getTradeableOrder` revert into the time of the next poll
+    (None to stop polling) and a reason
+    """
+    selector, args = data[:4], data[4:]
+    if selector == POLL_TRY_AT_EPOCH:
+        epoch, reason = decode(["uint256", "string"], args)
+        return max(epoch, now), reason
+    if selector == POLL_TRY_AT_BLOCK:
+        # blocks are converted to time since tasks are scheduled by timestamp
+        _, reason = decode(["uint256", "string"], args)
+        return now + BLOCK_TIME, reason
+    if selector == POLL_TRY_NEXT_BLOCK:
+        (reason,) = decode(["string"], args)
+        return now + BLOCK_TIME, reason
+    if selector == POLL_NEVER:
+        (reason,) = decode(["string"], args)
+        return None, reason
+    if selector == ORDER_NOT_VALID:
+        (reason,) = decode(["string"], args)
+        return now + RETRY_DELAY, reason
+    return now + RETRY_DELAY, f"reverted: 0x{data.hex()}"
+
+
+def encode_get_tradeable_order(harvester: str, sell_token: str) -> bytes:
+    return _selector(
+        "getTradeableOrder(address,address,bytes32,bytes,bytes)"
+    ) + encode(
+        ["address", "address", "bytes32", "bytes", "bytes"],
+        [
+            harvester,
+            ZERO_ADDRESS,
+            b"\x00" * 32,
+            bytes.fromhex(sell_token[2:]),
+            b"",
+        ],
+    )
+
+
+def discover_cow_harvesters(rpc, factory: str) -> list[str]:
+    """CoW harvesters of every vault registered in the factory"""
+    (vault_count,) = decode(
+        ["uint256"], rpc.eth_call(factory, _selector("vaults_deployed()"))
+    )
+    harvesters = []
+    for start_id in range(1, vault_count + 1, RECORD_PAGE_SIZE):
+        (records,) = decode(
+            ["(address,uint256,address,address,address)[]"],
+            rpc.eth_call(
+                factory,
+                _selector("get_vault_records(uint256,uint256)")
+                + encode(["uint256", "uint256"], [start_id, RECORD_PAGE_SIZE]),
+            ),
+        )
+        for _, _, _, harvester, _ in records:
+            if harvester != ZERO_ADDRESS and is_cow_harvester(rpc, harvester):
+                harvesters.append(to_checksum_address(harvester))
+    return harvesters
+
+
+def is_cow_harvester(rpc, harvester: str) -> bool:
+    """
+    Whether `harvester` serves CoW orders. Other harvesters fail in their
+    non-reentrant fallback, which burns all the gas of a static call: the
+    node reports it as an error without revert data.
+    """
+    try:
+        result = rpc.eth_call(
+            harvester,
+            _selector("supportsInterface(bytes4)")
+            + encode(["bytes4"], [GET_TRADEABLE_ORDER_INTERFACE]),
+        )
+    except (CallReverted, RuntimeError):
+        return False
+    return len(result) == 32 and decode(["bool"], result)[0]
+
+
+def discover_sell_tokens(
+    rpc, harvesters: list[str], from_block: int | None
+) -> dict[str, set[str]]:
+    """
+    Sell tokens per harvester: CRV and CVX, plus the static input of every
+    conditional order created on ComposableCoW since `from_block`
+    """
+    tokens = {harvester: {CRV_TOKEN, CVX_TOKEN} for harvester in harvesters}
+    if from_block is None or not harvesters:
+        return tokens
+    owners = {
+        "0x" + encode(["address"], [harvester]).hex(): harvester
+        for harvester in harvesters
+    }
+    logs = rpc.get_logs(
+        COMPOSABLE_COW,
+        ["0x" + CONDITIONAL_ORDER_CREATED_TOPIC.hex(), list(owners)],
+        from_block,
+    )
+    for log in logs:
+        ((_, _, static_input),) = decode(
+            ["(address,bytes32,bytes)"], bytes.fromhex(log["data"][2:])
+        )
+        if len(static_input) == 20:
+            harvester = owners[log["topics"][1].lower()]
+            tokens[harvester].add(to_checksum_address(static_input))
+    return tokens
+
+
+class WatchTower:
+    def __init__(
+        self,
+        rpc,
+        harvesters: dict[str, set[str]],
+        out_path: str,
+        max_concurrency: int = 16,
+        domain_separator: bytes | None = None,
+    ):
+        self.rpc = rpc
+        self.out_path = out_path
+        self.max_concurrency = max_concurrency
+        self.domain_separator = domain_separator
+        self.queue: list[PollTask] = [
+            PollTask(0, harvester, token)
+            for harvester, tokens in harvesters.items()
+            for token in sorted(tokens)
+        ]
+        heapq.heapify(self.queue)
+        # orders already written, forgotten once they expire
+        self._seen: set[tuple] = set()
+        self._expiries: list[tuple[int, tuple]] = []
+
+    def _poll(self, task: PollTask, now: int) -> PollResult:
+        try:
+            output = self.rpc.eth_call(
+                task.harvester,
+                encode_get_tradeable_order(task.harvester, task.sell_token),
+            )
+        except CallReverted as e:
+            next_poll, reason = parse_poll_hint(e.data, now)
+            return PollResult(task, next_poll=next_poll, reason=reason)
+        except Exception as e:
+            return PollResult(task, next_poll=now + RETRY_DELAY, reason=str(e))
+
+        (values,) = decode([GPV2_ORDER_TUPLE], output)
+        order = dict(zip(GPV2_ORDER_FIELDS, values))
+        # poll again once the order (or the current part of a sliced order)
+        # has expired
+        return PollResult(
+            task, order=order, next_poll=max(order["validTo"], now + 1)
+        )
+
+    def _record(self, result: PollResult, now: int) -> bool:
+        values = tuple(result.order[f] for f in GPV2_ORDER_FIELDS)
+        key = (result.task.harvester, values)
+        if key in self._seen:
+            return False
+        self._seen.add(key)
+        heapq.heappush(self._expiries, (result.order["validTo"], key))
+        entry = {
+            "owner": result.task.harvester,
+            "polled_at": now,
+            **{
+                f: ("0x" + v.hex() if isinstance(v, bytes) else v)
+                for f, v in result.order.items()
+            },
+        }
+        if self.domain_separator is not None:
+            entry["order_hash"] = (
+                "0x" + gpv2_order_hash(values, self.domain_separator).hex()
+            )
+        with open(self.out_path, "a") as f:
+            f.write(json.dumps(entry) + "\n")
+        return True
+
+    def _forget_expired(self, now: int):
+        while self._expiries and self._expiries[0][0] <= now:
+            self._seen.discard(heapq.heappop(self._expiries)[1])
+
+    async def poll_due(self) -> list[PollResult]:
+        """Poll every task that is due and reschedule it"""
+        now = await asyncio.to_thread(self.rpc.block_timestamp)
+        self._forget_expired(now)
+        due = []
+        while self.queue and self.queue[0].next_poll <= now:
+            due.append(heapq.heappop(self.queue))
+
+        semaphore = asyncio.Semaphore(self.max_concurrency)
+
+        async def bounded(task):
+            async with semaphore:
+                return await asyncio.to_thread(self._poll, task, now)
+
+        results = await asyncio.gather(*(bounded(task) for task in due))
+        for result in results:
+            if result.order is not None:
+                self._record(result, now)
+            if result.next_poll is not None:
+                heapq.heappush(
+                    self.queue,
+                    PollTask(
+                        result.next_poll,
+                        result.task.harvester,
+                        result.task.sell_token,
+                    ),
+                )
+        return results
+
+    async def run(self, interval: int = BLOCK_TIME):
+        while self.queue:
+            results = await self.poll_due()
+            orders = sum(result.order is not None for result in results)
+            print(f"Polled {len(results)} orders, {orders} tradeable")
+            await asyncio.sleep(interval)
+
+
+def _parse_args():
+    parser = argparse.ArgumentParser(description=__doc__.split("\n\n")[0])
+    parser.add_argument("--factory", required=True)
+    parser.add_argument("--rpc-url", default=os.environ.get("MAINNET_RPC_URL"))
+    parser.add_argument("--out", default="orders.jsonl")
+    parser.add_argument("--from-block", type=int, default=None)
+    parser.add_argument("--max-concurrency", type=int, default=16)
+    parser.add_argument("--interval", type=int, default=BLOCK_TIME)
+    parser.add_argument("--once", action="store_true")
+    return parser.parse_args()
+
+
+def main():
+    args = _parse_args()
+    rpc = JsonRpcClient(args.rpc_url)
+    harvesters = discover_cow_harvesters(rpc, args.factory)
+    print(f"Found {len(harvesters)} CoW harvesters")
+    # the domain separator is the same for every harvester
+    domain_separator = None
+    if harvesters:
+        domain_separator = rpc.eth_call(
+            harvesters[0], _selector("GPV2_DOMAIN_SEPARATOR()")
+        )
+    watch_tower = WatchTower(
+        rpc,
+        discover_sell_tokens(rpc, harvesters, args.from_block),
+        args.out,
+        max_concurrency=args.max_concurrency,
+        domain_separator=domain_separator,
+    )
+    start = time.time()
+    if args.once:
+        results = asyncio.run(watch_tower.poll_due())
+        orders = sum(result.order is not None for result in results)
+        print(
+            f"Polled {len(results)} orders in {time.time() - start:.2f}s, "
+            f"{orders} tradeable"
+        )
+        return
+    asyncio.run(watch_tower.run(args.interval))
+
+
+if __name__ == "__main__":
+    main()
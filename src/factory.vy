@@ -12,10 +12,14 @@
      - Harvester: Processes rewards, swaps tokens, and distributes platform fees
      Each vault targets a specific Convex Booster pool and automatically compounds
      CRV/CVX rewards back into the underlying LP position.
+     All contracts are deployed with CREATE2 using salts derived from the deployer,
+     booster id, harvester index and the deployer's nonce, so their addresses can be
+     computed ahead of deployment with the `compute_*` views.
 """
 
 from src.modules import constants
 from src.modules.utils import conversion
+from src.modules.utils import blueprint
 from src.interfaces import IStrategy
 from src.interfaces import IVault
 from src.interfaces import IBooster
@@ -30,6 +34,14 @@ interface IERC20Detailed:
 
 
 initializes: ownable
+
+# maximum number of records returned by the paginated registry views
+MAX_PAGE_SIZE: constant(uint256) = 500
+# maximum number of vaults migrated in a single call
+MAX_MIGRATION_BATCH: constant(uint256) = 50
+# maximum number of harvesters claimed from in a single call
+MAX_CLAIM_BATCH: constant(uint256) = 50
+
 exports: (ownable.transfer_ownership, ownable.renounce_ownership, ownable.owner)
 
 
@@ -68,6 +80,16 @@ event HarvesterAdded:
     implementation: address
 
 
+event FeesClaimed:
+    recipient: indexed(address)
+    amount: uint256
+
+
+event DelegatedHookUpdated:
+    hook: indexed(address)
+    allowed: bool
+
+
 VAULT_IMPLEMENTATION: public(immutable(address))
 STRATEGY_IMPLEMENTATION: public(immutable(address))
 
@@ -77,8 +99,28 @@ vault_registry: public(HashMap[uint256, VaultRecord])
 vaults_deployed: public(uint256)
 vault_to_id: public(HashMap[address, uint256])
 
+# secondary registry indexes
+# booster id => position => vault id
+booster_id_vaults: HashMap[uint256, HashMap[uint256, uint256]]
+booster_id_vault_count: public(HashMap[uint256, uint256])
+# vault id => position in its booster id index
+booster_id_position: HashMap[uint256, uint256]
+# LP token => position => vault id
+token_vaults: HashMap[address, HashMap[uint256, uint256]]
+token_vault_count: public(HashMap[address, uint256])
+harvester_to_id: public(HashMap[address, uint256])
+
 harvesters: public(DynArray[Harvester, 100])
 
+# number of CREATE2 deployments made by each deployer, part of the salt
+deploy_nonces: public(HashMap[address, uint256])
+
+# harvester instances deployed by the factory, whose accrued fees it holds
+deployed_harvesters: public(HashMap[address, bool])
+
+# target hooks the harvesters delegatecall instead of calling
+delegated_hooks: public(HashMap[address, bool])
+
 
 @external
 @view
@@ -161,7 +203,10 @@ def deploy_new_vault(
         - If seed > 0 and caller hasn't approved factory for asset transfer.
     """
 
-    deployed_harvester: address = self._deploy_harvester(_harvester_index)
+    salt: bytes32 = self._vault_salt(
+        msg.sender, _booster_id, _harvester_index, self._use_nonce(msg.sender)
+    )
+    deployed_harvester: address = self._deploy_harvester(_harvester_index, salt)
 
     # transaction will revert if id booster is incorrect
     pool_info: (address, address, address, address, address, bool) = staticcall IBooster(
@@ -194,6 +239,7 @@ def deploy_new_vault(
         pool_reward_contract,
         deployed_harvester,
         _booster_id,
+        salt=salt,
     )
     deployed_vault: address = create_from_blueprint(
         VAULT_IMPLEMENTATION,
@@ -205,6 +251,7 @@ def deploy_new_vault(
         vault_symbol,
         deployed_strategy,
         _profit_max_unlock_time,
+        salt=salt,
     )
 
 
@@ -241,6 +288,11 @@ def deploy_new_vault(
     )
 
     self.vault_to_id[deployed_vault] = self.vaults_deployed
+    self.harvester_to_id[deployed_harvester] = self.vaults_deployed
+    self._add_to_booster_id_index(_booster_id, self.vaults_deployed)
+    token_position: uint256 = self.token_vault_count[pool_asset]
+    self.token_vaults[pool_asset][token_position] = self.vaults_deployed
+    self.token_vault_count[pool_asset] = token_position + 1
 
     log VaultDeployed(
         id=self.vaults_deployed,
@@ -258,6 +310,27 @@ def deploy_new_vault(
     return deployed_vault, deployed_strategy, deployed_harvester
 
 
+@internal
+def _add_to_booster_id_index(_booster_id: uint256, _vault_id: uint256):
+    position: uint256 = self.booster_id_vault_count[_booster_id]
+    self.booster_id_vaults[_booster_id][position] = _vault_id
+    self.booster_id_position[_vault_id] = position
+    self.booster_id_vault_count[_booster_id] = position + 1
+
+
+@internal
+def _remove_from_booster_id_index(_booster_id: uint256, _vault_id: uint256):
+    # swap and pop: move the last entry into the removed entry's position
+    last_position: uint256 = self.booster_id_vault_count[_booster_id] - 1
+    position: uint256 = self.booster_id_position[_vault_id]
+    if position != last_position:
+        last_vault_id: uint256 = self.booster_id_vaults[_booster_id][last_position]
+        self.booster_id_vaults[_booster_id][position] = last_vault_id
+        self.booster_id_position[last_vault_id] = position
+    self.booster_id_vaults[_booster_id][last_position] = 0
+    self.booster_id_vault_count[_booster_id] = last_position
+
+
 @external
 def set_treasury(_new_treasury: address):
     """
@@ -270,6 +343,44 @@ def set_treasury(_new_treasury: address):
     log TreasuryUpdated(treasury=_new_treasury)
 
 
+@external
+def set_delegated_hook(_hook: address, _allowed: bool):
+    """
+    @notice Allow or disallow harvesters to delegatecall a target hook (owner only)
+    @dev Delegated hooks run with the harvester's balances and storage, so only
+         audited hooks that declare no storage should be allowed. Revoking a hook
+         takes effect on the next harvest of every harvester using it.
+    @param _hook Target hook address
+    @param _allowed Whether the hook is delegatecalled
+    """
+    ownable._check_owner()
+    self.delegated_hooks[_hook] = _allowed
+    log DelegatedHookUpdated(hook=_hook, allowed=_allowed)
+
+
+@external
+def claim_fees(_harvesters: DynArray[address, MAX_CLAIM_BATCH]) -> uint256:
+    """
+    @notice Claim the crvUSD fees accrued to the caller by a batch of harvesters
+    @dev Harvesters with fee accrual enabled send their fees to the factory and keep a
+         ledger of the amounts owed, the claim clears the caller's entries and pays
+         them out in a single transfer. The treasury also receives the platform fees.
+    @param _harvesters Factory-deployed harvesters to claim from
+    @return Amount of crvUSD paid to the caller
+    @custom:reverts
+        - If a harvester was not deployed by the factory
+    """
+    is_treasury: bool = msg.sender == self.treasury
+    amount: uint256 = 0
+    for harvester: address in _harvesters:
+        assert self.deployed_harvesters[harvester], "Unknown harvester"
+        amount += extcall IHarvester(harvester).take_fees(msg.sender, is_treasury)
+    if amount > 0:
+        assert extcall IERC20(constants.CRVUSD_TOKEN).transfer(msg.sender, amount)
+    log FeesClaimed(recipient=msg.sender, amount=amount)
+    return amount
+
+
 @internal
 def _add_harvester(_protocol: String[32], _implementation: address) -> uint256:
     assert _implementation != empty(address), "Implementation cannot be empty"
@@ -291,11 +402,35 @@ def add_harvester(_protocol: String[32], _implementation: address) -> uint256:
 
 
 @internal
-def _deploy_harvester(_harvester_index: uint256) -> address:
+def _use_nonce(_deployer: address) -> uint256:
+    nonce: uint256 = self.deploy_nonces[_deployer]
+    self.deploy_nonces[_deployer] = nonce + 1
+    return nonce
+
+
+@internal
+@pure
+def _vault_salt(
+    _deployer: address, _booster_id: uint256, _harvester_index: uint256, _nonce: uint256
+) -> bytes32:
+    return keccak256(abi_encode(_deployer, _booster_id, _harvester_index, _nonce))
+
+
+@internal
+@pure
+def _harvester_salt(
+    _deployer: address, _vault: address, _harvester_index: uint256, _nonce: uint256
+) -> bytes32:
+    return keccak256(abi_encode(_deployer, _vault, _harvester_index, _nonce))
+
+
+@internal
+def _deploy_harvester(_harvester_index: uint256, _salt: bytes32) -> address:
     # Get harvester implementation by index
     assert _harvester_index < len(self.harvesters), "Invalid harvester index"
     harvester_impl: address = self.harvesters[_harvester_index].implementation
-    deployed_harvester: address = create_from_blueprint(harvester_impl, self)
+    deployed_harvester: address = create_from_blueprint(harvester_impl, self, salt=_salt)
+    self.deployed_harvesters[deployed_harvester] = True
     extcall IHarvester(deployed_harvester).set_approvals()
     log HarvesterDeployed(index=_harvester_index, harvester=deployed_harvester)
     return deployed_harvester
@@ -315,14 +450,210 @@ def deploy_harvester_instance(_harvester_index: uint256, _vault: address) -> add
         - If the harvester index is invalid (>= harvesters array length)
         - If the vault is not factory-deployed
     """
+    return self._deploy_harvester_instance(_harvester_index, _vault)
+
+
+@internal
+def _deploy_harvester_instance(_harvester_index: uint256, _vault: address) -> address:
     vault_id: uint256 = self.vault_to_id[_vault]
     assert self.vault_registry[vault_id].vault == _vault, "Vault not factory deployed"
 
-    deployed_harvester: address = self._deploy_harvester(_harvester_index)
+    salt: bytes32 = self._harvester_salt(
+        msg.sender, _vault, _harvester_index, self._use_nonce(msg.sender)
+    )
+    deployed_harvester: address = self._deploy_harvester(_harvester_index, salt)
     extcall IHarvester(deployed_harvester).set_strategy(self.vault_registry[vault_id].strategy)
     return deployed_harvester
 
 
+@external
+def migrate_harvesters(
+    _vaults: DynArray[address, MAX_MIGRATION_BATCH],
+    _harvester_index: uint256,
+    _migration_tokens: DynArray[address, constants.MAX_REWARD_TOKENS + 2] = [],
+) -> DynArray[address, MAX_MIGRATION_BATCH]:
+    """
+    @notice Move a batch of vaults to fresh instances of a harvester implementation
+            (owner only)
+    @dev The factory holds the DEFAULT_ADMIN_ROLE on the vaults it deployed, so it
+         calls each vault's update_harvester, which forwards stranded tokens, rolls
+         over the hooks and calls back into update_harvester to update the registry.
+         Vaults whose admin role was revoked from the factory will revert the batch.
+    @param _vaults Addresses of the factory-deployed vaults to migrate
+    @param _harvester_index Index of the harvester implementation in the harvesters array
+    @param _migration_tokens Tokens to forward from each old harvester to its replacement
+    @return Addresses of the newly deployed harvesters, in the order of `_vaults`
+    @custom:reverts
+        - If the caller is not the owner
+        - If the harvester index is invalid
+        - If a vault is not factory-deployed
+    """
+    ownable._check_owner()
+    new_harvesters: DynArray[address, MAX_MIGRATION_BATCH] = []
+    for vault: address in _vaults:
+        new_harvester: address = self._deploy_harvester_instance(_harvester_index, vault)
+        extcall IVault(vault).update_harvester(new_harvester, _migration_tokens)
+        new_harvesters.append(new_harvester)
+    return new_harvesters
+
+
+@internal
+@view
+def _compute_harvester_address(_harvester_index: uint256, _salt: bytes32) -> address:
+    assert _harvester_index < len(self.harvesters), "Invalid harvester index"
+    return blueprint._compute_address(
+        self.harvesters[_harvester_index].implementation, abi_encode(self), _salt
+    )
+
+
+@external
+@view
+def compute_vault_addresses(
+    _deployer: address,
+    _booster_id: uint256,
+    _harvester_index: uint256,
+    _nonce: uint256,
+    _profit_max_unlock_time: uint256 = 604800,
+) -> (address, address, address):
+    """
+    @notice Compute the addresses `deploy_new_vault` will deploy to
+    @dev The vault's init code embeds the pool's LP symbol and the strategy's
+         embeds the Booster reward contract, so both are read on-chain.
+         The next deployment of `_deployer` uses `deploy_nonces(_deployer)`.
+    @param _deployer Address that will call `deploy_new_vault`
+    @param _booster_id The Convex Booster id of the pool
+    @param _harvester_index Index of the harvester implementation in the harvesters array
+    @param _nonce Deployment nonce of the deployer
+    @param _profit_max_unlock_time Profit unlock time the vault will be deployed with
+    @return vault The vault contract address.
+    @return strategy The strategy contract address.
+    @return harvester The harvester contract address.
+    """
+    salt: bytes32 = self._vault_salt(_deployer, _booster_id, _harvester_index, _nonce)
+    harvester: address = self._compute_harvester_address(_harvester_index, salt)
+
+    pool_info: (address, address, address, address, address, bool) = staticcall IBooster(
+        constants.CONVEX_BOOSTER
+    ).poolInfo(_booster_id)
+    pool_asset: address = pool_info[0]
+
+    strategy_address: address = blueprint._compute_address(
+        STRATEGY_IMPLEMENTATION,
+        abi_encode(pool_asset, pool_info[3], harvester, _booster_id),
+        salt,
+    )
+
+    vault_token_name: String[25] = concat("RAAC-", staticcall IERC20Detailed(pool_asset).symbol())
+    vault_symbol: String[5] = conversion.uint_to_str5(_booster_id)
+    vault: address = blueprint._compute_address(
+        VAULT_IMPLEMENTATION,
+        abi_encode(
+            vault_token_name,
+            vault_symbol,
+            pool_asset,
+            empty(uint256),
+            vault_token_name,
+            vault_symbol,
+            strategy_address,
+            _profit_max_unlock_time,
+        ),
+        salt,
+    )
+    return vault, strategy_address, harvester
+
+
+@external
+@view
+def compute_harvester_instance_address(
+    _deployer: address, _vault: address, _harvester_index: uint256, _nonce: uint256
+) -> address:
+    """
+    @notice Compute the address `deploy_harvester_instance` will deploy to
+    @param _deployer Address that will call `deploy_harvester_instance`
+    @param _vault Address of the factory-deployed vault
+    @param _harvester_index Index of the harvester implementation in the harvesters array
+    @param _nonce Deployment nonce of the deployer
+    @return The harvester contract address
+    """
+    return self._compute_harvester_address(
+        _harvester_index, self._harvester_salt(_deployer, _vault, _harvester_index, _nonce)
+    )
+
+
+@external
+@view
+def get_vault_records(_start_id: uint256, _limit: uint256) -> DynArray[VaultRecord, MAX_PAGE_SIZE]:
+    """
+    @notice Get a page of vault records ordered by id
+    @dev Vault ids start at 1. The page stops at the last deployed vault.
+    @param _start_id Id of the first record to return
+    @param _limit Maximum number of records to return (capped at MAX_PAGE_SIZE)
+    @return Array of vault records
+    """
+    assert _start_id > 0, "Vault ids start at 1"
+    records: DynArray[VaultRecord, MAX_PAGE_SIZE] = []
+    last_id: uint256 = self.vaults_deployed
+    for i: uint256 in range(MAX_PAGE_SIZE):
+        if i == _limit or _start_id + i > last_id:
+            break
+        records.append(self.vault_registry[_start_id + i])
+    return records
+
+
+@external
+@view
+def get_vaults_by_booster_id(
+    _booster_id: uint256, _offset: uint256, _limit: uint256
+) -> DynArray[VaultRecord, MAX_PAGE_SIZE]:
+    """
+    @notice Get a page of the records of vaults staking in a Convex Booster pool
+    @dev Order is not stable across booster migrations.
+    @param _booster_id The Convex Booster id of the pool
+    @param _offset Position of the first record to return in the index
+    @param _limit Maximum number of records to return (capped at MAX_PAGE_SIZE)
+    @return Array of vault records
+    """
+    records: DynArray[VaultRecord, MAX_PAGE_SIZE] = []
+    count: uint256 = self.booster_id_vault_count[_booster_id]
+    for i: uint256 in range(MAX_PAGE_SIZE):
+        if i == _limit or _offset + i >= count:
+            break
+        records.append(self.vault_registry[self.booster_id_vaults[_booster_id][_offset + i]])
+    return records
+
+
+@external
+@view
+def get_vaults_by_token(
+    _token: address, _offset: uint256, _limit: uint256
+) -> DynArray[VaultRecord, MAX_PAGE_SIZE]:
+    """
+    @notice Get a page of the records of vaults for an LP token
+    @param _token Address of the LP token
+    @param _offset Position of the first record to return in the index
+    @param _limit Maximum number of records to return (capped at MAX_PAGE_SIZE)
+    @return Array of vault records
+    """
+    records: DynArray[VaultRecord, MAX_PAGE_SIZE] = []
+    count: uint256 = self.token_vault_count[_token]
+    for i: uint256 in range(MAX_PAGE_SIZE):
+        if i == _limit or _offset + i >= count:
+            break
+        records.append(self.vault_registry[self.token_vaults[_token][_offset + i]])
+    return records
+
+
+@external
+@view
+def get_vault_by_harvester(_harvester: address) -> VaultRecord:
+    """
+    @notice Get the record of the vault currently using a harvester
+    @param _harvester Address of the harvester
+    @return The vault record, empty if the harvester is not in use by a vault
+    """
+    return self.vault_registry[self.harvester_to_id[_harvester]]
+
+
 @external
 def update_harvester(_new_harvester: address):
     """
@@ -338,13 +669,9 @@ def update_harvester(_new_harvester: address):
     assert _new_harvester != empty(address), "Invalid harvester"
     vault_id: uint256 = self.vault_to_id[msg.sender]
     assert self.vault_registry[vault_id].vault == msg.sender, "Vault only"
-    self.vault_registry[vault_id] = VaultRecord(
-        vault=self.vault_registry[vault_id].vault,
-        booster_id=self.vault_registry[vault_id].booster_id,
-        strategy=self.vault_registry[vault_id].strategy,
-        harvester=_new_harvester,
-        token=self.vault_registry[vault_id].token,
-    )
+    self.harvester_to_id[self.vault_registry[vault_id].harvester] = 0
+    self.harvester_to_id[_new_harvester] = vault_id
+    self.vault_registry[vault_id].harvester = _new_harvester
 
 
 @external
@@ -360,10 +687,6 @@ def update_booster_id(_new_booster_id: uint256):
     """
     vault_id: uint256 = self.vault_to_id[msg.sender]
     assert self.vault_registry[vault_id].vault == msg.sender, "Vault only"
-    self.vault_registry[vault_id] = VaultRecord(
-        vault=self.vault_registry[vault_id].vault,
-        booster_id=_new_booster_id,
-        strategy=self.vault_registry[vault_id].strategy,
-        harvester=self.vault_registry[vault_id].harvester,
-        token=self.vault_registry[vault_id].token,
-    )
+    self._remove_from_booster_id_index(self.vault_registry[vault_id].booster_id, vault_id)
+    self._add_to_booster_id_index(_new_booster_id, vault_id)
+    self.vault_registry[vault_id].booster_id = _new_booster_id
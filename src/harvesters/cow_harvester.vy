@@ -9,29 +9,42 @@
 
 from src.modules.swappers import cow_swapper
 from src.modules import constants
+from src.interfaces import IHarvester
 
 initializes: cow_swapper
 
 exports: (
     cow_swapper.COMPOSABLE_COW,
+    cow_swapper.GPV2_DOMAIN_SEPARATOR,
+    cow_swapper.GPV2_SETTLEMENT,
+    cow_swapper.MAX_ORDER_PARTS,
     cow_swapper.MAX_TOKENS,
+    cow_swapper.MIN_PART_DURATION,
     cow_swapper.VAULT_RELAYER,
+    cow_swapper.accrued_fees,
+    cow_swapper.accrued_platform_fees,
     cow_swapper.cancel_order,
     cow_swapper.delay,
     cow_swapper.extra_reward_hook,
     cow_swapper.factory,
+    cow_swapper.fee_accrual,
     cow_swapper.forward_tokens,
     cow_swapper.getTradeableOrder,
     cow_swapper.get_order_info,
     cow_swapper.isValidSignature,
+    cow_swapper.order_parts,
     cow_swapper.set_approvals,
     cow_swapper.set_delay,
     cow_swapper.set_extra_reward_hook,
+    cow_swapper.set_fee_accrual,
+    cow_swapper.set_order_parts,
     cow_swapper.set_strategy,
     cow_swapper.set_target_hook,
     cow_swapper.strategy,
     cow_swapper.supportsInterface,
+    cow_swapper.take_fees,
     cow_swapper.target_hook,
+    cow_swapper.target_hook_delegated,
     cow_swapper.token_order_info,
     cow_swapper.transfer_to_reward_hook,
     cow_swapper.transfer_to_target_hook,
@@ -54,7 +67,7 @@ def harvest(
     _reward_hook_calldata: Bytes[4096],
     _target_hook_calldata: Bytes[4096],
     _harvester_calldata: Bytes[4096],
-) -> uint256:
+) -> IHarvester.HarvestReceipt:
     """
     @notice Swap accumulated CRV, CVX and extra reward tokens via CoW Swap
     @param _caller Address to receive caller fee
@@ -68,7 +81,7 @@ def harvest(
                                (DynArray[uint256, MAX_TOKENS])
                                This can't be blank and needs at least the amount for CRV and
                                CVX
-    @return target_asset_balance Amount of target asset received
+    @return Harvest receipt: tokens put up for sale, crvUSD fees and target asset received
     """
     assert cow_swapper.swapper.strategy != empty(address)
     assert (msg.sender == cow_swapper.swapper.strategy), "Strategy only"
@@ -0,0 +1,45 @@
+# pragma version 0.4.3
+"""
+@title Delegated Liquidity Hook
+@custom:contract-name raac_liquidity_delegated_hook
+@notice RAAC Vault hook to add one-sided liquidity to a regular Curve pool from the
+        harvester's own balance
+@dev Delegatecalled by the harvester once allowlisted in the factory: the tokens are
+     approved and spent by the harvester and the LP tokens are minted straight to the
+     strategy, so no tokens move to the hook or back from the harvester. Must not
+     declare storage.
+@license MIT
+@author RAAC
+"""
+
+from ethereum.ercs import IERC20
+from src.interfaces import ICurveStableSwap
+from src.interfaces import IHarvester
+
+
+@external
+def add_liquidity(
+    _pool_address: address,
+    _token: address,
+    _token_index: uint256,
+    _min_amount_out: uint256,
+):
+    """
+    @notice Add one-sided liquidity to a regular Curve pool on behalf of the strategy.
+    @param _pool_address The Curve pool contract address.
+    @param _token The token address to provide as liquidity.
+    @param _token_index The index of the token in the pool.
+    @param _min_amount_out The minimum pool tokens to mint.
+    @custom:reverts On failed approval or liquidity add.
+    """
+    amount: uint256 = staticcall IERC20(_token).balanceOf(self)
+    if amount == 0:
+        return
+    assert extcall IERC20(_token).approve(_pool_address, amount, default_return_value=True)
+
+    liquidity_amounts: uint256[2] = [0, 0]
+    liquidity_amounts[_token_index] = amount
+
+    extcall ICurveStableSwap(_pool_address).add_liquidity(
+        liquidity_amounts, _min_amount_out, staticcall IHarvester(self).strategy()
+    )
@@ -0,0 +1,50 @@
+# pragma version 0.4.3
+"""
+@title Delegated Liquidity Hook NG
+@custom:contract-name raac_add_liquidity_ng_delegated_hook
+@notice RAAC Vault hook to add one-sided liquidity to an NG Curve pool from the
+        harvester's own balance
+@dev Delegatecalled by the harvester once allowlisted in the factory: the tokens are
+     approved and spent by the harvester and the LP tokens are minted straight to the
+     strategy, so no tokens move to the hook or back from the harvester. Must not
+     declare storage.
+@license MIT
+@author RAAC
+"""
+
+from ethereum.ercs import IERC20
+from src.interfaces import ICurveStableSwapNG
+from src.interfaces import IHarvester
+
+MAX_COINS: constant(uint256) = 8
+
+
+@external
+def add_liquidity(
+    _pool_address: address,
+    _token: address,
+    _token_index: uint256,
+    _min_amount_out: uint256,
+):
+    """
+    @notice Add one-sided liquidity to a Curve NG pool on behalf of the strategy.
+    @param _pool_address The Curve NG pool contract address.
+    @param _token The token address to provide as liquidity.
+    @param _token_index The index of the token in the pool.
+    @param _min_amount_out The minimum pool tokens to mint.
+    @custom:reverts On failed approval or liquidity add.
+    """
+    amount: uint256 = staticcall IERC20(_token).balanceOf(self)
+    if amount == 0:
+        return
+    assert extcall IERC20(_token).approve(_pool_address, amount, default_return_value=True)
+    liquidity_amounts: DynArray[uint256, MAX_COINS] = empty(DynArray[uint256, MAX_COINS])
+    for i: uint256 in range(MAX_COINS):
+        if i == _token_index:
+            liquidity_amounts.append(amount)
+            break
+        liquidity_amounts.append(0)
+
+    extcall ICurveStableSwapNG(_pool_address).add_liquidity(
+        liquidity_amounts, _min_amount_out, staticcall IHarvester(self).strategy()
+    )
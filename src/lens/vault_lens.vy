@@ -0,0 +1,48 @@
+# pragma version 0.4.3
+"""
+@title Vault Lens
+@custom:contract-name raac_vault_lens
+@notice Read-only views derived from the state of RAAC vaults, kept out of the
+        vault so that they do not add to its code size
+@license MIT
+@author RAAC
+"""
+
+from src.interfaces import IVault
+
+
+@internal
+@view
+def _pps(_checkpoint: IVault.PPSCheckpoint) -> uint256:
+    return _checkpoint.total_assets * 10**18 // _checkpoint.supply
+
+
+@external
+@view
+def apy(_vault: address, _checkpoints: uint256) -> int256:
+    """
+    @notice Annualised return of the vault shares between the latest price per share
+            checkpoint and the one written `_checkpoints` checkpoints before it
+    @param _vault Address of the vault
+    @param _checkpoints The number of checkpoints spanned, at most PPS_CHECKPOINTS - 1
+    @return The annualised return, 1e18 being 100%
+    @dev The return is extrapolated linearly to a year (not compounded) and is negative
+         if the price per share decreased. Reads two checkpoints whatever the window.
+         The vault writes at most one checkpoint per block, so the two checkpoints are
+         always at different timestamps.
+    """
+    count: uint256 = staticcall IVault(_vault).pps_checkpoint_count()
+    size: uint256 = staticcall IVault(_vault).PPS_CHECKPOINTS()
+    assert _checkpoints > 0 and _checkpoints < min(count, size), "Not enough checkpoints"
+
+    latest: IVault.PPSCheckpoint = staticcall IVault(_vault).pps_checkpoints((count - 1) % size)
+    past: IVault.PPSCheckpoint = staticcall IVault(_vault).pps_checkpoints(
+        (count - 1 - _checkpoints) % size
+    )
+    past_pps: uint256 = self._pps(past)
+    growth: int256 = convert(self._pps(latest), int256) - convert(past_pps, int256)
+    return (
+        growth
+        * 10**18
+        * 31_556_952 // convert(past_pps * (latest.timestamp - past.timestamp), int256)
+    )
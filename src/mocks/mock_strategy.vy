@@ -11,6 +11,7 @@
 """
 
 from src.modules import constants
+from src.interfaces import IHarvester
 from ethereum.ercs import IERC20
 
 asset: public(reentrant(immutable(address)))
@@ -63,7 +64,12 @@ def harvest(
     _reward_hook_calldata: Bytes[4096],
     _target_hook_calldata: Bytes[4096],
     _harvester_calldata: Bytes[4096],
-):
+) -> IHarvester.HarvestReceipt:
 
     # we mimic a harvest by fetching rewards from the caller address for _min_amount_out
     assert extcall IERC20(asset).transferFrom(_caller, self, _min_amount_out)
+    receipt: IHarvester.HarvestReceipt = empty(IHarvester.HarvestReceipt)
+    receipt.lp_deposited = _min_amount_out
+    receipt.profit = _min_amount_out
+    receipt.total_assets = self._total_assets()
+    return receipt
@@ -8,9 +8,12 @@ MAX_CALLER_FEE: constant(uint256) = 1000
 MAX_REWARD_TOKENS: constant(uint256) = 10
 # 10 extra reward tokens max + cvx/crv
 MAX_TOKENS: public(constant(uint256)) = MAX_REWARD_TOKENS + 2
+# min out values appended to the calldata templates of a harvest profile
+MAX_PROFILE_SLOTS: constant(uint256) = 8
 CVX_TOKEN: constant(address) = 0x4e3FBD56CD56c3e72c1403e103b45Db9da5B9D2B
 CRV_TOKEN: constant(address) = 0xD533a949740bb3306d119CC777fa900bA034cd52
 CRVUSD_TOKEN: constant(address) = 0xf939E0A03FB07F59A73314E73794Be0E57ac1b4E
 CURVE_CVX_ETH_POOL: constant(address) = 0xB576491F1E6e5E62f1d8F26062Ee822B40B0E0d4
 CURVE_TRICRV_POOL: constant(address) = 0x4eBdF703948ddCEA3B11f675B4D1Fba9d2414A14
 CONVEX_BOOSTER: constant(address) = 0xF403C135812408BFbE8713b5A23a04b3D48AAE31
+PERMIT2: constant(address) = 0x000000000022D473030F116dDEE9F6B43aC78BA3
@@ -203,6 +203,86 @@ profit_unlocking_rate: public(uint256)
 last_profit_update: public(uint256)
 
 
+# Asynchronous redemption queue (ERC-7540 style request/claim)
+# @dev Holds the shares of pending redemption requests. The shares remain
+# part of the supply, and keep earning, until their epoch is settled.
+REDEEM_ESCROW: public(constant(address)) = 0x0000000000000000000000000000000000007540
+
+
+struct RedeemRequest:
+    epoch: uint256
+    shares: uint256
+
+
+struct RedeemEpoch:
+    shares: uint256
+    assets: uint256
+
+
+event RedeemRequested:
+    controller: indexed(address)
+    owner: indexed(address)
+    request_id: indexed(uint256)
+    sender: address
+    shares: uint256
+
+
+event RedeemSettled:
+    epoch: indexed(uint256)
+    shares: uint256
+    assets: uint256
+    unstaked: uint256
+
+
+event RedeemCanceled:
+    controller: indexed(address)
+    receiver: indexed(address)
+    request_id: indexed(uint256)
+    shares: uint256
+
+
+event RedeemClaimed:
+    controller: indexed(address)
+    receiver: indexed(address)
+    request_id: indexed(uint256)
+    shares: uint256
+    assets: uint256
+
+
+# @dev Epoch collecting new redemption requests, doubles as request id.
+current_redeem_epoch: public(uint256)
+# @dev Timestamp at which the current epoch started collecting requests.
+redeem_epoch_start: public(uint256)
+# @dev Shares requested and assets paid out per epoch.
+redeem_epochs: public(HashMap[uint256, RedeemEpoch])
+# @dev Open request of each controller, one epoch at a time, read through
+# `pendingRedeemRequest` and `claimableRedeemRequest`.
+redeem_requests: HashMap[address, RedeemRequest]
+# @dev Deposited assets kept unstaked by the vault to pay the current epoch's
+# redemptions instead of round-tripping them through Convex.
+idle_assets: public(uint256)
+# @dev Assets of settled epochs not yet claimed.
+claimable_assets: public(uint256)
+
+
+# Price per share checkpoints, kept on chain so that the vault's yield can be
+# read without an archive node or an indexer
+struct PPSCheckpoint:
+    timestamp: uint256
+    total_assets: uint256
+    supply: uint256
+
+
+# @dev Size of the checkpoint ring buffer.
+PPS_CHECKPOINTS: public(constant(uint256)) = 64
+# @dev Minimum time between two checkpoints written by deposits and withdrawals.
+PPS_CHECKPOINT_INTERVAL: public(constant(uint256)) = 86400
+# @dev Ring buffer of checkpoints, the nth one is stored at index n % PPS_CHECKPOINTS.
+pps_checkpoints: public(PPSCheckpoint[PPS_CHECKPOINTS])
+# @dev Number of checkpoints written since deployment.
+pps_checkpoint_count: public(uint256)
+
+
 @deploy
 @payable
 def __init__(
@@ -256,6 +336,7 @@ def __init__(
     # Initialize profit streaming parameters
     assert profit_max_unlock_time_ <= 31_556_952, "profit unlock time too long"
     self.profit_max_unlock_time = profit_max_unlock_time_
+    self.redeem_epoch_start = block.timestamp
 
     # Please note that the `ownable` module is merely used to
     # initialise the `erc20` module, but none of the associated
@@ -696,7 +777,7 @@ def _total_assets() -> uint256:
             https://eips.ethereum.org/EIPS/eip-4626#totalassets.
     @return uint256 The 32-byte total managed assets.
     """
-    return staticcall IStrategy(strategy).total_assets()
+    return staticcall IStrategy(strategy).total_assets() + self.idle_assets
 
 
 @internal
@@ -892,16 +973,32 @@ def _deposit(sender: address, receiver: address, assets: uint256, shares: uint25
     # you add the kwarg `skip_contract_check=True`. If the check fails (i.e.
     # the target address is an EOA), the call reverts.
 
-    # we transfer directly from the user to the strategy
-    assert extcall _ASSET.transferFrom(
-        sender, strategy, assets, default_return_value=True
-    ), "erc4626: transferFrom operation did not succeed"
-    # We stake the entire vault balance in Convex (including potentially donated assets)
-    # Donated assets are not included in shares calculation and are split between all stakers
-    strategy_balance: uint256 = staticcall _ASSET.balanceOf(strategy)
-    extcall IStrategy(strategy).deposit(strategy_balance)
+    # Deposits are netted against pending redemption requests: up to the value
+    # of the current epoch's requests is kept idle in the vault so that it can
+    # be paid out at settlement without a Convex deposit/withdrawal round trip
+    to_idle: uint256 = 0
+    pending_shares: uint256 = self.redeem_epochs[self.current_redeem_epoch].shares
+    if pending_shares > 0:
+        pending_assets: uint256 = self._convert_to_assets(pending_shares, True)
+        idle: uint256 = self.idle_assets
+        if pending_assets > idle:
+            to_idle = min(assets, pending_assets - idle)
+            assert extcall _ASSET.transferFrom(
+                sender, self, to_idle, default_return_value=True
+            ), "erc4626: transferFrom operation did not succeed"
+            self.idle_assets = idle + to_idle
+    if assets > to_idle:
+        # we transfer directly from the user to the strategy
+        assert extcall _ASSET.transferFrom(
+            sender, strategy, assets - to_idle, default_return_value=True
+        ), "erc4626: transferFrom operation did not succeed"
+        # We stake the entire vault balance in Convex (including potentially donated assets)
+        # Donated assets are not included in shares calculation and are split between all stakers
+        strategy_balance: uint256 = staticcall _ASSET.balanceOf(strategy)
+        extcall IStrategy(strategy).deposit(strategy_balance)
     erc20._mint(receiver, shares)
     log IERC4626.Deposit(sender=sender, owner=receiver, assets=assets, shares=shares)
+    self._checkpoint_if_due()
 
 
 @internal
@@ -1002,8 +1099,16 @@ def _withdraw(
     erc20._burn(owner, shares)
     self._check_min_shares()
 
-    # withdraw from strategy - the transfer logic is handled by the strategy
-    extcall IStrategy(strategy).withdraw(assets, receiver)
+    # pay from idle assets first, then withdraw the rest from the strategy
+    # the transfer logic is handled by the strategy
+    from_idle: uint256 = min(assets, self.idle_assets)
+    if from_idle > 0:
+        self.idle_assets -= from_idle
+        assert extcall _ASSET.transfer(
+            receiver, from_idle, default_return_value=True
+        ), "erc4626: transfer operation did not succeed"
+    if assets > from_idle:
+        extcall IStrategy(strategy).withdraw(assets - from_idle, receiver)
 
     log IERC4626.Withdraw(
         sender=sender,
@@ -1012,3 +1117,206 @@ def _withdraw(
         assets=assets,
         shares=shares,
     )
+    self._checkpoint_if_due()
+
+
+@external
+def requestRedeem(shares: uint256, controller: address, owner: address) -> uint256:
+    """
+    @dev Queues `shares` of `owner` for redemption at the next settlement.
+         The shares are escrowed and keep earning until settled, after which
+         `controller` can claim the assets with `claim_redeem`. A controller
+         has to claim a settled request before opening a new one.
+    @param shares The 32-byte shares amount to be redeemed.
+    @param controller The 20-byte address controlling the request.
+    @param owner The 20-byte owner address of the shares.
+    @return uint256 The request id, i.e. the epoch of the request.
+    """
+    assert shares > 0, "erc4626: zero shares"
+    if msg.sender != owner:
+        erc20._spend_allowance(owner, msg.sender, shares)
+
+    epoch: uint256 = self.current_redeem_epoch
+    request: RedeemRequest = self.redeem_requests[controller]
+    assert request.shares == 0 or request.epoch == epoch, "erc4626: claim settled request first"
+
+    erc20._transfer(owner, REDEEM_ESCROW, shares)
+    self.redeem_requests[controller] = RedeemRequest(epoch=epoch, shares=request.shares + shares)
+    self.redeem_epochs[epoch].shares += shares
+
+    log RedeemRequested(
+        controller=controller, owner=owner, request_id=epoch, sender=msg.sender, shares=shares
+    )
+    return epoch
+
+
+@internal
+def _take_request(controller: address) -> RedeemRequest:
+    """
+    @dev Removes and returns the open request of `controller`, who must
+         be the caller.
+    @param controller The 20-byte controller address.
+    @return RedeemRequest The request.
+    """
+    assert msg.sender == controller, "erc4626: caller is not controller"
+    request: RedeemRequest = self.redeem_requests[controller]
+    assert request.shares > 0, "erc4626: no request"
+    self.redeem_requests[controller] = empty(RedeemRequest)
+    return request
+
+
+@external
+def cancelRedeemRequest(receiver: address, controller: address) -> uint256:
+    """
+    @dev Cancels `controller`'s pending request and returns its escrowed
+         shares to `receiver`. Settled requests can only be claimed.
+    @param receiver The 20-byte receiver address of the shares.
+    @param controller The 20-byte controller address, must be the caller.
+    @return uint256 The 32-byte shares amount returned.
+    """
+    request: RedeemRequest = self._take_request(controller)
+    assert request.epoch == self.current_redeem_epoch, "erc4626: request settled"
+    self.redeem_epochs[request.epoch].shares -= request.shares
+    erc20._transfer(REDEEM_ESCROW, receiver, request.shares)
+
+    log RedeemCanceled(
+        controller=controller, receiver=receiver, request_id=request.epoch, shares=request.shares
+    )
+    return request.shares
+
+
+@external
+@view
+def pendingRedeemRequest(request_id: uint256, controller: address) -> uint256:
+    """
+    @dev Returns the shares of `controller`'s request that are not settled yet.
+    @param request_id The 32-byte request id.
+    @param controller The 20-byte controller address.
+    @return uint256 The 32-byte pending shares amount.
+    """
+    request: RedeemRequest = self.redeem_requests[controller]
+    if request.epoch == request_id and request_id == self.current_redeem_epoch:
+        return request.shares
+    return 0
+
+
+@external
+@view
+def claimableRedeemRequest(request_id: uint256, controller: address) -> uint256:
+    """
+    @dev Returns the shares of `controller`'s request that are settled and
+         can be claimed.
+    @param request_id The 32-byte request id.
+    @param controller The 20-byte controller address.
+    @return uint256 The 32-byte claimable shares amount.
+    """
+    request: RedeemRequest = self.redeem_requests[controller]
+    if request.epoch == request_id and request_id < self.current_redeem_epoch:
+        return request.shares
+    return 0
+
+
+@external
+def claim_redeem(receiver: address, controller: address) -> uint256:
+    """
+    @dev Transfers the assets of `controller`'s settled request to `receiver`.
+    @param receiver The 20-byte receiver address.
+    @param controller The 20-byte controller address, must be the caller.
+    @return uint256 The 32-byte assets amount claimed.
+    """
+    request: RedeemRequest = self._take_request(controller)
+    assert request.epoch < self.current_redeem_epoch, "erc4626: request not settled"
+
+    settled: RedeemEpoch = self.redeem_epochs[request.epoch]
+    assets: uint256 = request.shares * settled.assets // settled.shares
+    self.claimable_assets -= assets
+
+    assert extcall _ASSET.transfer(
+        receiver, assets, default_return_value=True
+    ), "erc4626: transfer operation did not succeed"
+    log RedeemClaimed(
+        controller=controller,
+        receiver=receiver,
+        request_id=request.epoch,
+        shares=request.shares,
+        assets=assets,
+    )
+    return assets
+
+
+@internal
+def _settle_redemptions():
+    """
+    @dev Settles the current epoch: prices its shares, burns them and sets
+         their assets aside for claims. Idle assets from netted deposits are
+         used first; any shortfall is withdrawn from the strategy with a
+         single call and any surplus is staked back.
+    """
+    epoch: uint256 = self.current_redeem_epoch
+    shares: uint256 = self.redeem_epochs[epoch].shares
+    assert shares > 0, "erc4626: nothing to settle"
+
+    assets: uint256 = self._convert_to_assets(shares, False)
+    idle: uint256 = self.idle_assets
+    unstaked: uint256 = 0
+    if assets > idle:
+        unstaked = assets - idle
+        extcall IStrategy(strategy).withdraw(unstaked, self)
+    elif idle > assets:
+        assert extcall _ASSET.transfer(
+            strategy, idle - assets, default_return_value=True
+        ), "erc4626: transfer operation did not succeed"
+        extcall IStrategy(strategy).deposit(staticcall _ASSET.balanceOf(strategy))
+    self.idle_assets = 0
+
+    # no minimum supply check: shares left below MIN_SHARES by the other
+    # holders must not block the queue
+    erc20._burn(REDEEM_ESCROW, shares)
+
+    self.redeem_epochs[epoch].assets = assets
+    self.claimable_assets += assets
+    self.current_redeem_epoch = epoch + 1
+    self.redeem_epoch_start = block.timestamp
+
+    log RedeemSettled(epoch=epoch, shares=shares, assets=assets, unstaked=unstaked)
+
+
+@internal
+def _checkpoint(total_assets: uint256):
+    """
+    @dev Write a price per share checkpoint to the ring buffer,
+         overwriting the oldest one once it is full. A checkpoint
+         written in the same block as the latest one replaces it, so
+         that checkpoints always span some time.
+    @param total_assets The current total assets of the vault.
+    """
+    supply: uint256 = self._total_supply()
+    if supply == 0:
+        return
+    count: uint256 = self.pps_checkpoint_count
+    if (
+        count > 0
+        and self.pps_checkpoints[(count - 1) % PPS_CHECKPOINTS].timestamp == block.timestamp
+    ):
+        count -= 1
+    self.pps_checkpoints[count % PPS_CHECKPOINTS] = PPSCheckpoint(
+        timestamp=block.timestamp, total_assets=total_assets, supply=supply
+    )
+    self.pps_checkpoint_count = count + 1
+
+
+@internal
+def _checkpoint_if_due():
+    """
+    @dev Write a checkpoint if the latest one is at least
+         PPS_CHECKPOINT_INTERVAL old, so that deposits and withdrawals
+         only pay for the total assets query and the writes once
+         per interval.
+    """
+    count: uint256 = self.pps_checkpoint_count
+    if (
+        count == 0
+        or self.pps_checkpoints[(count - 1) % PPS_CHECKPOINTS].timestamp + PPS_CHECKPOINT_INTERVAL
+        <= block.timestamp
+    ):
+        self._checkpoint(self._total_assets())
@@ -21,9 +21,12 @@
      Each order is valid for a certain period of time. The period should not be too long because orders will
      remain outstanding even after being filled. If rewards reach the previous sell_amount quantity they can be
      sold again - however the price specified in buy_amount may be too low and result in subpar execution
+     Large balances can be sold TWAP-style by slicing orders into `order_parts` partially fillable
+     parts, each tradeable during its own slice of the validity period.
 """
 
 from ethereum.ercs import IERC20
+from src.interfaces import IHarvester
 from src.interfaces import IStrategy
 from src.interfaces import IVault
 from src.modules import constants
@@ -34,13 +37,19 @@ initializes: swapper
 exports: constants.MAX_TOKENS
 
 exports: (
+    swapper.accrued_fees,
+    swapper.accrued_platform_fees,
     swapper.extra_reward_hook,
     swapper.factory,
+    swapper.fee_accrual,
     swapper.set_extra_reward_hook,
+    swapper.set_fee_accrual,
     swapper.set_strategy,
     swapper.set_target_hook,
     swapper.strategy,
+    swapper.take_fees,
     swapper.target_hook,
+    swapper.target_hook_delegated,
     swapper.transfer_to_reward_hook,
     swapper.transfer_to_target_hook,
     swapper.treasury,
@@ -53,7 +62,6 @@ interface IComposableCoW:
     def create(params: ConditionalOrderParams, dispatch: bool): nonpayable
     def remove(singleOrderHash: bytes32): nonpayable
     def hash(params: ConditionalOrderParams) -> bytes32: pure
-    def domainSeparator() -> bytes32: view
     def isValidSafeSignature(
         safe: address,
         sender: address,
@@ -126,10 +134,18 @@ struct TokenOrderInfo:
     last_order_time: uint256
     buy_amount: uint256
     sell_amount: uint256
+    # number of sliced parts (0: a single fill-or-kill order)
+    parts: uint256
 
 
 COMPOSABLE_COW: public(constant(address)) = 0xfdaFc9d1902f4e0b84f65F49f244b32b31013b74
 VAULT_RELAYER: public(constant(address)) = 0xC92E8bdf79f0507f65a392b0ab4667716BFE0110
+GPV2_SETTLEMENT: public(constant(address)) = 0x9008D19f58AAbD9eD0D60971565AA8510560ab41
+EIP712_DOMAIN_TYPE_HASH: constant(bytes32) = keccak256(
+    "EIP712Domain(string name,string version,uint256 chainId,address verifyingContract)"
+)
+# abi encoded size of GPv2OrderData (12 static words)
+GPV2_ORDER_DATA_SIZE: constant(uint256) = 12 * 32
 ORDER_KIND_SELL: constant(bytes32) = keccak256("sell")
 BALANCE_ERC20: constant(bytes32) = keccak256("erc20")
 # https://explorer.cow.fi/appdata?tab=encode
@@ -142,16 +158,37 @@ SUPPORTED_INTERFACES: constant(bytes4[3]) = [
 ]
 SIGNATURE_VERIFIER_MUXER_INTERFACE: constant(bytes4) = 0x62af8dc2
 DAY: constant(uint256) = 60 * 60 * 24
+
+# Per-token order state packed in a single slot:
+# bit 0: order registered | bits 1-7: parts | bits 8-47: last_order_time
+# bits 48-151: buy_amount | bits 152-255: sell_amount
+ORDER_PARTS_OFFSET: constant(uint256) = 1
+ORDER_TIME_OFFSET: constant(uint256) = 8
+BUY_AMOUNT_OFFSET: constant(uint256) = 48
+SELL_AMOUNT_OFFSET: constant(uint256) = 152
+MAX_ORDER_PARTS: public(constant(uint256)) = 2**7 - 1
+MAX_ORDER_TIME: constant(uint256) = 2**40 - 1
+MAX_ORDER_AMOUNT: constant(uint256) = 2**104 - 1
+MIN_PART_DURATION: public(constant(uint256)) = 60 * 5
+
+# Domain separator of GPv2Settlement, as returned by ComposableCoW.domainSeparator()
+GPV2_DOMAIN_SEPARATOR: public(immutable(bytes32))
+
 delay: public(uint256)
+# Number of parts new orders are sliced into (0 or 1: single order)
+order_parts: public(uint256)
 
-token_order_info: public(HashMap[address, TokenOrderInfo])
-token_orders: HashMap[address, bool]
+token_orders: HashMap[address, uint256]
 
 
 event DelayUpdated:
     delay: uint256
 
 
+event OrderPartsUpdated:
+    order_parts: uint256
+
+
 event ConditionalOrderCancelled:
     token: indexed(address)
     hash: bytes32
@@ -161,6 +198,15 @@ event ConditionalOrderCancelled:
 def __init__(_factory: address):
     swapper.__init__(_factory)
     self.delay = DAY
+    GPV2_DOMAIN_SEPARATOR = keccak256(
+        abi_encode(
+            EIP712_DOMAIN_TYPE_HASH,
+            keccak256("Gnosis Protocol"),
+            keccak256("v2"),
+            chain.id,
+            GPV2_SETTLEMENT,
+        )
+    )
 
 
 @external
@@ -177,10 +223,29 @@ def set_delay(_delay: uint256):
     vault: IVault = IVault(staticcall IStrategy(swapper.strategy).vault())
     assert staticcall vault.hasRole(staticcall vault.HARVESTER_ROLE(), msg.sender), "Manager only"
     assert (_delay < DAY * 7), "Delay too long"
+    assert _delay >= self.order_parts * MIN_PART_DURATION, "Delay too short"
     self.delay = _delay
     log DelayUpdated(delay=_delay)
 
 
+@external
+def set_order_parts(_order_parts: uint256):
+    """
+    @notice Slice new orders into discrete parts over their validity period
+    @param _order_parts Number of parts (0 or 1 to sell the whole amount in one order)
+    @dev Each part sells sell_amount / parts, is partially fillable and is only
+         tradeable during its own delay / parts window, with the buy amount floor
+         scaled to the part size. Applies to orders created after the update.
+         Only callable by addresses with HARVESTER_ROLE.
+    """
+    vault: IVault = IVault(staticcall IStrategy(swapper.strategy).vault())
+    assert staticcall vault.hasRole(staticcall vault.HARVESTER_ROLE(), msg.sender), "Manager only"
+    assert _order_parts <= MAX_ORDER_PARTS, "Too many parts"
+    assert self.delay >= _order_parts * MIN_PART_DURATION, "Parts too short"
+    self.order_parts = _order_parts
+    log OrderPartsUpdated(order_parts=_order_parts)
+
+
 @external
 def set_approvals():
     """
@@ -207,7 +272,7 @@ def _swap(
     _target_hook_calldata: Bytes[4096],
     _tokens: DynArray[address, constants.MAX_TOKENS],
     _buy_amounts: DynArray[uint256, constants.MAX_TOKENS],
-) -> uint256:
+) -> IHarvester.HarvestReceipt:
     """
     @notice Submit multiple token swaps to a single target token
     @param _caller Address to receive caller fee
@@ -216,7 +281,8 @@ def _swap(
     @param _target_hook_calldata Calldata to pass to target hook contract
     @param _tokens Array of tokens to sell
     @param _buy_amounts Array of minimum buy amounts for each token
-    @return target_asset_balance Amount of target asset received
+    @return Harvest receipt, the tokens sold are the ones put up for sale in new orders
+            and the crvUSD is the proceeds of previously settled orders
     """
 
     assert len(_tokens) > 0, "No tokens provided"
@@ -231,68 +297,67 @@ def _swap(
             value=0,
         )
 
+    receipt: IHarvester.HarvestReceipt = empty(IHarvester.HarvestReceipt)
+    delay: uint256 = self.delay
+    order_parts: uint256 = self.order_parts
     for i: uint256 in range(constants.MAX_TOKENS):
         if i == len(_tokens):
             break
-        if not self.token_orders[_tokens[i]]:
+        token: address = _tokens[i]
+        packed: uint256 = self.token_orders[token]
+        registered: bool = False
+        info: TokenOrderInfo = empty(TokenOrderInfo)
+        registered, info = self._unpack_order(packed)
+
+        if not registered:
             extcall IComposableCoW(COMPOSABLE_COW).create(
                 ConditionalOrderParams(
                     handler=self,
                     salt=empty(bytes32),
-                    staticInput=concat(b"", convert(_tokens[i], bytes20)),
+                    staticInput=concat(b"", convert(token, bytes20)),
                 ),
                 True,
             )
-            self.token_orders[_tokens[i]] = True
+            registered = True
             # in case we want to process extra rewards with CoW rather than hook, we set approvals here
-            if _tokens[i] not in [constants.CVX_TOKEN, constants.CRV_TOKEN]:
-                assert extcall IERC20(_tokens[i]).approve(
-                    VAULT_RELAYER, 0, default_return_value=True
-                )
-                assert extcall IERC20(_tokens[i]).approve(
+            if token not in [constants.CVX_TOKEN, constants.CRV_TOKEN]:
+                assert extcall IERC20(token).approve(VAULT_RELAYER, 0, default_return_value=True)
+                assert extcall IERC20(token).approve(
                     VAULT_RELAYER, max_value(uint256), default_return_value=True
                 )
 
         # Check if order has expired
         # If no order exists and last_order_time is 0, this will also create an entry
-        if self.token_order_info[_tokens[i]].last_order_time + self.delay <= block.timestamp:
-            current_balance: uint256 = staticcall IERC20(_tokens[i]).balanceOf(self)
-            self.token_order_info[_tokens[i]] = TokenOrderInfo(
+        if info.last_order_time + delay <= block.timestamp:
+            # amounts above the packed width are sold over several orders
+            info = TokenOrderInfo(
                 last_order_time=block.timestamp,
                 buy_amount=_buy_amounts[i],
-                sell_amount=current_balance,
+                sell_amount=min(staticcall IERC20(token).balanceOf(self), MAX_ORDER_AMOUNT),
+                parts=order_parts,
             )
+            receipt.tokens_sold.append(token)
+            receipt.amounts_sold.append(info.sell_amount)
+
+        new_packed: uint256 = self._pack_order(registered, info)
+        if new_packed != packed:
+            self.token_orders[token] = new_packed
 
     # If no rewards were swapped, we end early
     crvusd_available: uint256 = staticcall IERC20(constants.CRVUSD_TOKEN).balanceOf(self)
     if crvusd_available == 0:
-        return 0
+        return receipt
+    receipt.crvusd_gross = crvusd_available
 
-    platform_fee: uint256 = staticcall IStrategy(swapper.strategy).platform_fee()
-    treasury: address = swapper._treasury()
-    swapper._collect_fee(treasury, constants.CRVUSD_TOKEN, crvusd_available, platform_fee)
+    # Platform fee for the treasury and caller incentive in crvUSD
+    platform_fee: uint256 = 0
+    caller_fee: uint256 = 0
+    platform_fee, caller_fee = swapper._take_fees(_caller, crvusd_available)
+    receipt.platform_fee = platform_fee
+    receipt.caller_fee = caller_fee
 
-    # Pay the caller incentive in crvUSD
-    caller_fee: uint256 = staticcall IStrategy(swapper.strategy).caller_fee()
-    swapper._collect_fee(_caller, constants.CRVUSD_TOKEN, crvusd_available, caller_fee)
-
-    # if we have a hook contract to handle further operations
-    if swapper.target_hook != empty(address):
-        raw_call(
-            swapper.target_hook,
-            _target_hook_calldata,
-            value=0,
-        )
-
-    target_asset: address = staticcall IStrategy(swapper.strategy).asset()
-    target_asset_balance: uint256 = staticcall IERC20(target_asset).balanceOf(self)
-    assert target_asset_balance >= _min_amount_out, "Slippage"
-    assert extcall IERC20(target_asset).transfer(
-        swapper.strategy,
-        target_asset_balance,
-        default_return_value=True,
-    )
-    return target_asset_balance
+    receipt.lp_deposited = swapper._process_target(_target_hook_calldata, _min_amount_out)
+    return receipt
 
 
 @external
@@ -319,8 +384,11 @@ def getTradeableOrder(
     @return Order parameters
     """
     sell_token: address = convert(convert(_static_input, bytes20), address)
+    registered: bool = False
+    info: TokenOrderInfo = empty(TokenOrderInfo)
+    registered, info = self._unpack_order(self.token_orders[sell_token])
 
-    if not self.token_orders[sell_token]:
+    if not registered:
         raw_revert(
             abi_encode(
                 block.timestamp + (DAY),
@@ -329,7 +397,7 @@ def getTradeableOrder(
             )
         )
 
-    if self.token_order_info[sell_token].last_order_time == 0:
+    if info.last_order_time == 0:
         raw_revert(
             abi_encode(
                 block.timestamp + (DAY),
@@ -338,7 +406,7 @@ def getTradeableOrder(
             )
         )
 
-    if self.token_order_info[sell_token].sell_amount == 0:
+    if info.sell_amount == 0:
         raw_revert(
             abi_encode(
                 block.timestamp + (DAY),
@@ -347,9 +415,7 @@ def getTradeableOrder(
             )
         )
 
-    order: GPv2OrderData = self._create_order(sell_token)
-    sell_balance: uint256 = staticcall IERC20(sell_token).balanceOf(self)
-    if sell_balance == 0:
+    if staticcall IERC20(sell_token).balanceOf(self) == 0:
         raw_revert(
             abi_encode(
                 block.timestamp + (DAY),
@@ -357,7 +423,9 @@ def getTradeableOrder(
                 method_id=method_id("PollTryAtEpoch(uint256,string)"),
             )
         )
-    if self.token_order_info[sell_token].last_order_time + self.delay <= block.timestamp:
+
+    delay: uint256 = self.delay
+    if info.last_order_time + delay <= block.timestamp:
         raw_revert(
             abi_encode(
                 block.timestamp + (DAY),
@@ -365,35 +433,43 @@ def getTradeableOrder(
                 method_id=method_id("PollTryAtEpoch(uint256,string)"),
             )
         )
-    return order
+    return self._create_order(sell_token, info, delay)
 
 
 @internal
 @view
-def _verify(
-    _owner: address,
-    _sender: address,
-    _hash: bytes32,
-    _domain_separator: bytes32,
-    _ctx: bytes32,
-    _static_input: Bytes[20],
-    _offchain_input: Bytes[1],
-    _order: GPv2OrderData,
-):
+def _verify(_sell_token: address, _order: GPv2OrderData):
     """
     @notice Verify that a proposed order matches our conditions
-    @dev This is called by ComposableCoW to validate orders
+    @dev Compares the order field by field against the stored order (or its
+         current part), the buy amount being a floor
+    @param _sell_token The token sold by the conditional order
+    @param _order The proposed order
     """
-    if _offchain_input != b"":
-        raw_revert(abi_encode("NonZeroOffchainInput", method_id=method_id("OrderNotValid(string)")))
-
-    sell_token: address = convert(convert(_static_input, bytes20), address)
-    if not self.token_orders[sell_token]:
+    registered: bool = False
+    info: TokenOrderInfo = empty(TokenOrderInfo)
+    registered, info = self._unpack_order(self.token_orders[_sell_token])
+    if not registered:
         raw_revert(abi_encode("Wrong token", method_id=method_id("OrderNotValid(string)")))
 
-    expected_order: GPv2OrderData = self._create_order(sell_token)
-    expected_order.buyAmount = max(_order.buyAmount, expected_order.buyAmount)
-    if abi_encode(expected_order) != abi_encode(_order):
+    sell_amount: uint256 = 0
+    buy_amount: uint256 = 0
+    valid_to: uint256 = 0
+    sell_amount, buy_amount, valid_to = self._order_part(info, self.delay)
+    if (
+        _order.sellToken != _sell_token
+        or _order.buyToken != constants.CRVUSD_TOKEN
+        or _order.receiver != self
+        or _order.sellAmount != sell_amount
+        or _order.buyAmount < buy_amount
+        or convert(_order.validTo, uint256) != valid_to
+        or _order.appData != APP_DATA
+        or _order.feeAmount != 0
+        or _order.kind != ORDER_KIND_SELL
+        or _order.partiallyFillable != (info.parts > 1)
+        or _order.sellTokenBalance != BALANCE_ERC20
+        or _order.buyTokenBalance != BALANCE_ERC20
+    ):
         raw_revert(abi_encode("Invalid order", method_id=method_id("OrderNotValid(string)")))
 
 
@@ -413,32 +489,95 @@ def verify(
     @notice Verify that a proposed order matches our conditions
     @dev This is called by ComposableCoW to validate orders
     """
-    self._verify(
-        _owner,
-        _sender,
-        _hash,
-        _domain_separator,
-        _ctx,
-        _static_input,
-        _offchain_input,
-        _order,
+    if _offchain_input != b"":
+        raw_revert(abi_encode("NonZeroOffchainInput", method_id=method_id("OrderNotValid(string)")))
+    self._verify(convert(convert(_static_input, bytes20), address), _order)
+
+
+@internal
+@pure
+def _pack_order(_registered: bool, _info: TokenOrderInfo) -> uint256:
+    """
+    @notice Pack the order state of a token into a single storage word
+    @param _registered Whether the conditional order is registered on ComposableCoW
+    @param _info The current order parameters
+    @return The packed order state
+    """
+    assert _info.buy_amount <= MAX_ORDER_AMOUNT, "Buy amount too large"
+    assert _info.sell_amount <= MAX_ORDER_AMOUNT, "Sell amount too large"
+    return (
+        convert(_registered, uint256)
+        | (_info.parts << ORDER_PARTS_OFFSET)
+        | (_info.last_order_time << ORDER_TIME_OFFSET)
+        | (_info.buy_amount << BUY_AMOUNT_OFFSET)
+        | (_info.sell_amount << SELL_AMOUNT_OFFSET)
+    )
+
+
+@internal
+@pure
+def _unpack_order(_packed: uint256) -> (bool, TokenOrderInfo):
+    """
+    @notice Unpack the order state of a token
+    @param _packed The packed order state
+    @return registered Whether the conditional order is registered on ComposableCoW
+    @return info The current order parameters
+    """
+    return _packed & 1 == 1, TokenOrderInfo(
+        last_order_time=(_packed >> ORDER_TIME_OFFSET) & MAX_ORDER_TIME,
+        buy_amount=(_packed >> BUY_AMOUNT_OFFSET) & MAX_ORDER_AMOUNT,
+        sell_amount=_packed >> SELL_AMOUNT_OFFSET,
+        parts=(_packed >> ORDER_PARTS_OFFSET) & MAX_ORDER_PARTS,
+    )
+
+
+@internal
+@view
+def _order_part(_info: TokenOrderInfo, _delay: uint256) -> (uint256, uint256, uint256):
+    """
+    @notice Amounts and expiry of the currently tradeable (part of the) order
+    @dev Sliced orders expose one part per `_delay / parts` window starting at
+         last_order_time, the last part running until the end of the delay.
+         The buy amount floor is rounded up so the minimum price is kept.
+    @param _info The stored order parameters
+    @param _delay The validity period of the order
+    @return sell_amount Amount of sell token of the current part
+    @return buy_amount Minimum amount of crvUSD of the current part
+    @return valid_to Expiry of the current part
+    """
+    if _info.parts <= 1:
+        return _info.sell_amount, _info.buy_amount, _info.last_order_time + _delay
+
+    part_duration: uint256 = max(_delay // _info.parts, 1)
+    part: uint256 = (block.timestamp - _info.last_order_time) // part_duration
+    valid_to: uint256 = _info.last_order_time + (part + 1) * part_duration
+    if part >= _info.parts - 1:
+        valid_to = _info.last_order_time + _delay
+    return (
+        _info.sell_amount // _info.parts,
+        (_info.buy_amount + _info.parts - 1) // _info.parts,
+        valid_to,
     )
 
 
 @internal
 @view
-def _create_order(_token: address) -> GPv2OrderData:
+def _create_order(_token: address, _info: TokenOrderInfo, _delay: uint256) -> GPv2OrderData:
+    sell_amount: uint256 = 0
+    buy_amount: uint256 = 0
+    valid_to: uint256 = 0
+    sell_amount, buy_amount, valid_to = self._order_part(_info, _delay)
     return GPv2OrderData(
         sellToken=_token,
         buyToken=constants.CRVUSD_TOKEN,
         receiver=self,
-        sellAmount=self.token_order_info[_token].sell_amount,
-        buyAmount=self.token_order_info[_token].buy_amount,
-        validTo=convert(self.token_order_info[_token].last_order_time + self.delay, uint32),
+        sellAmount=sell_amount,
+        buyAmount=buy_amount,
+        validTo=convert(valid_to, uint32),
         appData=APP_DATA,
         feeAmount=0,
         kind=ORDER_KIND_SELL,
-        partiallyFillable=False,
+        partiallyFillable=_info.parts > 1,
         sellTokenBalance=BALANCE_ERC20,
         buyTokenBalance=BALANCE_ERC20,
     )
@@ -459,27 +598,18 @@ def isValidSignature(_hash: bytes32, _signature: Bytes[2048]) -> bytes4:
     payload: Payload = empty(Payload)
     order, payload = abi_decode(_signature, (GPv2OrderData, Payload))
 
-    # Verify the order using existing verify logic
-    # Extract static input from order (assuming sellToken is the static input)
-    static_input: Bytes[20] = concat(b"", convert(order.sellToken, bytes20))
-    self._verify(
-        msg.sender,  # owner
-        msg.sender,  # _sender
-        _hash,  # _hash
-        empty(bytes32),  # _domain_separator
-        empty(bytes32),  # _ctx
-        static_input,  # _static_input
-        b"",  # _offchain_input
-        order,  # _order
-    )
+    # The sell token is the static input of the conditional order
+    self._verify(order.sellToken, order)
 
+    # GPv2OrderData is a static type: its decoded (and validated) encoding is
+    # the head of the signature
     return staticcall IComposableCoW(COMPOSABLE_COW).isValidSafeSignature(
         self,
         msg.sender,
         _hash,
-        staticcall IComposableCoW(COMPOSABLE_COW).domainSeparator(),
+        GPV2_DOMAIN_SEPARATOR,
         empty(bytes32),
-        abi_encode(order),
+        slice(_signature, 0, GPV2_ORDER_DATA_SIZE),
         abi_encode(payload),
     )
 
@@ -507,7 +637,7 @@ def cancel_order(_token: address):
     vault: IVault = IVault(staticcall IStrategy(swapper.strategy).vault())
     assert staticcall vault.hasRole(staticcall vault.HARVESTER_ROLE(), msg.sender), "Manager only"
 
-    assert self.token_orders[_token], "No order exists"
+    assert self.token_orders[_token] & 1 == 1, "No order exists"
 
     order_params: ConditionalOrderParams = ConditionalOrderParams(
         handler=self,
@@ -521,8 +651,7 @@ def cancel_order(_token: address):
 
     assert extcall IERC20(_token).approve(VAULT_RELAYER, 0, default_return_value=True)
 
-    self.token_orders[_token] = False
-    self.token_order_info[_token] = TokenOrderInfo(last_order_time=0, buy_amount=0, sell_amount=0)
+    self.token_orders[_token] = 0
 
     log ConditionalOrderCancelled(token=_token, hash=order_hash)
 
@@ -536,4 +665,18 @@ def get_order_info(_token: address) -> (bool, TokenOrderInfo):
     @return exists Whether an order exists for this token
     @return info The order information
     """
-    return self.token_orders[_token], self.token_order_info[_token]
+    return self._unpack_order(self.token_orders[_token])
+
+
+@external
+@view
+def token_order_info(_token: address) -> TokenOrderInfo:
+    """
+    @notice Get the current order parameters for a token
+    @param _token The token to query
+    @return The order information
+    """
+    registered: bool = False
+    info: TokenOrderInfo = empty(TokenOrderInfo)
+    registered, info = self._unpack_order(self.token_orders[_token])
+    return info
@@ -15,6 +15,7 @@
 from ethereum.ercs import IERC20
 from src.interfaces import ICurveV2Pool
 from src.interfaces import ICurveTriCryptoFactoryNG
+from src.interfaces import IHarvester
 from src.interfaces import IStrategy
 from src.modules import constants
 from src.modules.swappers import swapper
@@ -22,13 +23,19 @@ from src.modules.swappers import swapper
 initializes: swapper
 
 exports: (
+    swapper.accrued_fees,
+    swapper.accrued_platform_fees,
     swapper.extra_reward_hook,
     swapper.factory,
+    swapper.fee_accrual,
     swapper.set_extra_reward_hook,
+    swapper.set_fee_accrual,
     swapper.set_strategy,
     swapper.set_target_hook,
     swapper.strategy,
+    swapper.take_fees,
     swapper.target_hook,
+    swapper.target_hook_delegated,
     swapper.transfer_to_reward_hook,
     swapper.transfer_to_target_hook,
     swapper.treasury,
@@ -103,71 +110,70 @@ def _eth_to_crvusd(_amount: uint256, _min_amount_out: uint256) -> uint256:
 
 
 @internal
-def _swap_rewards_to_eth() -> uint256:
+def _swap_rewards_to_eth() -> DynArray[uint256, constants.MAX_TOKENS]:
+    """
+    @notice Swap the CVX and CRV balances to ETH
+    @return The amounts of CVX and CRV sold
+    """
     cvx_balance: uint256 = staticcall IERC20(constants.CVX_TOKEN).balanceOf(self)
     crv_balance: uint256 = staticcall IERC20(constants.CRV_TOKEN).balanceOf(self)
-    eth_from_crv: uint256 = 0
-    eth_from_cvx: uint256 = 0
     # min_amounts_out are set to 1 as slippage check is done on the final crvUSD amount
     if cvx_balance > 0:
-        eth_from_cvx = self._cvx_to_eth(cvx_balance, 1)
+        self._cvx_to_eth(cvx_balance, 1)
     if crv_balance > 0:
-        eth_from_crv = self._crv_to_eth(crv_balance, 1)
+        self._crv_to_eth(crv_balance, 1)
 
-    return eth_from_cvx + eth_from_crv
+    return [cvx_balance, crv_balance]
 
 
 @internal
 def _swap(
     _caller: address,
     _min_amount_out: uint256,
+    _extra_rewards: DynArray[address, constants.MAX_REWARD_TOKENS],
     _reward_hook_calldata: Bytes[4096],
     _target_hook_calldata: Bytes[4096],
-) -> uint256:
+) -> IHarvester.HarvestReceipt:
     """
     @notice Swap accumulated CRV and CVX rewards to crvUSD
     @param _caller Address to receive caller fee
     @param _min_amount_out Minimum amount expected from final swap to target asset
+    @param _extra_rewards Extra reward tokens processed by the reward hook, only used to
+                          report the amounts it sold
     @param _reward_hook_calldata Calldata to pass to extra reward hook contract
     @param _target_hook_calldata Calldata to pass to target hook contract
-    @return target_asset_balance Amount of target asset received
+    @return Harvest receipt, profit and total_assets are left to the strategy
     """
-    self._swap_rewards_to_eth()
+    receipt: IHarvester.HarvestReceipt = empty(IHarvester.HarvestReceipt)
+    receipt.tokens_sold = [constants.CVX_TOKEN, constants.CRV_TOKEN]
+    receipt.amounts_sold = self._swap_rewards_to_eth()
 
     # if a hook contract is set to handle extra rewards, we call it
     if swapper.extra_reward_hook != empty(address):
+        extra_balances: DynArray[uint256, constants.MAX_REWARD_TOKENS] = []
+        for token: address in _extra_rewards:
+            extra_balances.append(staticcall IERC20(token).balanceOf(self))
         raw_call(
             swapper.extra_reward_hook,
             _reward_hook_calldata,
             value=0,
         )
-
+        for i: uint256 in range(len(_extra_rewards), bound=constants.MAX_REWARD_TOKENS):
+            receipt.tokens_sold.append(_extra_rewards[i])
+            # the hook may leave more of a token than it was given (e.g. when it
+            # pays out in one of the extra rewards), which counts as nothing sold
+            balance: uint256 = staticcall IERC20(_extra_rewards[i]).balanceOf(self)
+            receipt.amounts_sold.append(extra_balances[i] - min(balance, extra_balances[i]))
     self._eth_to_crvusd(self.balance, 1)
     crvusd_received: uint256 = staticcall IERC20(constants.CRVUSD_TOKEN).balanceOf(self)
+    receipt.crvusd_gross = crvusd_received
 
-    # Pay the platform fee in crvUSD to the treasury
-    platform_fee: uint256 = staticcall IStrategy(swapper.strategy).platform_fee()
-    treasury: address = swapper._treasury()
-    swapper._collect_fee(treasury, constants.CRVUSD_TOKEN, crvusd_received, platform_fee)
+    # Platform fee for the treasury and caller incentive in crvUSD
+    platform_fee: uint256 = 0
+    caller_fee: uint256 = 0
+    platform_fee, caller_fee = swapper._take_fees(_caller, crvusd_received)
+    receipt.platform_fee = platform_fee
+    receipt.caller_fee = caller_fee
 
-    # Pay the caller incentive in crvUSD
-    caller_fee: uint256 = staticcall IStrategy(swapper.strategy).caller_fee()
-    swapper._collect_fee(_caller, constants.CRVUSD_TOKEN, crvusd_received, caller_fee)
-
-    # if we have a hook contract to handle further operations
-    if swapper.target_hook != empty(address):
-        raw_call(
-            swapper.target_hook,
-            _target_hook_calldata,
-            value=0,
-        )
-
-    target_asset: address = staticcall IStrategy(swapper.strategy).asset()
-    target_asset_balance: uint256 = staticcall IERC20(target_asset).balanceOf(self)
-    assert target_asset_balance >= _min_amount_out, "Slippage"
-    assert extcall IERC20(target_asset).transfer(
-        swapper.strategy,
-        target_asset_balance,
-        default_return_value=True,
-    )
-    return target_asset_balance
+    receipt.lp_deposited = swapper._process_target(_target_hook_calldata, _min_amount_out)
+    return receipt
@@ -4,12 +4,20 @@
 
 from ethereum.ercs import IERC20
 from src.modules import constants
+from src.interfaces import IStrategy
 from src.interfaces import IVaultFactory
+from src.interfaces import IVault
 
 factory: public(reentrant(immutable(address)))
 strategy: public(reentrant(address))
 extra_reward_hook: public(reentrant(address))
 target_hook: public(reentrant(address))
+# Whether fees are accrued instead of being paid out on every harvest (see set_fee_accrual)
+fee_accrual: public(reentrant(bool))
+# crvUSD caller fees owed to each recipient, held by the factory until claimed
+accrued_fees: public(reentrant(HashMap[address, uint256]))
+# crvUSD platform fees owed to the treasury, held by the factory until claimed
+accrued_platform_fees: public(reentrant(uint256))
 
 
 event RewardHookUpdated:
@@ -29,6 +37,10 @@ event FeeCollected:
     amount: uint256
 
 
+event FeeAccrualUpdated:
+    enabled: bool
+
+
 @deploy
 def __init__(_factory: address):
     """
@@ -85,12 +97,34 @@ def set_target_hook(_new_hook: address):
     @param _new_hook Address of the hook contract to call during swap operations
     @dev Only callable by strategy contract
     @dev Hook contract is responsible for adding crvUSD liq and returning the target LP asset
+    @dev Hooks allowlisted by the factory owner (see `target_hook_delegated`) are
+         delegatecalled instead
     """
     assert msg.sender == self.strategy, "Strategy only"
     self.target_hook = _new_hook
     log TargetHookUpdated(new_hook=_new_hook)
 
 
+@external
+@view
+def target_hook_delegated() -> bool:
+    """
+    @notice Whether the target hook is delegatecalled
+    @dev Hooks allowlisted in the factory's `delegated_hooks` spend the harvester's own
+         balance and mint the LP straight to the strategy, skipping the transfers to
+         the hook and back to the strategy. The allowlist is read on every harvest.
+    """
+    return self._is_delegated_hook(self.target_hook)
+
+
+@internal
+@view
+def _is_delegated_hook(_hook: address) -> bool:
+    if _hook == empty(address):
+        return False
+    return staticcall IVaultFactory(factory).delegated_hooks(_hook)
+
+
 @external
 def transfer_to_reward_hook(_token: address, _amount: uint256):
     """
@@ -143,6 +177,112 @@ def _collect_fee(
     return remaining_amount
 
 
+@internal
+def _take_fees(_caller: address, _crvusd_amount: uint256) -> (uint256, uint256):
+    """
+    @notice Take the platform and caller fees out of the harvested crvUSD
+    @param _caller Address to receive the caller fee
+    @param _crvusd_amount Harvested crvUSD the fees are computed on
+    @return The platform fee and the caller fee
+    @dev With fee accrual enabled, both fees are sent to the factory in a single
+         transfer and credited to the ledger instead of being paid out, which also
+         skips the treasury lookup.
+    """
+    platform_fee: uint256 = staticcall IStrategy(self.strategy).platform_fee()
+    caller_fee: uint256 = staticcall IStrategy(self.strategy).caller_fee()
+    if not self.fee_accrual:
+        # Pay the platform fee to the treasury and the caller incentive
+        remaining: uint256 = self._collect_fee(
+            self._treasury(), constants.CRVUSD_TOKEN, _crvusd_amount, platform_fee
+        )
+        platform_fee = _crvusd_amount - remaining
+        remaining = self._collect_fee(_caller, constants.CRVUSD_TOKEN, _crvusd_amount, caller_fee)
+        return platform_fee, _crvusd_amount - remaining
+
+    platform_fee = (_crvusd_amount * platform_fee) // constants.DECIMALS
+    caller_fee = (_crvusd_amount * caller_fee) // constants.DECIMALS
+    if platform_fee + caller_fee > 0:
+        assert extcall IERC20(constants.CRVUSD_TOKEN).transfer(factory, platform_fee + caller_fee)
+        self.accrued_platform_fees += platform_fee
+        self.accrued_fees[_caller] += caller_fee
+    return platform_fee, caller_fee
+
+
+@external
+def set_fee_accrual(_enabled: bool):
+    """
+    @notice Accrue the platform and caller fees instead of paying them on every harvest
+    @param _enabled Whether harvests accrue fees
+    @dev Accrued fees are held by the factory and claimed in bulk across harvesters with
+         factory.claim_fees. Fees accrued before disabling remain claimable.
+         Only callable by the vault's strategy managers or admins.
+    """
+    vault: IVault = IVault(staticcall IStrategy(self.strategy).vault())
+    assert (
+        staticcall vault.hasRole(staticcall vault.STRATEGY_MANAGER_ROLE(), msg.sender)
+        or staticcall vault.hasRole(staticcall vault.DEFAULT_ADMIN_ROLE(), msg.sender)
+    ), "Manager only"
+    self.fee_accrual = _enabled
+    log FeeAccrualUpdated(enabled=_enabled)
+
+
+@external
+def take_fees(_recipient: address, _platform: bool) -> uint256:
+    """
+    @notice Clear the fees accrued to a recipient for the factory to pay them out
+    @param _recipient Address the fees are owed to
+    @param _platform Whether the recipient is the treasury, to include the platform fees
+    @return Amount of crvUSD owed to the recipient
+    @dev Only callable by the factory, which holds the accrued crvUSD
+    """
+    assert msg.sender == factory, "Factory only"
+    amount: uint256 = self.accrued_fees[_recipient]
+    self.accrued_fees[_recipient] = 0
+    if _platform:
+        amount += self.accrued_platform_fees
+        self.accrued_platform_fees = 0
+    return amount
+
+
+@internal
+def _process_target(_target_hook_calldata: Bytes[4096], _min_amount_out: uint256) -> uint256:
+    """
+    @notice Run the target hook and hand the target asset over to the strategy
+    @param _target_hook_calldata Calldata to pass to target hook contract
+    @param _min_amount_out Minimum amount of target asset for the strategy
+    @return Amount of target asset received by the strategy
+    """
+    target_asset: address = staticcall IStrategy(self.strategy).asset()
+    target_hook: address = self.target_hook
+
+    if self._is_delegated_hook(target_hook):
+        # the hook mints the target asset to the strategy directly
+        strategy_balance: uint256 = staticcall IERC20(target_asset).balanceOf(self.strategy)
+        raw_call(target_hook, _target_hook_calldata, is_delegate_call=True)
+        received: uint256 = (
+            staticcall IERC20(target_asset).balanceOf(self.strategy) - strategy_balance
+        )
+        assert received >= _min_amount_out, "Slippage"
+        return received
+
+    if target_hook != empty(address):
+        # the hook contract handles further operations
+        raw_call(
+            target_hook,
+            _target_hook_calldata,
+            value=0,
+        )
+
+    target_asset_balance: uint256 = staticcall IERC20(target_asset).balanceOf(self)
+    assert target_asset_balance >= _min_amount_out, "Slippage"
+    assert extcall IERC20(target_asset).transfer(
+        self.strategy,
+        target_asset_balance,
+        default_return_value=True,
+    )
+    return target_asset_balance
+
+
 @external
 def forward_tokens(
     _tokens: DynArray[address, constants.MAX_REWARD_TOKENS + 2], _recipient: address
@@ -0,0 +1,81 @@
+# pragma version 0.4.3
+# @license MIT
+
+"""
+@title Blueprint Utilities
+@notice Helpers to predict the address of contracts deployed with
+        `create_from_blueprint(..., salt=...)`
+@dev The init code of a blueprint deployment is the blueprint's code stripped
+     of its ERC-5202 preamble, followed by the ABI encoded constructor args.
+     Code can only be copied with a constant length and `slice` reverts when
+     reading past the end of the code, so the code is read through two
+     overlapping constant sized windows (head and tail) whose size is picked
+     from a power of two ladder so that `W <= code_length <= 2 * W`.
+"""
+
+
+# ERC-5202 preamble (0xFE7100) prepended by `deploy_as_blueprint`
+BLUEPRINT_PREAMBLE_LENGTH: constant(uint256) = 3
+MAX_CODE_SIZE: constant(uint256) = 24576
+
+
+@internal
+@view
+def _blueprint_code(_blueprint: address) -> Bytes[MAX_CODE_SIZE]:
+    """
+    @notice Returns the init code stored in a blueprint contract
+    @param _blueprint Address of the blueprint contract
+    @return The blueprint's code without its ERC-5202 preamble
+    """
+    code_size: uint256 = _blueprint.codesize
+    assert code_size > BLUEPRINT_PREAMBLE_LENGTH, "Invalid blueprint"
+    length: uint256 = code_size - BLUEPRINT_PREAMBLE_LENGTH
+    assert length <= MAX_CODE_SIZE, "Blueprint too large"
+
+    if length >= 12288:
+        return concat(
+            slice(_blueprint.code, BLUEPRINT_PREAMBLE_LENGTH, 12288),
+            slice(slice(_blueprint.code, code_size - 12288, 12288), 24576 - length, length - 12288),
+        )
+    if length >= 6144:
+        return concat(
+            slice(_blueprint.code, BLUEPRINT_PREAMBLE_LENGTH, 6144),
+            slice(slice(_blueprint.code, code_size - 6144, 6144), 12288 - length, length - 6144),
+        )
+    if length >= 3072:
+        return concat(
+            slice(_blueprint.code, BLUEPRINT_PREAMBLE_LENGTH, 3072),
+            slice(slice(_blueprint.code, code_size - 3072, 3072), 6144 - length, length - 3072),
+        )
+    if length >= 1536:
+        return concat(
+            slice(_blueprint.code, BLUEPRINT_PREAMBLE_LENGTH, 1536),
+            slice(slice(_blueprint.code, code_size - 1536, 1536), 3072 - length, length - 1536),
+        )
+    assert length >= 768, "Blueprint too small"
+    return concat(
+        slice(_blueprint.code, BLUEPRINT_PREAMBLE_LENGTH, 768),
+        slice(slice(_blueprint.code, code_size - 768, 768), 1536 - length, length - 768),
+    )
+
+
+@internal
+@view
+def _compute_address(_blueprint: address, _args: Bytes[512], _salt: bytes32) -> address:
+    """
+    @notice Computes the address of a contract deployed by this contract
+            from a blueprint with CREATE2
+    @param _blueprint Address of the blueprint contract
+    @param _args ABI encoded constructor arguments
+    @param _salt Salt passed to `create_from_blueprint`
+    @return The address the contract will be (or was) deployed at
+    """
+    init_code_hash: bytes32 = keccak256(concat(self._blueprint_code(_blueprint), _args))
+    return convert(
+        convert(
+            keccak256(concat(x"ff", convert(self, bytes20), _salt, init_code_hash)),
+            uint256,
+        )
+        & convert(max_value(uint160), uint256),
+        address,
+    )
@@ -52,6 +52,21 @@ exports: (
     erc4626.unlocked_shares,
     erc4626.withdraw,
     erc4626.MIN_SHARES,
+    erc4626.PPS_CHECKPOINTS,
+    erc4626.PPS_CHECKPOINT_INTERVAL,
+    erc4626.pps_checkpoint_count,
+    erc4626.pps_checkpoints,
+    erc4626.REDEEM_ESCROW,
+    erc4626.cancelRedeemRequest,
+    erc4626.claim_redeem,
+    erc4626.claimableRedeemRequest,
+    erc4626.claimable_assets,
+    erc4626.current_redeem_epoch,
+    erc4626.idle_assets,
+    erc4626.pendingRedeemRequest,
+    erc4626.redeem_epoch_start,
+    erc4626.redeem_epochs,
+    erc4626.requestRedeem,
 )
 
 exports: (
@@ -70,14 +85,33 @@ event UpdateProfitMaxUnlockTime:
     profit_max_unlock_time: uint256
 
 
+event UpdateRedeemEpochDuration:
+    redeem_epoch_duration: uint256
+
+
+event Harvested:
+    caller_fee_receiver: indexed(address)
+    receipt: IHarvester.HarvestReceipt
+
+
 last_harvest: public(uint256)
 
+# Minimum time an epoch of the redemption queue collects requests before
+# anyone can settle it
+redeem_epoch_duration: public(uint256)
+MAX_REDEEM_EPOCH_DURATION: constant(uint256) = 7 * 86400
+
 # Access control roles
 STRATEGY_MANAGER_ROLE: public(constant(bytes32)) = keccak256("STRATEGY_MANAGER_ROLE")
 
 # Can be made permissionless by setting to a permissionless proxy contract
 HARVESTER_ROLE: public(constant(bytes32)) = keccak256("HARVESTER_ROLE")
 
+# multicall bounds
+MAX_MULTICALL_CALLS: constant(uint256) = 8
+MAX_MULTICALL_CALLDATA: constant(uint256) = 1024
+MAX_MULTICALL_RETURNDATA: constant(uint256) = 1024
+
 
 @deploy
 def __init__(
@@ -105,6 +139,16 @@ def __init__(
         _strategy,
         _profit_max_unlock_time,
     )
+    self.redeem_epoch_duration = 86400
+
+
+@internal
+@view
+def _check_manager():
+    assert (
+        access_control.hasRole[STRATEGY_MANAGER_ROLE][msg.sender]
+        or access_control.hasRole[access_control.DEFAULT_ADMIN_ROLE][msg.sender]
+    )
 
 
 @external
@@ -119,15 +163,20 @@ def set_caller_fee(_new_caller_fee: uint256):
     extcall IStrategy(erc4626.strategy).set_caller_fee(_new_caller_fee)
 
 
+@external
+def set_harvest_trigger(_harvest_gas_estimate: uint256, _max_harvest_interval: uint256):
+    self._check_manager()
+    extcall IStrategy(erc4626.strategy).set_harvest_trigger(
+        _harvest_gas_estimate, _max_harvest_interval
+    )
+
+
 @external
 def update_harvester(
     _new_harvester: address,
     _migration_tokens: DynArray[address, constants.MAX_REWARD_TOKENS + 2] = [],
 ):
-    assert (
-        access_control.hasRole[STRATEGY_MANAGER_ROLE][msg.sender]
-        or access_control.hasRole[access_control.DEFAULT_ADMIN_ROLE][msg.sender]
-    )
+    self._check_manager()
     harvester: address = staticcall IStrategy(erc4626.strategy).harvester()
 
     # Forward any stranded tokens from old to new harvester
@@ -157,10 +206,7 @@ def migrate_booster(
     @param _new_booster_id New Convex pool ID to use for deposits
     @dev Only callable by strategy managers or admin. Updates factory registry.
     """
-    assert (
-        access_control.hasRole[STRATEGY_MANAGER_ROLE][msg.sender]
-        or access_control.hasRole[access_control.DEFAULT_ADMIN_ROLE][msg.sender]
-    )
+    self._check_manager()
     extcall IStrategy(erc4626.strategy).migrate_booster(_new_booster_id, _extra_rewards)
 
     # Update factory registry with new booster_id
@@ -179,22 +225,37 @@ def admin_unwind_rewards(
 
 @external
 def set_extra_reward_hook(_new_hook: address):
-    assert (
-        access_control.hasRole[STRATEGY_MANAGER_ROLE][msg.sender]
-        or access_control.hasRole[access_control.DEFAULT_ADMIN_ROLE][msg.sender]
-    )
+    self._check_manager()
     extcall IStrategy(erc4626.strategy).set_extra_reward_hook(_new_hook)
 
 
 @external
 def set_target_hook(_new_hook: address):
-    assert (
-        access_control.hasRole[STRATEGY_MANAGER_ROLE][msg.sender]
-        or access_control.hasRole[access_control.DEFAULT_ADMIN_ROLE][msg.sender]
-    )
+    self._check_manager()
     extcall IStrategy(erc4626.strategy).set_target_hook(_new_hook)
 
 
+@internal
+def _before_harvest():
+    assert access_control.hasRole[HARVESTER_ROLE][msg.sender]
+
+    # no harvest if no users / nothing was minted
+    assert erc4626.erc20.totalSupply > 0, "No supply"
+
+
+@internal
+def _after_harvest(_caller_fee_receiver: address, _receipt: IHarvester.HarvestReceipt):
+    # The strategy reports the profit and its assets after the harvest, so they do not
+    # have to be read before and after it. Process streaming (if enabled)
+    total_assets: uint256 = _receipt.total_assets + erc4626.idle_assets
+    if _receipt.profit > 0:
+        erc4626._process_profit_streaming(_receipt.profit, total_assets - _receipt.profit)
+
+    erc4626._checkpoint(total_assets)
+    self.last_harvest = block.timestamp
+    log Harvested(caller_fee_receiver=_caller_fee_receiver, receipt=_receipt)
+
+
 @external
 def harvest(
     _caller_fee_receiver: address,
@@ -214,17 +275,12 @@ def harvest(
     @param _harvester_calldata Calldata to pass to harvester
     @dev Only callable by addresses with HARVESTER_ROLE. Profit streaming is automatic
          but can be disabled by setting profit_max_unlock_time to 0.
+         Emits the harvest receipt returned by the strategy.
     """
-    assert access_control.hasRole[HARVESTER_ROLE][msg.sender]
-
-    # no harvest if no users / nothing was minted
-    assert erc4626.erc20.totalSupply > 0, "No supply"
-
-    # Capture assets before harvest for profit calculation
-    pre_harvest_assets: uint256 = staticcall IStrategy(erc4626.strategy).total_assets()
+    self._before_harvest()
 
     # Execute harvest
-    extcall IStrategy(erc4626.strategy).harvest(
+    receipt: IHarvester.HarvestReceipt = extcall IStrategy(erc4626.strategy).harvest(
         _caller_fee_receiver,
         _min_amount_out,
         _extra_rewards,
@@ -233,13 +289,59 @@ def harvest(
         _harvester_calldata,
     )
 
-    # Calculate profit and process streaming (if enabled)
-    post_harvest_assets: uint256 = staticcall IStrategy(erc4626.strategy).total_assets()
-    if post_harvest_assets > pre_harvest_assets:
-        profit: uint256 = post_harvest_assets - pre_harvest_assets
-        erc4626._process_profit_streaming(profit, pre_harvest_assets)
+    self._after_harvest(_caller_fee_receiver, receipt)
 
-    self.last_harvest = block.timestamp
+
+@external
+def harvest_with_profile(
+    _caller_fee_receiver: address,
+    _profile_id: uint256,
+    _min_amount_out: uint256,
+    _min_outs: DynArray[uint256, constants.MAX_PROFILE_SLOTS],
+):
+    """
+    @notice Execute harvest with the calldata of a stored harvest profile
+    @param _caller_fee_receiver Address to receive caller fee
+    @param _profile_id Identifier of the profile registered with set_harvest_profile
+    @param _min_amount_out Minimum amount expected from final swap to target asset
+    @param _min_outs Min out words appended to the profile's templates, in slot order
+    @dev Only callable by addresses with HARVESTER_ROLE. Same as harvest with the cached
+         extra rewards of the strategy, but the calldata only carries the values that
+         change between harvests.
+    """
+    self._before_harvest()
+    receipt: IHarvester.HarvestReceipt = extcall IStrategy(erc4626.strategy).harvest_with_profile(
+        _caller_fee_receiver, _profile_id, _min_amount_out, _min_outs
+    )
+    self._after_harvest(_caller_fee_receiver, receipt)
+
+
+@external
+def set_harvest_profile(
+    _profile_id: uint256,
+    _reward_hook_calldata: Bytes[4096],
+    _target_hook_calldata: Bytes[4096],
+    _harvester_calldata: Bytes[4096],
+    _min_out_slots: uint256[3],
+):
+    """
+    @notice Register the harvest calldata of a profile in the strategy
+    @param _profile_id Identifier of the profile, an existing profile is replaced
+    @param _reward_hook_calldata Calldata template for the extra reward hook
+    @param _target_hook_calldata Calldata template for the target hook
+    @param _harvester_calldata Calldata template for the harvester
+    @param _min_out_slots Number of min out words harvest_with_profile appends to each
+                          template
+    @dev Only callable by strategy manager
+    """
+    self._check_manager()
+    extcall IStrategy(erc4626.strategy).set_harvest_profile(
+        _profile_id,
+        _reward_hook_calldata,
+        _target_hook_calldata,
+        _harvester_calldata,
+        _min_out_slots,
+    )
 
 
 @external
@@ -249,10 +351,7 @@ def set_profit_max_unlock_time(_new_profit_max_unlock_time: uint256):
     @param _new_profit_max_unlock_time The new profit max unlock time in seconds
     @dev Must be less than one year for security, only callable by strategy manager
     """
-    assert (
-        access_control.hasRole[STRATEGY_MANAGER_ROLE][msg.sender]
-        or access_control.hasRole[access_control.DEFAULT_ADMIN_ROLE][msg.sender]
-    )
+    self._check_manager()
     # unlock time < 1 year
     assert _new_profit_max_unlock_time <= 31_556_952, "profit unlock time too long"
 
@@ -268,3 +367,52 @@ def set_profit_max_unlock_time(_new_profit_max_unlock_time: uint256):
 
     erc4626.profit_max_unlock_time = _new_profit_max_unlock_time
     log UpdateProfitMaxUnlockTime(profit_max_unlock_time=_new_profit_max_unlock_time)
+
+
+@external
+def set_redeem_epoch_duration(_new_redeem_epoch_duration: uint256):
+    """
+    @notice Set the minimum duration of a redemption queue epoch
+    @param _new_redeem_epoch_duration The new epoch duration in seconds
+    @dev Must be at most one week, only callable by strategy manager or admin
+    """
+    self._check_manager()
+    assert _new_redeem_epoch_duration <= MAX_REDEEM_EPOCH_DURATION, "epoch too long"
+    self.redeem_epoch_duration = _new_redeem_epoch_duration
+    log UpdateRedeemEpochDuration(redeem_epoch_duration=_new_redeem_epoch_duration)
+
+
+@external
+def settle_redemptions():
+    """
+    @notice Settle the current epoch of the redemption queue
+    @dev Unstakes the epoch's redemptions, net of the deposits kept idle
+         during the epoch, with a single strategy withdrawal. Permissionless
+         once the epoch has lasted `redeem_epoch_duration`, harvesters can
+         settle earlier.
+    """
+    if block.timestamp < erc4626.redeem_epoch_start + self.redeem_epoch_duration:
+        assert access_control.hasRole[HARVESTER_ROLE][msg.sender], "Epoch not over"
+    erc4626._settle_redemptions()
+
+
+@external
+@reentrant
+def multicall(
+    _data: DynArray[Bytes[MAX_MULTICALL_CALLDATA], MAX_MULTICALL_CALLS]
+) -> DynArray[Bytes[MAX_MULTICALL_RETURNDATA], MAX_MULTICALL_CALLS]:
+    """
+    @notice Execute several calls to the vault in a single transaction
+    @dev Each call is delegatecalled into the vault so `msg.sender` is preserved,
+         e.g. `permit` followed by `redeem` on behalf of the signer.
+         Not nonreentrant itself so that the batched calls can take the lock.
+         Reverts the whole batch if any call reverts.
+    @param _data ABI encoded calls to the vault's external functions
+    @return The raw return data of each call
+    """
+    results: DynArray[Bytes[MAX_MULTICALL_RETURNDATA], MAX_MULTICALL_CALLS] = []
+    for call: Bytes[MAX_MULTICALL_CALLDATA] in _data:
+        results.append(
+            raw_call(self, call, max_outsize=MAX_MULTICALL_RETURNDATA, is_delegate_call=True)
+        )
+    return results
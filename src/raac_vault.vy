@@ -38,6 +38,7 @@ exports: (
     vault.getRoleAdmin,
     vault.grantRole,
     vault.harvest,
+    vault.harvest_with_profile,
     vault.hasRole,
     vault.last_harvest,
     vault.locked_shares,
@@ -46,6 +47,7 @@ exports: (
     vault.maxRedeem,
     vault.maxWithdraw,
     vault.mint,
+    vault.multicall,
     vault.name,
     vault.nonces,
     vault.permit,
@@ -62,6 +64,8 @@ exports: (
     vault.revokeRole,
     vault.set_caller_fee,
     vault.set_extra_reward_hook,
+    vault.set_harvest_profile,
+    vault.set_harvest_trigger,
     vault.set_platform_fee,
     vault.set_profit_max_unlock_time,
     vault.set_role_admin,
@@ -80,6 +84,24 @@ exports: (
     vault.update_harvester,
     vault.withdraw,
     vault.MIN_SHARES,
+    vault.PPS_CHECKPOINTS,
+    vault.PPS_CHECKPOINT_INTERVAL,
+    vault.pps_checkpoint_count,
+    vault.pps_checkpoints,
+    vault.REDEEM_ESCROW,
+    vault.cancelRedeemRequest,
+    vault.claim_redeem,
+    vault.claimableRedeemRequest,
+    vault.claimable_assets,
+    vault.current_redeem_epoch,
+    vault.idle_assets,
+    vault.pendingRedeemRequest,
+    vault.redeem_epoch_duration,
+    vault.redeem_epoch_start,
+    vault.redeem_epochs,
+    vault.requestRedeem,
+    vault.set_redeem_epoch_duration,
+    vault.settle_redemptions,
 )
 
 
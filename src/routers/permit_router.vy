@@ -0,0 +1,147 @@
+# pragma version 0.4.3
+# pragma nonreentrancy on
+"""
+@title Permit Router
+@custom:contract-name raac_permit_router
+@notice Deposits LP tokens into RAAC vaults in a single transaction using an
+        ERC-2612 or Permit2 signature instead of a prior `approve`
+@license MIT
+@author RAAC
+@dev The router never holds funds between transactions: LP tokens are pulled
+     from the caller and deposited into the vault within the same call.
+     Only vaults deployed by the factory are accepted.
+"""
+
+from ethereum.ercs import IERC20
+from src.modules import constants
+from src.interfaces import IVault
+from src.interfaces import IVaultFactory
+
+
+struct TokenPermissions:
+    token: address
+    amount: uint256
+
+
+struct PermitTransferFrom:
+    permitted: TokenPermissions
+    nonce: uint256
+    deadline: uint256
+
+
+struct SignatureTransferDetails:
+    to: address
+    requestedAmount: uint256
+
+
+interface IPermit2:
+    def permitTransferFrom(
+        _permit: PermitTransferFrom,
+        _transfer_details: SignatureTransferDetails,
+        _owner: address,
+        _signature: Bytes[MAX_SIGNATURE_LENGTH],
+    ): nonpayable
+
+
+# allows EIP-1271 signatures from smart contract wallets
+MAX_SIGNATURE_LENGTH: constant(uint256) = 1024
+
+FACTORY: public(immutable(address))
+
+
+@deploy
+def __init__(_factory: address):
+    """
+    @param _factory Address of the vault factory used to validate vaults
+    """
+    assert _factory != empty(address), "Invalid factory"
+    FACTORY = _factory
+
+
+@internal
+@view
+def _vault_asset(_vault: address) -> address:
+    vault_id: uint256 = staticcall IVaultFactory(FACTORY).vault_to_id(_vault)
+    record: IVaultFactory.VaultRecord = staticcall IVaultFactory(FACTORY).vault_registry(vault_id)
+    assert record.vault == _vault, "Vault not factory deployed"
+    return record.token
+
+
+@internal
+def _deposit(_vault: address, _asset: address, _assets: uint256, _receiver: address) -> uint256:
+    assert extcall IERC20(_asset).approve(_vault, _assets)
+    return extcall IVault(_vault).deposit(_assets, _receiver)
+
+
+@external
+def deposit_with_permit(
+    _vault: address,
+    _assets: uint256,
+    _receiver: address,
+    _deadline: uint256,
+    _v: uint8,
+    _r: bytes32,
+    _s: bytes32,
+) -> uint256:
+    """
+    @notice Deposit LP tokens into a vault using an ERC-2612 permit on the LP token
+    @dev The permit must be signed by the caller for this router as spender.
+         If the permit call fails (e.g. it was front-run with the same signature)
+         the deposit proceeds as long as the router has enough allowance.
+    @param _vault Address of the factory-deployed vault
+    @param _assets Amount of LP tokens to deposit
+    @param _receiver Address receiving the vault shares
+    @param _deadline Permit deadline
+    @param _v Signature v
+    @param _r Signature r
+    @param _s Signature s
+    @return The amount of vault shares minted
+    """
+    asset: address = self._vault_asset(_vault)
+    success: bool = raw_call(
+        asset,
+        abi_encode(
+            msg.sender,
+            self,
+            _assets,
+            _deadline,
+            _v,
+            _r,
+            _s,
+            method_id=method_id("permit(address,address,uint256,uint256,uint8,bytes32,bytes32)"),
+        ),
+        revert_on_failure=False,
+    )
+    if not success:
+        assert staticcall IERC20(asset).allowance(msg.sender, self) >= _assets, "Permit failed"
+    assert extcall IERC20(asset).transferFrom(msg.sender, self, _assets)
+    return self._deposit(_vault, asset, _assets, _receiver)
+
+
+@external
+def deposit_with_permit2(
+    _vault: address,
+    _permit: PermitTransferFrom,
+    _signature: Bytes[MAX_SIGNATURE_LENGTH],
+    _receiver: address,
+) -> uint256:
+    """
+    @notice Deposit LP tokens into a vault using a Permit2 signature transfer
+    @dev The caller must have approved Permit2 for the LP token and signed a
+         `PermitTransferFrom` for this router as spender. The full permitted
+         amount is deposited.
+    @param _vault Address of the factory-deployed vault
+    @param _permit Signed Permit2 transfer permit for the vault's LP token
+    @param _signature Signature of the caller over the permit
+    @param _receiver Address receiving the vault shares
+    @return The amount of vault shares minted
+    """
+    asset: address = self._vault_asset(_vault)
+    assert _permit.permitted.token == asset, "Wrong token"
+    extcall IPermit2(constants.PERMIT2).permitTransferFrom(
+        _permit,
+        SignatureTransferDetails(to=self, requestedAmount=_permit.permitted.amount),
+        msg.sender,
+        _signature,
+    )
+    return self._deposit(_vault, asset, _permit.permitted.amount, _receiver)
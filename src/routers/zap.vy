@@ -0,0 +1,183 @@
+# pragma version 0.4.3
+# pragma nonreentrancy on
+"""
+@title Vault Zap
+@custom:contract-name raac_vault_zap
+@notice Deposits a single pool coin (e.g. crvUSD) into a RAAC vault by adding
+        one-sided liquidity to the vault's Curve pool, and redeems vault shares
+        straight back to a single coin
+@license MIT
+@author RAAC
+@dev The Curve pool is resolved from the factory registry and the Convex Booster
+     `poolInfo`. Both NG pools (dynamic array amounts) and regular two-coin
+     pools are supported. The zap never holds funds between transactions.
+"""
+
+from ethereum.ercs import IERC20
+from src.modules import constants
+from src.interfaces import IBooster
+from src.interfaces import ICurveStableSwap
+from src.interfaces import ICurveStableSwapNG
+from src.interfaces import IVault
+from src.interfaces import IVaultFactory
+
+
+event ZapIn:
+    vault: address
+    coin: address
+    amount: uint256
+    shares: uint256
+    receiver: address
+
+
+event ZapOut:
+    vault: address
+    coin: address
+    shares: uint256
+    amount: uint256
+    receiver: address
+
+
+MAX_COINS: constant(uint256) = 8
+
+FACTORY: public(immutable(address))
+
+
+@deploy
+def __init__(_factory: address):
+    """
+    @param _factory Address of the vault factory used to resolve vaults
+    """
+    assert _factory != empty(address), "Invalid factory"
+    FACTORY = _factory
+
+
+@internal
+@view
+def _vault_pool(_vault: address) -> address:
+    vault_id: uint256 = staticcall IVaultFactory(FACTORY).vault_to_id(_vault)
+    record: IVaultFactory.VaultRecord = staticcall IVaultFactory(FACTORY).vault_registry(vault_id)
+    assert record.vault == _vault, "Vault not factory deployed"
+    pool_info: (address, address, address, address, address, bool) = staticcall IBooster(
+        constants.CONVEX_BOOSTER
+    ).poolInfo(record.booster_id)
+    # crvUSD pools are their own LP token
+    return pool_info[0]
+
+
+@internal
+@view
+def _try_get_n_coins(_pool: address) -> (bool, uint256):
+    """
+    @dev NG pools expose `N_COINS`, regular pools do not
+    """
+    success: bool = empty(bool)
+    return_data: Bytes[32] = b""
+    success, return_data = raw_call(
+        _pool,
+        method_id("N_COINS()"),
+        max_outsize=32,
+        is_static_call=True,
+        revert_on_failure=False,
+    )
+    if success and len(return_data) == 32:
+        return True, abi_decode(return_data, uint256)
+    return False, 2
+
+
+@internal
+@view
+def _coin_index(_pool: address, _coin: address, _n_coins: uint256) -> uint256:
+    for i: uint256 in range(MAX_COINS):
+        if i == _n_coins:
+            break
+        if staticcall ICurveStableSwap(_pool).coins(i) == _coin:
+            return i
+    raise "Coin not in pool"
+
+
+@external
+def zap_in(
+    _vault: address,
+    _coin: address,
+    _amount: uint256,
+    _min_shares: uint256,
+    _receiver: address,
+) -> uint256:
+    """
+    @notice Deposit a single pool coin into a vault
+    @dev Caller must have approved the zap to spend `_amount` of `_coin`.
+    @param _vault Address of the factory-deployed vault
+    @param _coin Address of the pool coin to deposit
+    @param _amount Amount of `_coin` to deposit
+    @param _min_shares Minimum amount of vault shares to receive
+    @param _receiver Address receiving the vault shares
+    @return The amount of vault shares minted
+    @custom:reverts
+        - If the vault is not factory-deployed or the coin is not in its pool
+        - If fewer than `_min_shares` shares are minted
+    """
+    pool: address = self._vault_pool(_vault)
+    is_ng: bool = False
+    n_coins: uint256 = 0
+    is_ng, n_coins = self._try_get_n_coins(pool)
+    coin_index: uint256 = self._coin_index(pool, _coin, n_coins)
+
+    assert extcall IERC20(_coin).transferFrom(msg.sender, self, _amount, default_return_value=True)
+    assert extcall IERC20(_coin).approve(pool, _amount, default_return_value=True)
+
+    lp_amount: uint256 = 0
+    if is_ng:
+        amounts: DynArray[uint256, MAX_COINS] = []
+        for i: uint256 in range(MAX_COINS):
+            if i == n_coins:
+                break
+            amounts.append(_amount if i == coin_index else 0)
+        lp_amount = extcall ICurveStableSwapNG(pool).add_liquidity(amounts, 0, self)
+    else:
+        amounts: uint256[2] = [0, 0]
+        amounts[coin_index] = _amount
+        lp_amount = extcall ICurveStableSwap(pool).add_liquidity(amounts, 0, self)
+
+    assert extcall IERC20(pool).approve(_vault, lp_amount)
+    shares: uint256 = extcall IVault(_vault).deposit(lp_amount, _receiver)
+    assert shares >= _min_shares, "Slippage"
+
+    log ZapIn(vault=_vault, coin=_coin, amount=_amount, shares=shares, receiver=_receiver)
+    return shares
+
+
+@external
+def zap_out(
+    _vault: address,
+    _shares: uint256,
+    _coin: address,
+    _min_amount_out: uint256,
+    _receiver: address,
+) -> uint256:
+    """
+    @notice Redeem vault shares and withdraw the LP as a single pool coin
+    @dev Caller must have approved the zap to spend `_shares` vault shares.
+    @param _vault Address of the factory-deployed vault
+    @param _shares Amount of vault shares to redeem
+    @param _coin Address of the pool coin to receive
+    @param _min_amount_out Minimum amount of `_coin` to receive
+    @param _receiver Address receiving the coins
+    @return The amount of `_coin` received
+    @custom:reverts
+        - If the vault is not factory-deployed or the coin is not in its pool
+        - If less than `_min_amount_out` is received
+    """
+    pool: address = self._vault_pool(_vault)
+    is_ng: bool = False
+    n_coins: uint256 = 0
+    is_ng, n_coins = self._try_get_n_coins(pool)
+    coin_index: uint256 = self._coin_index(pool, _coin, n_coins)
+
+    lp_amount: uint256 = extcall IVault(_vault).redeem(_shares, self, msg.sender)
+    amount: uint256 = extcall ICurveStableSwap(pool).remove_liquidity_one_coin(
+        lp_amount, convert(coin_index, int128), _min_amount_out, _receiver
+    )
+
+    log ZapOut(vault=_vault, coin=_coin, shares=_shares, amount=amount, receiver=_receiver)
+    return amount
@@ -23,7 +23,11 @@ from src.modules import constants
 from src.interfaces import IBooster
 from src.interfaces import IConvexStaking
 from src.interfaces import IBasicRewards
+from src.interfaces import IVirtualRewards
 from src.interfaces import IHarvester
+from src.interfaces import IVault
+from src.interfaces import ICurveV2Pool
+from src.interfaces import ICurveTriCryptoFactoryNG
 
 # The LP token being managed by this strategy
 asset: public(reentrant(immutable(address)))
@@ -39,6 +43,37 @@ platform_fee: public(reentrant(uint256))
 caller_fee: public(reentrant(uint256))
 # Vault contract that owns the strategy
 vault: public(reentrant(address))
+# Gas used by a harvest, weighed against the caller fee by harvest_trigger
+harvest_gas_estimate: public(uint256)
+# Time after which harvest_trigger fires regardless of gas costs (0 to disable)
+max_harvest_interval: public(uint256)
+# Extra reward tokens of rewards_contract, see refresh_extra_rewards
+cached_extra_rewards: DynArray[address, constants.MAX_REWARD_TOKENS]
+# Whether harvests that do not pass an extra reward list process cached_extra_rewards
+extra_reward_cache_enabled: public(bool)
+# Contracts whose code holds the calldata templates of each harvest profile
+harvest_profiles: public(HashMap[uint256, address])
+# Whether total_assets returns tracked_assets instead of querying the rewards contract
+asset_tracking: public(bool)
+# Staked assets accounted in storage, only maintained while asset_tracking is enabled
+tracked_assets: public(uint256)
+
+# Extra reward pools scanned by refresh_extra_rewards
+MAX_EXTRA_REWARD_POOLS: constant(uint256) = 32
+
+# Harvest profiles hold a header (template lengths, then min out slots of each template)
+# followed by the reward hook, target hook and harvester calldata templates
+PROFILE_HEADER_SIZE: constant(uint256) = 192
+# Combined size of the templates of a profile once their min outs are appended
+MAX_PROFILE_TEMPLATES_SIZE: constant(uint256) = 4096
+MAX_PROFILE_SIZE: constant(uint256) = PROFILE_HEADER_SIZE + MAX_PROFILE_TEMPLATES_SIZE
+# ABI encoded size of a HarvestReceipt returned by the harvester
+HARVEST_RECEIPT_SIZE: constant(uint256) = 32 + 8 * 32 + 2 * (32 + constants.MAX_TOKENS * 32)
+
+# Convex CVX minting schedule
+CVX_TOTAL_CLIFFS: constant(uint256) = 1000
+CVX_REDUCTION_PER_CLIFF: constant(uint256) = 100_000 * 10**18
+CVX_MAX_SUPPLY: constant(uint256) = 100_000_000 * 10**18
 
 
 event HarvesterUpdated:
@@ -57,9 +92,32 @@ event VaultSet:
     vault: address
 
 
-event Harvest:
-    caller: address
-    amount: uint256
+event ExtraRewardsRefreshed:
+    rewards_contract: address
+    tokens: DynArray[address, constants.MAX_REWARD_TOKENS]
+
+
+event HarvestProfileSet:
+    profile_id: indexed(uint256)
+    profile: address
+
+
+event HarvestTriggerUpdated:
+    harvest_gas_estimate: uint256
+    max_harvest_interval: uint256
+
+
+event AssetTrackingUpdated:
+    enabled: bool
+
+
+event ExtraRewardCacheUpdated:
+    enabled: bool
+
+
+event AssetsReconciled:
+    previous_assets: uint256
+    staked_assets: uint256
 
 
 @deploy
@@ -83,6 +141,8 @@ def __init__(
     self.harvester = _harvester
     self.platform_fee = 2000  # 20%
     self.caller_fee = 100  # 1%
+    self.harvest_gas_estimate = 1_000_000
+    self.max_harvest_interval = 7 * 86400
 
 
 @external
@@ -137,6 +197,21 @@ def set_caller_fee(_caller_fee: uint256):
     log CallerFeeUpdated(caller_fee=_caller_fee)
 
 
+@external
+def set_harvest_trigger(_harvest_gas_estimate: uint256, _max_harvest_interval: uint256):
+    """
+    @notice Update the parameters used by harvest_trigger
+    @param _harvest_gas_estimate Gas used by a harvest with the current harvester
+    @param _max_harvest_interval Time after which a harvest is always due (0 to disable)
+    """
+    assert msg.sender == self.vault, "Vault only"
+    self.harvest_gas_estimate = _harvest_gas_estimate
+    self.max_harvest_interval = _max_harvest_interval
+    log HarvestTriggerUpdated(
+        harvest_gas_estimate=_harvest_gas_estimate, max_harvest_interval=_max_harvest_interval
+    )
+
+
 @external
 def update_harvester(_harvester: address):
     """
@@ -177,9 +252,12 @@ def migrate_booster(
     """
     @notice One-shot migration to a new Convex booster pool.
     @param _new_booster_id New Convex pool ID
-    @param _extra_rewards Optional extra reward tokens to forward along with CRV/CVX
+    @param _extra_rewards Optional extra reward tokens to forward along with CRV/CVX,
+                          defaults to the cached extra rewards of the old pool if
+                          extra_reward_cache_enabled
     @dev Claims rewards from old pool, forwards to harvester, unstakes LP, updates
          pointers using Booster.poolInfo, and deposits LP into the new pool.
+    @dev The extra reward cache is refreshed for the new pool.
     """
     assert msg.sender == self.vault, "Vault only"
 
@@ -198,8 +276,11 @@ def migrate_booster(
     self._forward_rewards([constants.CVX_TOKEN, constants.CRV_TOKEN])
 
     # forward extra rewards if any
-    if len(_extra_rewards) > 0:
-        self._forward_rewards(_extra_rewards)
+    extra_rewards: DynArray[address, constants.MAX_REWARD_TOKENS] = self._resolve_extra_rewards(
+        _extra_rewards
+    )
+    if len(extra_rewards) > 0:
+        self._forward_rewards(extra_rewards)
 
     staked_balance: uint256 = staticcall IBasicRewards(old_rewards).balanceOf(self)
     if staked_balance > 0:
@@ -212,11 +293,14 @@ def migrate_booster(
     assert pool_info[5] == False, "New pool shutdown"
     self.booster_id = _new_booster_id
     self.rewards_contract = pool_info[3]
+    self._refresh_extra_rewards()
 
     # deposit any LP held by the strategy into the new pool
     lp_balance: uint256 = staticcall IERC20(asset).balanceOf(self)
     if lp_balance > 0:
         self._deposit(lp_balance)
+    if self.asset_tracking:
+        self._reconcile_assets()
 
 
 @external
@@ -226,6 +310,8 @@ def admin_unwind_rewards(
     """
     @notice Claim rewards from current rewards contract and forward to a specified address.
     @dev Vault-only. Requires the current pool to be shutdown on Booster. Does not move LP.
+    @dev An empty `_extra_rewards` forwards the cached extra rewards if
+         extra_reward_cache_enabled.
     """
     assert msg.sender == self.vault, "Vault only"
     assert _to != empty(address), "Zero recipient"
@@ -241,10 +327,13 @@ def admin_unwind_rewards(
         constants.CRV_TOKEN,
         constants.CVX_TOKEN,
     ]
+    extra_rewards: DynArray[address, constants.MAX_REWARD_TOKENS] = self._resolve_extra_rewards(
+        _extra_rewards
+    )
     for i: uint256 in range(constants.MAX_REWARD_TOKENS):
-        if i == len(_extra_rewards):
+        if i == len(extra_rewards):
             break
-        tokens_to_forward.append(_extra_rewards[i])
+        tokens_to_forward.append(extra_rewards[i])
 
     for i: uint256 in range(constants.MAX_TOKENS):
         if i == len(tokens_to_forward):
@@ -276,6 +365,8 @@ def withdraw(_amount: uint256, _receiver: address):
     # No need to claim rewards on withdrawal as they are for the whole vault
     # and can be claimed during next harvest
     extcall IConvexStaking(self.rewards_contract).withdrawAndUnwrap(_amount, False)
+    if self.asset_tracking:
+        self.tracked_assets -= _amount
     assert extcall IERC20(asset).transfer(
         _receiver, _amount, default_return_value=True
     ), "erc4626: transfer operation did not succeed"
@@ -288,13 +379,180 @@ def total_assets() -> uint256:
     @notice Get the total amount of underlying assets managed by this strategy
     @return The total balance of LP tokens staked in the Convex rewards contract
     @dev This represents assets actively earning rewards, unstaked tokens not included
+    @dev Read from storage while asset_tracking is enabled
     """
+    return self._total_assets()
+
+
+@internal
+@view
+def _total_assets() -> uint256:
+    if self.asset_tracking:
+        return self.tracked_assets
     return staticcall IBasicRewards(self.rewards_contract).balanceOf(self)
 
 
 @internal
 def _deposit(_amount: uint256):
     extcall IBooster(constants.CONVEX_BOOSTER).deposit(self.booster_id, _amount, True)
+    if self.asset_tracking:
+        self.tracked_assets += _amount
+
+
+@internal
+def _reconcile_assets():
+    previous_assets: uint256 = self.tracked_assets
+    staked_assets: uint256 = staticcall IBasicRewards(self.rewards_contract).balanceOf(self)
+    self.tracked_assets = staked_assets
+    log AssetsReconciled(previous_assets=previous_assets, staked_assets=staked_assets)
+
+
+@internal
+@view
+def _check_manager():
+    vault: IVault = IVault(self.vault)
+    assert (
+        staticcall vault.hasRole(staticcall vault.STRATEGY_MANAGER_ROLE(), msg.sender)
+        or staticcall vault.hasRole(staticcall vault.DEFAULT_ADMIN_ROLE(), msg.sender)
+    ), "Manager only"
+
+
+@external
+def set_asset_tracking(_enabled: bool):
+    """
+    @notice Track the staked assets in storage instead of querying the rewards contract
+    @param _enabled Whether total_assets should read the tracked assets
+    @dev The vault's conversion views call total_assets, tracking turns the
+         rewards contract balanceOf they forward to into a storage read.
+         Enabling reconciles the tracked assets with the staked balance.
+         Only callable by the vault's strategy managers or admins.
+    """
+    self._check_manager()
+    if _enabled:
+        self._reconcile_assets()
+    self.asset_tracking = _enabled
+    log AssetTrackingUpdated(enabled=_enabled)
+
+
+@external
+def reconcile_assets():
+    """
+    @notice Set the tracked assets to the balance staked in the rewards contract
+    @dev Accounts for LP staked on behalf of the strategy by third parties, which
+         tracking otherwise ignores. Only callable by the vault's strategy
+         managers or admins.
+    """
+    self._check_manager()
+    assert self.asset_tracking, "Tracking disabled"
+    self._reconcile_assets()
+
+
+@internal
+@view
+def _resolve_extra_rewards(
+    _extra_rewards: DynArray[address, constants.MAX_REWARD_TOKENS]
+) -> DynArray[address, constants.MAX_REWARD_TOKENS]:
+    if len(_extra_rewards) > 0 or not self.extra_reward_cache_enabled:
+        return _extra_rewards
+    return self.cached_extra_rewards
+
+
+@internal
+@view
+def _reward_token(_stash: address, _extra_reward_pool: address) -> address:
+    """
+    @notice Token paid out by a Convex extra reward pool
+    @dev Stash token wrappers of newer Convex pools pay out their `token()`. A reward
+         token is only unwrapped if the pool's stash registered it as the wrapper of
+         that token for this extra reward pool.
+    """
+    token: address = staticcall IVirtualRewards(_extra_reward_pool).rewardToken()
+    success: bool = False
+    response: Bytes[96] = b""
+    success, response = raw_call(
+        token,
+        method_id("token()"),
+        max_outsize=32,
+        is_static_call=True,
+        revert_on_failure=False,
+    )
+    if not success or len(response) != 32:
+        return token
+    wrapped: address = convert(slice(response, 12, 20), address)
+
+    # tokenInfo(token) -> (token, rewardAddress, wrapperAddress)
+    success, response = raw_call(
+        _stash,
+        abi_encode(wrapped, method_id=method_id("tokenInfo(address)")),
+        max_outsize=96,
+        is_static_call=True,
+        revert_on_failure=False,
+    )
+    if (
+        success
+        and len(response) == 96
+        and convert(slice(response, 44, 20), address) == _extra_reward_pool
+        and convert(slice(response, 76, 20), address) == token
+    ):
+        return wrapped
+    return token
+
+
+@internal
+def _refresh_extra_rewards():
+    rewards_contract: address = self.rewards_contract
+    stash: address = (staticcall IBooster(constants.CONVEX_BOOSTER).poolInfo(self.booster_id))[4]
+    pool_count: uint256 = staticcall IBasicRewards(rewards_contract).extraRewardsLength()
+    tokens: DynArray[address, constants.MAX_REWARD_TOKENS] = []
+    for i: uint256 in range(MAX_EXTRA_REWARD_POOLS):
+        if i == pool_count or len(tokens) == constants.MAX_REWARD_TOKENS:
+            break
+        token: address = self._reward_token(
+            stash, staticcall IBasicRewards(rewards_contract).extraRewards(i)
+        )
+        # CVX can be listed as an extra reward, it is always forwarded anyway
+        if token in [constants.CRV_TOKEN, constants.CVX_TOKEN] or token in tokens:
+            continue
+        tokens.append(token)
+    self.cached_extra_rewards = tokens
+    log ExtraRewardsRefreshed(rewards_contract=rewards_contract, tokens=tokens)
+
+
+@external
+def refresh_extra_rewards():
+    """
+    @notice Cache the extra reward tokens listed by the Convex rewards contract
+    @dev While the cache is enabled, harvests without an explicit extra reward list
+         process the cached tokens, so CoW harvests must pass a buy amount for each of
+         them (after CRV and CVX). Only callable by the vault's strategy managers or
+         admins, refreshing changes the tokens keepers have to account for.
+    """
+    self._check_manager()
+    self._refresh_extra_rewards()
+
+
+@external
+def set_extra_reward_cache(_enabled: bool):
+    """
+    @notice Process the cached extra rewards in harvests that do not pass a list
+    @param _enabled Whether an empty extra reward list uses the cached extra rewards
+    @dev Disabled by default, an empty list then only processes CRV and CVX.
+         Only callable by the vault's strategy managers or admins.
+    """
+    self._check_manager()
+    self.extra_reward_cache_enabled = _enabled
+    log ExtraRewardCacheUpdated(enabled=_enabled)
+
+
+@external
+@view
+def extra_rewards() -> DynArray[address, constants.MAX_REWARD_TOKENS]:
+    """
+    @notice Extra reward tokens processed by harvests that do not pass a list, while
+            extra_reward_cache_enabled
+    @return The cached extra reward tokens
+    """
+    return self.cached_extra_rewards
 
 
 @internal
@@ -329,6 +587,18 @@ def _collect(_extra_rewards: DynArray[address, constants.MAX_REWARD_TOKENS]):
         self._forward_rewards(_extra_rewards)
 
 
+@internal
+def _compound(_target_asset_amount: uint256) -> uint256:
+    """
+    @notice Deposit the target asset received by the harvester
+    @param _target_asset_amount Amount of target asset received
+    @return The total assets after the deposit
+    """
+    if _target_asset_amount > 0:
+        self._deposit(_target_asset_amount)
+    return self._total_assets()
+
+
 @external
 def harvest(
     _caller: address,
@@ -337,32 +607,212 @@ def harvest(
     _reward_hook_calldata: Bytes[4096],
     _target_hook_calldata: Bytes[4096],
     _harvester_calldata: Bytes[4096],
-):
+) -> IHarvester.HarvestReceipt:
     """
     @notice Harvest rewards and compound them back into the strategy
     @param _min_amount_out Minimum amount of target asset expected from harvesting
     @param _caller Address of the account initiating the harvest (for the caller fee)
-    @param _extra_rewards Array of additional reward token addresses to collect
+    @param _extra_rewards Array of additional reward token addresses to collect, an empty
+                          array uses the cached extra rewards if extra_reward_cache_enabled
+                          (see refresh_extra_rewards)
     @param _reward_hook_calldata Calldata to pass to the reward processing hook
     @param _target_hook_calldata Calldata to pass to the target processing hook
     @param _harvester_calldata Calldata to pass to the harvester (Optional)
+    @return Harvest receipt, with the profit and the total assets after the harvest
     @dev Collects rewards, processes them via harvester, and re-deposits the result
     @dev The harvester handles the actual reward swapping, fee collection, and
          distribution
     """
     assert msg.sender == self.vault, "Vault only"
-    self._collect(_extra_rewards)
-    target_asset_balance: uint256 = extcall IHarvester(self.harvester).harvest(
+    extra_rewards: DynArray[address, constants.MAX_REWARD_TOKENS] = self._resolve_extra_rewards(
+        _extra_rewards
+    )
+    self._collect(extra_rewards)
+    receipt: IHarvester.HarvestReceipt = extcall IHarvester(self.harvester).harvest(
         _caller,
         _min_amount_out,
-        _extra_rewards,
+        extra_rewards,
         _reward_hook_calldata,
         _target_hook_calldata,
         _harvester_calldata,
     )
-    if target_asset_balance > 0:
-        self._deposit(target_asset_balance)
-        log Harvest(caller=_caller, amount=target_asset_balance)
+    receipt.total_assets = self._compound(receipt.lp_deposited)
+    receipt.profit = receipt.lp_deposited
+    return receipt
+
+
+@external
+def set_harvest_profile(
+    _profile_id: uint256,
+    _reward_hook_calldata: Bytes[4096],
+    _target_hook_calldata: Bytes[4096],
+    _harvester_calldata: Bytes[4096],
+    _min_out_slots: uint256[3],
+):
+    """
+    @notice Store the calldata of a harvest profile for harvest_with_profile
+    @param _profile_id Identifier of the profile, an existing profile is replaced
+    @param _reward_hook_calldata Calldata template for the reward processing hook
+    @param _target_hook_calldata Calldata template for the target processing hook
+    @param _harvester_calldata Calldata template for the harvester
+    @param _min_out_slots Number of min out words appended to the reward hook, target hook
+                          and harvester templates, e.g. 1 for an add_liquidity target hook
+                          template without its trailing `min_out` argument
+    @dev The profile is deployed as the code of a data contract: reading it back costs a
+         call and a copy, where storage would cost a cold SLOAD per word.
+    """
+    assert msg.sender == self.vault, "Vault only"
+    slot_count: uint256 = _min_out_slots[0] + _min_out_slots[1] + _min_out_slots[2]
+    assert slot_count <= constants.MAX_PROFILE_SLOTS, "Too many slots"
+    assert (
+        len(_reward_hook_calldata)
+        + len(_target_hook_calldata)
+        + len(_harvester_calldata)
+        + slot_count * 32
+        <= MAX_PROFILE_TEMPLATES_SIZE
+    ), "Profile too large"
+
+    profile: Bytes[PROFILE_HEADER_SIZE + 3 * 4096] = concat(
+        abi_encode(
+            len(_reward_hook_calldata),
+            len(_target_hook_calldata),
+            len(_harvester_calldata),
+            _min_out_slots,
+        ),
+        _reward_hook_calldata,
+        _target_hook_calldata,
+        _harvester_calldata,
+    )
+    profile_size: bytes2 = convert(convert(len(profile), uint16), bytes2)
+    code_size: bytes2 = convert(convert(len(profile) + 12, uint16), bytes2)
+    # the init code returns the runtime code, whose 12 byte header returns the profile
+    # appended to it whenever the contract is called
+    profile_contract: address = raw_create(
+        concat(
+            x"61",
+            code_size,
+            x"80600a5f395ff3",
+            x"61",
+            profile_size,
+            x"600c5f39",
+            x"61",
+            profile_size,
+            x"5ff3",
+            profile,
+        )
+    )
+    self.harvest_profiles[_profile_id] = profile_contract
+    log HarvestProfileSet(profile_id=_profile_id, profile=profile_contract)
+
+
+@internal
+@view
+def _profile_contract(_profile_id: uint256) -> address:
+    profile_contract: address = self.harvest_profiles[_profile_id]
+    assert profile_contract != empty(address), "Unknown profile"
+    return profile_contract
+
+
+@external
+@view
+def harvest_profile(
+    _profile_id: uint256,
+) -> (Bytes[MAX_PROFILE_SIZE], Bytes[MAX_PROFILE_SIZE], Bytes[MAX_PROFILE_SIZE], uint256[3]):
+    """
+    @notice Calldata templates and min out slots of a harvest profile
+    @param _profile_id Identifier of the profile
+    @return Reward hook, target hook and harvester calldata templates, and their min out
+            slots
+    """
+    profile: Bytes[MAX_PROFILE_SIZE] = raw_call(
+        self._profile_contract(_profile_id),
+        b"",
+        max_outsize=MAX_PROFILE_SIZE,
+        is_static_call=True,
+    )
+    lengths: uint256[3] = empty(uint256[3])
+    min_out_slots: uint256[3] = empty(uint256[3])
+    lengths, min_out_slots = abi_decode(
+        slice(profile, 0, PROFILE_HEADER_SIZE), (uint256[3], uint256[3])
+    )
+    return (
+        slice(profile, PROFILE_HEADER_SIZE, lengths[0]),
+        slice(profile, PROFILE_HEADER_SIZE + lengths[0], lengths[1]),
+        slice(profile, PROFILE_HEADER_SIZE + lengths[0] + lengths[1], lengths[2]),
+        min_out_slots,
+    )
+
+
+@external
+def harvest_with_profile(
+    _caller: address,
+    _profile_id: uint256,
+    _min_amount_out: uint256,
+    _min_outs: DynArray[uint256, constants.MAX_PROFILE_SLOTS],
+) -> IHarvester.HarvestReceipt:
+    """
+    @notice Harvest with the calldata of a stored harvest profile
+    @param _caller Address of the account initiating the harvest (for the caller fee)
+    @param _profile_id Identifier of the profile (see set_harvest_profile)
+    @param _min_amount_out Minimum amount of target asset expected from harvesting
+    @param _min_outs Min out words appended to the templates, in slot order
+    @return Harvest receipt, with the profit and the total assets after the harvest
+    @dev Processes the cached extra rewards if extra_reward_cache_enabled, CRV and CVX
+         only otherwise (see refresh_extra_rewards). The harvester is
+         called directly with the ABI encoded calldata, the filled templates are not
+         copied into 4096 byte buffers first.
+    """
+    assert msg.sender == self.vault, "Vault only"
+    # read inline, returning it from an internal function would copy it
+    profile: Bytes[MAX_PROFILE_SIZE] = raw_call(
+        self._profile_contract(_profile_id),
+        b"",
+        max_outsize=MAX_PROFILE_SIZE,
+        is_static_call=True,
+    )
+    lengths: uint256[3] = empty(uint256[3])
+    min_out_slots: uint256[3] = empty(uint256[3])
+    lengths, min_out_slots = abi_decode(
+        slice(profile, 0, PROFILE_HEADER_SIZE), (uint256[3], uint256[3])
+    )
+    assert (
+        len(_min_outs) == min_out_slots[0] + min_out_slots[1] + min_out_slots[2]
+    ), "Min outs do not match slots"
+    # 0x20, length, then the words
+    min_outs: Bytes[64 + 32 * constants.MAX_PROFILE_SLOTS] = abi_encode(_min_outs)
+
+    extra_rewards: DynArray[address, constants.MAX_REWARD_TOKENS] = self._resolve_extra_rewards([])
+    self._collect(extra_rewards)
+    response: Bytes[HARVEST_RECEIPT_SIZE] = raw_call(
+        self.harvester,
+        abi_encode(
+            _caller,
+            _min_amount_out,
+            extra_rewards,
+            concat(
+                slice(profile, PROFILE_HEADER_SIZE, lengths[0]),
+                slice(min_outs, 64, 32 * min_out_slots[0]),
+            ),
+            concat(
+                slice(profile, PROFILE_HEADER_SIZE + lengths[0], lengths[1]),
+                slice(min_outs, 64 + 32 * min_out_slots[0], 32 * min_out_slots[1]),
+            ),
+            concat(
+                slice(profile, PROFILE_HEADER_SIZE + lengths[0] + lengths[1], lengths[2]),
+                slice(
+                    min_outs,
+                    64 + 32 * (min_out_slots[0] + min_out_slots[1]),
+                    32 * min_out_slots[2],
+                ),
+            ),
+            method_id=method_id("harvest(address,uint256,address[],bytes,bytes,bytes)"),
+        ),
+        max_outsize=HARVEST_RECEIPT_SIZE,
+    )
+    receipt: IHarvester.HarvestReceipt = abi_decode(response, IHarvester.HarvestReceipt)
+    receipt.total_assets = self._compound(receipt.lp_deposited)
+    receipt.profit = receipt.lp_deposited
+    return receipt
 
 
 @external
@@ -377,3 +827,89 @@ def forward_tokens(
     """
     assert msg.sender == self.vault, "Vault only"
     extcall IHarvester(self.harvester).forward_tokens(_tokens, _recipient)
+
+
+@internal
+@view
+def _cvx_minted(_crv_amount: uint256) -> uint256:
+    """
+    @notice CVX minted by Convex alongside a CRV reward claim
+    @param _crv_amount Amount of CRV claimed
+    @return The amount of CVX minted
+    """
+    supply: uint256 = staticcall IERC20(constants.CVX_TOKEN).totalSupply()
+    cliff: uint256 = supply // CVX_REDUCTION_PER_CLIFF
+    if cliff >= CVX_TOTAL_CLIFFS:
+        return 0
+    minted: uint256 = _crv_amount * (CVX_TOTAL_CLIFFS - cliff) // CVX_TOTAL_CLIFFS
+    return min(minted, CVX_MAX_SUPPLY - supply)
+
+
+@internal
+@view
+def _pending_rewards_value(_eth_price: uint256) -> uint256:
+    """
+    @notice Value in crvUSD of the CRV/CVX a harvest would process
+    @dev Counts rewards earned on Convex and CRV/CVX already held by the harvester
+         (e.g. pending CoW orders). Extra rewards are not priced.
+    @param _eth_price Price of ETH in crvUSD
+    """
+    earned: uint256 = staticcall IBasicRewards(self.rewards_contract).earned(self)
+    crv_amount: uint256 = earned + staticcall IERC20(constants.CRV_TOKEN).balanceOf(self.harvester)
+    cvx_amount: uint256 = self._cvx_minted(earned) + staticcall IERC20(
+        constants.CVX_TOKEN
+    ).balanceOf(self.harvester)
+
+    crv_price: uint256 = staticcall ICurveTriCryptoFactoryNG(
+        constants.CURVE_TRICRV_POOL
+    ).price_oracle(1)
+    cvx_eth_price: uint256 = staticcall ICurveV2Pool(constants.CURVE_CVX_ETH_POOL).price_oracle()
+    return (
+        crv_amount * crv_price // 10**18
+        + cvx_amount * cvx_eth_price // 10**18 * _eth_price // 10**18
+    )
+
+
+@external
+@view
+def pending_rewards_value() -> uint256:
+    """
+    @notice Estimated value in crvUSD of the CRV/CVX rewards the next harvest would process
+    @return The estimated gross rewards value
+    """
+    return self._pending_rewards_value(
+        staticcall ICurveTriCryptoFactoryNG(constants.CURVE_TRICRV_POOL).price_oracle(0)
+    )
+
+
+@external
+@view
+def harvest_trigger(_gas_price: uint256) -> bool:
+    """
+    @notice Whether a harvest is worth executing now
+    @dev Fires when the caller fee on the estimated rewards covers the harvest gas cost
+         at `_gas_price`, or when there are rewards and max_harvest_interval has elapsed
+         since the vault's last harvest.
+    @param _gas_price Gas price in wei the harvest would be executed at
+    @return True if a harvest should be executed
+    """
+    if staticcall IBasicRewards(self.rewards_contract).balanceOf(self) == 0:
+        return False
+
+    eth_price: uint256 = staticcall ICurveTriCryptoFactoryNG(
+        constants.CURVE_TRICRV_POOL
+    ).price_oracle(0)
+    rewards_value: uint256 = self._pending_rewards_value(eth_price)
+    if rewards_value == 0:
+        return False
+
+    max_interval: uint256 = self.max_harvest_interval
+    if (
+        max_interval != 0
+        and block.timestamp >= staticcall IVault(self.vault).last_harvest() + max_interval
+    ):
+        return True
+
+    caller_reward: uint256 = rewards_value * self.caller_fee // constants.DECIMALS
+    gas_cost: uint256 = _gas_price * self.harvest_gas_estimate * eth_price // 10**18
+    return caller_reward >= gas_cost
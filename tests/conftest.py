@@ -10,8 +10,16 @@ from moccasin.moccasin_account import MoccasinAccount
 
 from src import factory, raac_vault, strategy
 from src.harvesters import cow_harvester, curve_harvester
-from src.hooks import add_liquidity, add_liquidity_ng, handle_extra_rewards
+from src.hooks import (
+    add_liquidity,
+    add_liquidity_delegated,
+    add_liquidity_ng,
+    add_liquidity_ng_delegated,
+    handle_extra_rewards,
+)
+from src.lens import vault_lens
 from src.mocks import mock_strategy
+from src.routers import permit_router, zap
 from tests.utils.abis import (
     BASE_REWARD_POOL_ABI,
     CONVEX_STASH_ABI,
@@ -27,6 +35,7 @@ from tests.utils.constants import (
     RSUP_TOKEN,
     ZERO_ADDRESS,
 )
+from tests.utils.gas_report import GasReport
 
 # Pool name constants for parametrization
 PYUSD_POOL_NAME = "pyusd"
@@ -34,6 +43,24 @@ USDC_POOL_NAME = "usdc"
 USDT_POOL_NAME = "usdt"
 
 
+def pytest_addoption(parser):
+    parser.addoption(
+        "--gas-report",
+        action="store",
+        default=None,
+        metavar="DIR",
+        help="Run the gas report scenarios and write their line-level "
+        "gas profile to DIR as text and JSON",
+    )
+    parser.addoption(
+        "--gas-report-runs",
+        action="store",
+        type=int,
+        default=3,
+        help="Number of runs of each gas report scenario",
+    )
+
+
 @pytest.fixture(scope="session")
 def convex_booster() -> VyperContract:
     return get_config().get_active_network().manifest_named("convex_booster")
@@ -134,6 +161,22 @@ def add_liquidity_ng_hook():
     return add_liquidity_ng.deploy()
 
 
+@pytest.fixture(scope="session")
+def add_liquidity_delegated_hook(vault_factory):
+    hook = add_liquidity_delegated.deploy()
+    with boa.env.prank(vault_factory.owner()):
+        vault_factory.set_delegated_hook(hook.address, True)
+    return hook
+
+
+@pytest.fixture(scope="session")
+def add_liquidity_ng_delegated_hook(vault_factory):
+    hook = add_liquidity_ng_delegated.deploy()
+    with boa.env.prank(vault_factory.owner()):
+        vault_factory.set_delegated_hook(hook.address, True)
+    return hook
+
+
 @pytest.fixture(scope="session")
 def handle_extra_rewards_hook():
     return handle_extra_rewards.deploy()
@@ -210,6 +253,21 @@ def vault_factory(
     )
 
 
+@pytest.fixture(scope="session")
+def vault_permit_router(vault_factory):
+    return permit_router.deploy(vault_factory.address)
+
+
+@pytest.fixture(scope="session")
+def vault_zap(vault_factory):
+    return zap.deploy(vault_factory.address)
+
+
+@pytest.fixture(scope="session")
+def lens():
+    return vault_lens.deploy()
+
+
 @pytest.fixture(scope="session")
 def deploy_permissioned_vault_for_pool(
     vault_factory, harvest_manager, strategy_manager
@@ -480,3 +538,18 @@ def harvest_caller(mock_strategy_contract, mock_vault, crvusd_token):
     mock_vault.grantRole(mock_vault.HARVESTER_ROLE(), caller)
     mock_vault.grantRole(mock_vault.STRATEGY_MANAGER_ROLE(), caller)
     return caller
+
+
+@pytest.fixture(scope="session")
+def gas_report(request):
+    report_dir = request.config.getoption("gas_report")
+    if report_dir is None:
+        pytest.skip("Gas report disabled, run with --gas-report DIR")
+    report = GasReport()
+    yield report
+    report.write(report_dir)
+
+
+@pytest.fixture(scope="session")
+def gas_report_runs(request) -> int:
+    return request.config.getoption("gas_report_runs")
@@ -0,0 +1,91 @@
+import boa
+from boa.util.abi import abi_encode
+from tabulate import tabulate
+
+from src import raac_vault
+from src.harvesters import cow_harvester
+from tests.utils.constants import (
+    CRVUSD_POOLS,
+    FXN_TOKEN,
+    RSUP_TOKEN,
+    WETH_TOKEN,
+)
+
+# Ten extra reward tokens to fill MAX_TOKENS with CRV and CVX
+EXTRA_REWARD_TOKENS = [
+    FXN_TOKEN,
+    RSUP_TOKEN,
+    WETH_TOKEN,
+    *CRVUSD_POOLS["pyusd"]["token_addresses"][:1],
+    *CRVUSD_POOLS["usdc"]["token_addresses"][:1],
+    *CRVUSD_POOLS["usdt"]["token_addresses"][:1],
+    "0x6B175474E89094C44Da98b954EedeAC495271d0F",  # DAI
+    "0x514910771AF9Ca656af840dff83E8264EcF986CA",  # LINK
+    "0x1f9840a85d5aF5bf1D1762F925BDADdC4201F984",  # UNI
+    "0x2260FAC5E5542a773Aa44fBCa51DC2d96a1c6aB4",  # WBTC
+]
+
+
+def test_cow_harvest_gas_max_tokens(
+    test_cow_vault, funded_accounts, crvusd_pool, harvest_manager
+):
+    vault_addr, _, harvester_addr = test_cow_vault
+    vault_contract = raac_vault.at(vault_addr)
+    harvester_contract = cow_harvester.at(harvester_addr)
+    assert len(EXTRA_REWARD_TOKENS) + 2 == harvester_contract.MAX_TOKENS()
+
+    user = funded_accounts[0]
+    with boa.env.prank(user):
+        crvusd_pool.approve(vault_addr, 10**18)
+        vault_contract.deposit(10**18, user)
+
+    buy_amounts = [10**18] * harvester_contract.MAX_TOKENS()
+
+    def harvest():
+        with boa.env.prank(harvest_manager):
+            vault_contract.harvest(
+                harvest_manager,
+                0,
+                EXTRA_REWARD_TOKENS,
+                b"",
+                b"",
+                abi_encode("(uint256[])", [buy_amounts]),
+            )
+        return vault_contract._computation.get_gas_used()
+
+    create_gas = harvest()
+    orders = [
+        harvester_contract.token_order_info(token)
+        for token in EXTRA_REWARD_TOKENS
+    ]
+
+    # orders still live: no order state is written
+    boa.env.time_travel(seconds=3600)
+    live_gas = harvest()
+    assert [
+        harvester_contract.token_order_info(token)
+        for token in EXTRA_REWARD_TOKENS
+    ] == orders
+
+    # orders expired: one slot rewritten per token
+    boa.env.time_travel(seconds=harvester_contract.delay())
+    refresh_gas = harvest()
+    for token, order in zip(EXTRA_REWARD_TOKENS, orders):
+        exists, info = harvester_contract.get_order_info(token)
+        assert exists
+        assert info.last_order_time > order.last_order_time
+        assert info.buy_amount == order.buy_amount
+
+    print(f"\n--- CoW harvest gas, {len(buy_amounts)} tokens ---")
+    print(
+        tabulate(
+            [
+                ["create orders", create_gas],
+                ["orders live", live_gas],
+                ["refresh expired orders", refresh_gas],
+            ],
+            headers=["Harvest", "Gas"],
+            tablefmt="grid",
+        )
+    )
+    assert live_gas < refresh_gas < create_gas
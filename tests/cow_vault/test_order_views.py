@@ -0,0 +1,131 @@
+import boa
+from boa.contracts.abi.abi_contract import ABIContractFactory
+from boa.util.abi import abi_encode
+from tabulate import tabulate
+
+from script.gpv2 import (
+    encode_conditional_order_signature,
+    gpv2_order_hash,
+)
+from src import raac_vault
+from src.harvesters import cow_harvester
+from tests.utils.abis import COMPOSABLE_COW_ABI
+from tests.utils.constants import CURVE_TRICRV_POOL
+
+ERC1271_MAGIC_VALUE = bytes.fromhex("1626ba7e")
+
+
+def _create_crv_order(
+    vault_addr, harvester_addr, crv_token, crvusd_pool, user, harvest_manager
+):
+    vault_contract = raac_vault.at(vault_addr)
+    with boa.env.prank(CURVE_TRICRV_POOL):
+        crv_token.transfer(harvester_addr, int(1000 * 1e18))
+    with boa.env.prank(user):
+        crvusd_pool.approve(vault_addr, 10**18)
+        vault_contract.deposit(10**18, user)
+    with boa.env.prank(harvest_manager):
+        vault_contract.harvest(
+            harvest_manager,
+            0,
+            [],
+            b"",
+            b"",
+            abi_encode("(uint256[])", [[int(100 * 1e18), 0]]),
+        )
+
+
+def test_domain_separator_matches_composable_cow(test_cow_vault):
+    _, _, harvester_addr = test_cow_vault
+    harvester_contract = cow_harvester.at(harvester_addr)
+    composable_cow = ABIContractFactory(
+        "ComposableCoW", COMPOSABLE_COW_ABI
+    ).at(harvester_contract.COMPOSABLE_COW())
+
+    assert (
+        harvester_contract.GPV2_DOMAIN_SEPARATOR()
+        == composable_cow.domainSeparator()
+    )
+
+
+def test_order_views_gas(
+    test_cow_vault,
+    funded_accounts,
+    crvusd_pool,
+    crv_token,
+    harvest_manager,
+):
+    vault_addr, _, harvester_addr = test_cow_vault
+    harvester_contract = cow_harvester.at(harvester_addr)
+    _create_crv_order(
+        vault_addr,
+        harvester_addr,
+        crv_token,
+        crvusd_pool,
+        funded_accounts[0],
+        harvest_manager,
+    )
+
+    static_input = bytes.fromhex(str(crv_token.address)[2:])
+    order = harvester_contract.getTradeableOrder(
+        harvester_addr,
+        harvester_contract.GPV2_SETTLEMENT(),
+        b"\x00" * 32,
+        static_input,
+        b"",
+    )
+    tradeable_order_gas = harvester_contract._computation.get_gas_used()
+
+    order_hash = gpv2_order_hash(
+        order, harvester_contract.GPV2_DOMAIN_SEPARATOR()
+    )
+    signature = encode_conditional_order_signature(
+        order, harvester_addr, static_input
+    )
+    with boa.env.prank(harvester_contract.GPV2_SETTLEMENT()):
+        assert (
+            harvester_contract.isValidSignature(order_hash, signature)
+            == ERC1271_MAGIC_VALUE
+        )
+    signature_gas = harvester_contract._computation.get_gas_used()
+
+    # a better price is accepted, a worse one is not
+    better_order = list(order)
+    better_order[4] += 1
+    with boa.env.prank(harvester_contract.GPV2_SETTLEMENT()):
+        assert (
+            harvester_contract.isValidSignature(
+                gpv2_order_hash(
+                    better_order, harvester_contract.GPV2_DOMAIN_SEPARATOR()
+                ),
+                encode_conditional_order_signature(
+                    better_order, harvester_addr, static_input
+                ),
+            )
+            == ERC1271_MAGIC_VALUE
+        )
+
+    worse_order = list(order)
+    worse_order[4] -= 1
+    with boa.env.prank(harvester_contract.GPV2_SETTLEMENT()):
+        with boa.reverts():
+            harvester_contract.isValidSignature(
+                gpv2_order_hash(
+                    worse_order, harvester_contract.GPV2_DOMAIN_SEPARATOR()
+                ),
+                encode_conditional_order_signature(
+                    worse_order, harvester_addr, static_input
+                ),
+            )
+
+    print("\n--- CoW order view gas ---")
+    print(
+        tabulate(
+            [
+                ["getTradeableOrder", tradeable_order_gas],
+                ["isValidSignature", signature_gas],
+            ],
+            headers=["View", "Gas"],
+            tablefmt="grid",
+        )
+    )
@@ -0,0 +1,167 @@
+import boa
+import pytest
+from boa.util.abi import abi_encode
+from eth_utils import function_signature_to_4byte_selector
+
+from src import raac_vault
+from src.harvesters import cow_harvester
+from tests.conftest import PYUSD_POOL_NAME
+from tests.utils.constants import CRV_TOKEN, CRVUSD_POOLS, CVX_TOKEN
+from tests.utils.cow_settlement import CowSettlementSimulator
+
+CRV_PRICE = int(0.5 * 1e18)
+CVX_PRICE = int(3 * 1e18)
+
+
+@pytest.fixture(scope="function")
+def settlement(crvusd_token, crvusd_minter):
+    def mint(receiver, amount):
+        with boa.env.prank(crvusd_minter):
+            crvusd_token.mint(receiver, amount)
+
+    return CowSettlementSimulator(
+        mint, {CRV_TOKEN: CRV_PRICE, CVX_TOKEN: CVX_PRICE}
+    )
+
+
+def _harvest(vault_contract, crvusd_pool, crvusd_token, harvest_manager):
+    target_hook_calldata = function_signature_to_4byte_selector(
+        "add_liquidity(address,address,uint256,uint256)"
+    ) + abi_encode(
+        "(address,address,uint256,uint256)",
+        [
+            crvusd_pool.address,
+            crvusd_token.address,
+            CRVUSD_POOLS[PYUSD_POOL_NAME]["crvusd_index"],
+            0,
+        ],
+    )
+    with boa.env.prank(harvest_manager):
+        vault_contract.harvest(
+            harvest_manager,
+            0,
+            [],
+            b"",
+            target_hook_calldata,
+            abi_encode("(uint256[])", [[1, 1]]),
+        )
+
+
+def test_cow_harvest_cycles(
+    test_cow_vault,
+    funded_accounts,
+    crvusd_pool,
+    crvusd_token,
+    harvest_manager,
+    settlement,
+):
+    vault_addr, _, harvester_addr = test_cow_vault
+    vault_contract = raac_vault.at(vault_addr)
+    harvester_contract = cow_harvester.at(harvester_addr)
+
+    user = funded_accounts[0]
+    deposit_amount = crvusd_pool.balanceOf(user) // 2
+    with boa.env.prank(user):
+        crvusd_pool.approve(vault_addr, deposit_amount)
+        vault_contract.deposit(deposit_amount, user)
+
+    # the first harvest only creates the orders
+    boa.env.time_travel(seconds=86400)
+    _harvest(vault_contract, crvusd_pool, crvusd_token, harvest_manager)
+
+    for _ in range(3):
+        fills = settlement.settle_all(
+            harvester_contract, [CRV_TOKEN, CVX_TOKEN]
+        )
+        assert len(fills) > 0
+        proceeds = sum(fill.buy_amount for fill in fills)
+        assert crvusd_token.balanceOf(harvester_addr) >= proceeds
+
+        # an order can only be filled once
+        assert (
+            settlement.settle_all(harvester_contract, [CRV_TOKEN, CVX_TOKEN])
+            == []
+        )
+
+        boa.env.time_travel(seconds=harvester_contract.delay())
+        assets_before = vault_contract.totalAssets()
+        _harvest(vault_contract, crvusd_pool, crvusd_token, harvest_manager)
+
+        # the proceeds of the previous orders are compounded
+        assert crvusd_token.balanceOf(harvester_addr) == 0
+        assert vault_contract.totalAssets() > assets_before
+
+    assert len(settlement.fills) >= 3
+
+
+def test_settlement_respects_limit_price(
+    test_cow_vault,
+    funded_accounts,
+    crvusd_pool,
+    crvusd_token,
+    crv_token,
+    harvest_manager,
+    settlement,
+):
+    vault_addr, _, harvester_addr = test_cow_vault
+    vault_contract = raac_vault.at(vault_addr)
+    harvester_contract = cow_harvester.at(harvester_addr)
+
+    user = funded_accounts[0]
+    with boa.env.prank(user):
+        crvusd_pool.approve(vault_addr, 10**18)
+        vault_contract.deposit(10**18, user)
+    boa.env.time_travel(seconds=86400)
+
+    # ask for more crvUSD than the settlement price gives
+    with boa.env.prank(harvest_manager):
+        vault_contract.harvest(
+            harvest_manager,
+            0,
+            [],
+            b"",
+            b"",
+            abi_encode("(uint256[])", [[2**100, 2**100]]),
+        )
+
+    crv_balance = crv_token.balanceOf(harvester_addr)
+    assert settlement.settle(harvester_contract, CRV_TOKEN) is None
+    assert crv_token.balanceOf(harvester_addr) == crv_balance
+
+
+def test_settlement_partial_fills(
+    test_cow_vault,
+    funded_accounts,
+    crvusd_pool,
+    crvusd_token,
+    harvest_manager,
+    settlement,
+):
+    vault_addr, _, harvester_addr = test_cow_vault
+    vault_contract = raac_vault.at(vault_addr)
+    harvester_contract = cow_harvester.at(harvester_addr)
+
+    user = funded_accounts[0]
+    with boa.env.prank(user):
+        crvusd_pool.approve(vault_addr, 10**18)
+        vault_contract.deposit(10**18, user)
+    boa.env.time_travel(seconds=86400)
+
+    with boa.env.prank(harvest_manager):
+        harvester_contract.set_order_parts(2)
+    _harvest(vault_contract, crvusd_pool, crvusd_token, harvest_manager)
+
+    _, info = harvester_contract.get_order_info(CRV_TOKEN)
+    part_amount = info.sell_amount // 2
+
+    first = settlement.settle(harvester_contract, CRV_TOKEN, 0.5)
+    second = settlement.settle(harvester_contract, CRV_TOKEN)
+    assert first.order_hash == second.order_hash
+    assert first.sell_amount + second.sell_amount == part_amount
+    assert settlement.settle(harvester_contract, CRV_TOKEN) is None
+
+    # the second part is a new order
+    boa.env.time_travel(seconds=harvester_contract.delay() // 2)
+    third = settlement.settle(harvester_contract, CRV_TOKEN)
+    assert third.order_hash != first.order_hash
+    assert third.sell_amount == part_amount
@@ -0,0 +1,156 @@
+import boa
+from boa.util.abi import abi_encode
+
+from script.gpv2 import (
+    encode_conditional_order_signature,
+    gpv2_order_hash,
+)
+from src import raac_vault
+from src.harvesters import cow_harvester
+from tests.utils.constants import CURVE_TRICRV_POOL
+
+ERC1271_MAGIC_VALUE = bytes.fromhex("1626ba7e")
+ORDER_PARTS = 4
+SELL_AMOUNT = 1000 * 10**18
+BUY_AMOUNT = 300 * 10**18 + 1
+
+
+def _sliced_crv_order(
+    test_cow_vault, funded_accounts, crvusd_pool, crv_token, harvest_manager
+):
+    vault_addr, _, harvester_addr = test_cow_vault
+    vault_contract = raac_vault.at(vault_addr)
+    harvester_contract = cow_harvester.at(harvester_addr)
+
+    with boa.env.prank(CURVE_TRICRV_POOL):
+        crv_token.transfer(harvester_addr, SELL_AMOUNT)
+    user = funded_accounts[0]
+    with boa.env.prank(user):
+        crvusd_pool.approve(vault_addr, 10**18)
+        vault_contract.deposit(10**18, user)
+
+    with boa.env.prank(harvest_manager):
+        harvester_contract.set_order_parts(ORDER_PARTS)
+        vault_contract.harvest(
+            harvest_manager,
+            0,
+            [],
+            b"",
+            b"",
+            abi_encode("(uint256[])", [[BUY_AMOUNT, 0]]),
+        )
+    return harvester_contract
+
+
+def test_sliced_order_parts(
+    test_cow_vault, funded_accounts, crvusd_pool, crv_token, harvest_manager
+):
+    harvester_contract = _sliced_crv_order(
+        test_cow_vault,
+        funded_accounts,
+        crvusd_pool,
+        crv_token,
+        harvest_manager,
+    )
+    harvester_addr = harvester_contract.address
+    static_input = bytes.fromhex(str(crv_token.address)[2:])
+
+    exists, info = harvester_contract.get_order_info(crv_token.address)
+    assert exists
+    assert info.parts == ORDER_PARTS
+    sell_amount = info.sell_amount
+    assert sell_amount >= SELL_AMOUNT
+
+    delay = harvester_contract.delay()
+    part_duration = delay // ORDER_PARTS
+    valid_tos = set()
+    for part in range(ORDER_PARTS):
+        boa.env.evm.patch.timestamp = info.last_order_time + part * (
+            part_duration
+        )
+        order = harvester_contract.getTradeableOrder(
+            harvester_addr,
+            harvester_contract.GPV2_SETTLEMENT(),
+            b"\x00" * 32,
+            static_input,
+            b"",
+        )
+        assert order.partiallyFillable
+        assert order.sellAmount == sell_amount // ORDER_PARTS
+        assert order.buyAmount == -(-BUY_AMOUNT // ORDER_PARTS)
+        assert order.validTo == info.last_order_time + min(
+            (part + 1) * part_duration, delay
+        )
+        valid_tos.add(order.validTo)
+
+        with boa.env.prank(harvester_contract.GPV2_SETTLEMENT()):
+            assert (
+                harvester_contract.isValidSignature(
+                    gpv2_order_hash(
+                        order, harvester_contract.GPV2_DOMAIN_SEPARATOR()
+                    ),
+                    encode_conditional_order_signature(
+                        order, harvester_addr, static_input
+                    ),
+                )
+                == ERC1271_MAGIC_VALUE
+            )
+
+    # each part is a distinct discrete order
+    assert len(valid_tos) == ORDER_PARTS
+
+
+def test_sliced_order_rejects_other_part(
+    test_cow_vault, funded_accounts, crvusd_pool, crv_token, harvest_manager
+):
+    harvester_contract = _sliced_crv_order(
+        test_cow_vault,
+        funded_accounts,
+        crvusd_pool,
+        crv_token,
+        harvest_manager,
+    )
+    harvester_addr = harvester_contract.address
+    static_input = bytes.fromhex(str(crv_token.address)[2:])
+
+    order = harvester_contract.getTradeableOrder(
+        harvester_addr,
+        harvester_contract.GPV2_SETTLEMENT(),
+        b"\x00" * 32,
+        static_input,
+        b"",
+    )
+    boa.env.time_travel(seconds=harvester_contract.delay() // ORDER_PARTS)
+
+    with boa.env.prank(harvester_contract.GPV2_SETTLEMENT()):
+        with boa.reverts():
+            harvester_contract.isValidSignature(
+                gpv2_order_hash(
+                    order, harvester_contract.GPV2_DOMAIN_SEPARATOR()
+                ),
+                encode_conditional_order_signature(
+                    order, harvester_addr, static_input
+                ),
+            )
+
+
+def test_set_order_parts(test_cow_vault, harvest_manager, accounts):
+    _, _, harvester_addr = test_cow_vault
+    harvester_contract = cow_harvester.at(harvester_addr)
+
+    with boa.env.prank(accounts[0]):
+        with boa.reverts("Manager only"):
+            harvester_contract.set_order_parts(ORDER_PARTS)
+
+    with boa.env.prank(harvest_manager):
+        with boa.reverts("Too many parts"):
+            harvester_contract.set_order_parts(
+                harvester_contract.MAX_ORDER_PARTS() + 1
+            )
+        harvester_contract.set_order_parts(ORDER_PARTS)
+        with boa.reverts("Delay too short"):
+            harvester_contract.set_delay(
+                ORDER_PARTS * harvester_contract.MIN_PART_DURATION() - 1
+            )
+
+    assert harvester_contract.order_parts() == ORDER_PARTS
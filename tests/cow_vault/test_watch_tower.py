@@ -0,0 +1,86 @@
+import asyncio
+import json
+
+import boa
+from boa.util.abi import abi_encode
+
+from script.watch_tower import (
+    WatchTower,
+    discover_cow_harvesters,
+    discover_sell_tokens,
+)
+from src import raac_vault
+from src.harvesters import cow_harvester
+from tests.utils.boa_rpc import BoaRpc
+from tests.utils.constants import CRV_TOKEN, CURVE_TRICRV_POOL
+
+
+def test_watch_tower_polls_cow_harvesters(
+    vault_factory,
+    test_cow_vault,
+    test_permissioned_vault,
+    funded_accounts,
+    crvusd_pool,
+    crv_token,
+    harvest_manager,
+    tmp_path,
+):
+    vault_addr, _, harvester_addr = test_cow_vault
+    harvester_contract = cow_harvester.at(harvester_addr)
+    vault_contract = raac_vault.at(vault_addr)
+    rpc = BoaRpc()
+
+    # only CoW harvesters are polled
+    harvesters = discover_cow_harvesters(rpc, vault_factory.address)
+    assert harvester_addr in harvesters
+    assert test_permissioned_vault[2] not in harvesters
+
+    with boa.env.prank(CURVE_TRICRV_POOL):
+        crv_token.transfer(harvester_addr, int(1000 * 1e18))
+    user = funded_accounts[0]
+    with boa.env.prank(user):
+        crvusd_pool.approve(vault_addr, 10**18)
+        vault_contract.deposit(10**18, user)
+    with boa.env.prank(harvest_manager):
+        vault_contract.harvest(
+            harvest_manager,
+            0,
+            [],
+            b"",
+            b"",
+            abi_encode("(uint256[])", [[int(100 * 1e18), 0]]),
+        )
+
+    out = tmp_path / "orders.jsonl"
+    watch_tower = WatchTower(
+        rpc,
+        discover_sell_tokens(rpc, [harvester_addr], None),
+        str(out),
+        max_concurrency=4,
+        domain_separator=harvester_contract.GPV2_DOMAIN_SEPARATOR(),
+    )
+    results = asyncio.run(watch_tower.poll_due())
+    crv_result = next(r for r in results if r.task.sell_token == CRV_TOKEN)
+    _, crv_order = harvester_contract.get_order_info(CRV_TOKEN)
+    assert crv_result.order is not None
+    assert crv_result.next_poll == crv_result.order["validTo"]
+
+    orders = [json.loads(line) for line in out.read_text().splitlines()]
+    crv_orders = [o for o in orders if o["sellToken"] == CRV_TOKEN.lower()]
+    assert len(crv_orders) == 1
+    assert crv_orders[0]["sellAmount"] == crv_order.sell_amount
+    assert crv_orders[0]["owner"] == harvester_addr
+
+    # nothing is due until the order expires
+    assert asyncio.run(watch_tower.poll_due()) == []
+
+    # expired orders are rescheduled with the PollTryAtEpoch hint
+    boa.env.time_travel(seconds=harvester_contract.delay())
+    results = asyncio.run(watch_tower.poll_due())
+    crv_result = next(r for r in results if r.task.sell_token == CRV_TOKEN)
+    assert crv_result.order is None
+    assert crv_result.reason == "Order expired"
+    assert crv_result.next_poll == boa.env.evm.patch.timestamp + 86400
+    assert len(out.read_text().splitlines()) == len(orders)
+    # and forgotten by the duplicate check
+    assert not watch_tower._seen
@@ -0,0 +1,162 @@
+import boa
+import pytest
+from boa.util.abi import abi_encode
+from eth_utils import function_signature_to_4byte_selector
+from tabulate import tabulate
+
+from src import raac_vault
+from src.harvesters import curve_harvester
+from tests.conftest import PYUSD_POOL_NAME, USDC_POOL_NAME
+from tests.utils.constants import CRVUSD_POOLS
+
+
+def _target_hook_calldata(pool, crvusd_token, pool_name):
+    selector = function_signature_to_4byte_selector(
+        "add_liquidity(address,address,uint256,uint256)"
+    )
+    return selector + abi_encode(
+        "(address,address,uint256,uint256)",
+        [
+            pool.address,
+            crvusd_token.address,
+            CRVUSD_POOLS[pool_name]["crvusd_index"],
+            0,
+        ],
+    )
+
+
+@pytest.fixture(scope="module")
+def hook_pairs(
+    add_liquidity_hook,
+    add_liquidity_ng_hook,
+    add_liquidity_delegated_hook,
+    add_liquidity_ng_delegated_hook,
+):
+    return {
+        PYUSD_POOL_NAME: (
+            add_liquidity_ng_hook,
+            add_liquidity_ng_delegated_hook,
+        ),
+        USDC_POOL_NAME: (add_liquidity_hook, add_liquidity_delegated_hook),
+    }
+
+
+@pytest.mark.parametrize("pool_name", [PYUSD_POOL_NAME, USDC_POOL_NAME])
+def test_delegated_hook_harvest_gas(
+    deploy_permissioned_vault_for_pool,
+    hook_pairs,
+    pool_list,
+    crvusd_token,
+    funded_accounts,
+    harvest_manager,
+    pool_name,
+):
+    pool = pool_list[pool_name]
+    user = funded_accounts[0]
+    deposit_amount = pool.balanceOf(user) // 4
+    vaults = []
+    for hook in hook_pairs[pool_name]:
+        vault_addr, strategy_addr, harvester_addr = (
+            deploy_permissioned_vault_for_pool(
+                pool_name, target_hook=hook.address
+            )
+        )
+        with boa.env.prank(user):
+            pool.approve(vault_addr, deposit_amount)
+            raac_vault.at(vault_addr).deposit(deposit_amount, user)
+        vaults.append((vault_addr, strategy_addr, harvester_addr, hook))
+
+    transfer_mode, delegated_mode = vaults
+    assert not curve_harvester.at(transfer_mode[2]).target_hook_delegated()
+    assert curve_harvester.at(delegated_mode[2]).target_hook_delegated()
+
+    boa.env.time_travel(seconds=86400 * 7)
+    calldata = _target_hook_calldata(pool, crvusd_token, pool_name)
+    results = []
+    for vault_addr, strategy_addr, harvester_addr, hook in vaults:
+        vault_contract = raac_vault.at(vault_addr)
+        assets_before = vault_contract.totalAssets()
+        with boa.env.prank(harvest_manager):
+            vault_contract.harvest(harvest_manager, 0, [], b"", calldata, b"")
+        results.append(
+            (
+                vault_contract._computation.get_gas_used(),
+                vault_contract.totalAssets() - assets_before,
+            )
+        )
+
+        # nothing is left behind in the harvester, the hook or the strategy
+        for holder in (harvester_addr, hook.address, strategy_addr):
+            assert crvusd_token.balanceOf(holder) == 0
+            assert pool.balanceOf(holder) == 0
+
+    (transfer_gas, transfer_lp), (delegated_gas, delegated_lp) = results
+    print(f"\n--- {pool_name} harvest gas by target hook mode ---")
+    print(
+        tabulate(
+            [
+                ["transfer to hook", transfer_gas, transfer_lp],
+                ["delegated", delegated_gas, delegated_lp],
+                ["saved", transfer_gas - delegated_gas, ""],
+            ],
+            headers=["Target hook", "Gas", "LP compounded"],
+            tablefmt="grid",
+        )
+    )
+    assert delegated_lp == pytest.approx(transfer_lp, rel=1e-3)
+    assert delegated_gas < transfer_gas
+
+
+def test_delegated_hook_slippage(
+    deploy_permissioned_vault_for_pool,
+    add_liquidity_ng_delegated_hook,
+    pool_list,
+    crvusd_token,
+    funded_accounts,
+    harvest_manager,
+):
+    pool = pool_list[PYUSD_POOL_NAME]
+    vault_addr, _, _ = deploy_permissioned_vault_for_pool(
+        PYUSD_POOL_NAME, target_hook=add_liquidity_ng_delegated_hook.address
+    )
+    vault_contract = raac_vault.at(vault_addr)
+    user = funded_accounts[0]
+    with boa.env.prank(user):
+        pool.approve(vault_addr, 10**18)
+        vault_contract.deposit(10**18, user)
+
+    boa.env.time_travel(seconds=86400 * 7)
+    calldata = _target_hook_calldata(pool, crvusd_token, PYUSD_POOL_NAME)
+    with boa.env.prank(harvest_manager):
+        with boa.reverts("Slippage"):
+            vault_contract.harvest(
+                harvest_manager, 10**30, [], b"", calldata, b""
+            )
+
+
+def test_delegated_hook_allowlist(
+    deploy_permissioned_vault_for_pool,
+    vault_factory,
+    add_liquidity_ng_delegated_hook,
+    accounts,
+):
+    hook = add_liquidity_ng_delegated_hook.address
+    _, _, harvester_addr = deploy_permissioned_vault_for_pool(
+        PYUSD_POOL_NAME, target_hook=hook
+    )
+    harvester = curve_harvester.at(harvester_addr)
+    assert harvester.target_hook_delegated()
+
+    with boa.env.prank(accounts[1]):
+        with boa.reverts():
+            vault_factory.set_delegated_hook(hook, False)
+
+    owner = vault_factory.owner()
+    with boa.env.prank(owner):
+        vault_factory.set_delegated_hook(hook, False)
+    assert not vault_factory.delegated_hooks(hook)
+    assert not harvester.target_hook_delegated()
+
+    with boa.env.prank(owner):
+        vault_factory.set_delegated_hook(hook, True)
+    assert harvester.target_hook_delegated()
@@ -0,0 +1,149 @@
+import boa
+import pytest
+from boa.util.abi import abi_encode
+from eth_utils import function_signature_to_4byte_selector
+from tabulate import tabulate
+
+from src import raac_vault, strategy
+from tests.conftest import PYUSD_POOL_NAME
+from tests.utils.constants import CRVUSD_POOLS
+
+PROFILE_ID = 1
+
+
+def _target_hook_template(pool, crvusd_token):
+    # add_liquidity without its trailing min_out argument
+    selector = function_signature_to_4byte_selector(
+        "add_liquidity(address,address,uint256,uint256)"
+    )
+    return selector + abi_encode(
+        "(address,address,uint256)",
+        [
+            pool.address,
+            crvusd_token.address,
+            CRVUSD_POOLS[PYUSD_POOL_NAME]["crvusd_index"],
+        ],
+    )
+
+
+def _calldata_gas(calldata):
+    return sum(16 if byte else 4 for byte in calldata)
+
+
+@pytest.fixture(scope="function")
+def profile_vault(
+    deploy_permissioned_vault_for_pool,
+    add_liquidity_ng_hook,
+    pool_list,
+    crvusd_token,
+    funded_accounts,
+    strategy_manager,
+):
+    pool = pool_list[PYUSD_POOL_NAME]
+    vault_addr, strategy_addr, _ = deploy_permissioned_vault_for_pool(
+        PYUSD_POOL_NAME, target_hook=add_liquidity_ng_hook.address
+    )
+    vault_contract = raac_vault.at(vault_addr)
+    user = funded_accounts[0]
+    with boa.env.prank(user):
+        pool.approve(vault_addr, 10**18)
+        vault_contract.deposit(10**18, user)
+
+    template = _target_hook_template(pool, crvusd_token)
+    with boa.env.prank(strategy_manager):
+        vault_contract.set_harvest_profile(
+            PROFILE_ID, b"", template, b"", [0, 1, 0]
+        )
+    return vault_contract, strategy.at(strategy_addr), template
+
+
+def test_set_harvest_profile(profile_vault, harvest_manager, strategy_manager):
+    vault_contract, strategy_contract, template = profile_vault
+    assert strategy_contract.harvest_profile(PROFILE_ID) == (
+        b"",
+        template,
+        b"",
+        [0, 1, 0],
+    )
+
+    with boa.env.prank(harvest_manager):
+        with boa.reverts():
+            vault_contract.set_harvest_profile(
+                2, b"", template, b"", [0, 1, 0]
+            )
+    with boa.env.prank(strategy_manager):
+        with boa.reverts("Too many slots"):
+            vault_contract.set_harvest_profile(
+                2, b"", template, b"", [0, 9, 0]
+            )
+        with boa.reverts("Profile too large"):
+            vault_contract.set_harvest_profile(
+                2, b"\x01" * 4000, template, b"", [0, 1, 0]
+            )
+    with boa.reverts("Vault only"):
+        strategy_contract.set_harvest_profile(2, b"", template, b"", [0, 1, 0])
+
+
+def test_harvest_with_profile_matches_harvest(profile_vault, harvest_manager):
+    vault_contract, _, template = profile_vault
+    full_calldata = template + abi_encode("(uint256)", [0])
+
+    boa.env.time_travel(seconds=86400 * 7)
+    harvests = [
+        (
+            vault_contract.harvest,
+            (harvest_manager, 0, [], b"", full_calldata, b""),
+        ),
+        (
+            vault_contract.harvest_with_profile,
+            (harvest_manager, PROFILE_ID, 0, [0]),
+        ),
+    ]
+    results = []
+    for harvest, args in harvests:
+        with boa.env.anchor():
+            assets_before = vault_contract.totalAssets()
+            with boa.env.prank(harvest_manager):
+                harvest(*args)
+            results.append(
+                (
+                    _calldata_gas(harvest.prepare_calldata(*args)),
+                    vault_contract._computation.get_gas_used(),
+                    vault_contract.totalAssets() - assets_before,
+                )
+            )
+
+    full, profile = results
+    print(f"\n--- {PYUSD_POOL_NAME} harvest gas ---")
+    print(
+        tabulate(
+            [
+                ["full calldata", *full[:2]],
+                ["profile", *profile[:2]],
+            ],
+            headers=["Harvest", "Calldata gas", "Execution gas"],
+            tablefmt="grid",
+        )
+    )
+    assert profile[2] == full[2] > 0
+    assert profile[0] < full[0]
+
+
+def test_harvest_with_profile_min_outs(profile_vault, harvest_manager):
+    vault_contract, _, _ = profile_vault
+    boa.env.time_travel(seconds=86400 * 7)
+    with boa.env.prank(harvest_manager):
+        with boa.reverts("Min outs do not match slots"):
+            vault_contract.harvest_with_profile(
+                harvest_manager, PROFILE_ID, 0, []
+            )
+        with boa.reverts("Unknown profile"):
+            vault_contract.harvest_with_profile(harvest_manager, 2, 0, [0])
+        # the min out is appended to the target hook calldata
+        with boa.reverts():
+            vault_contract.harvest_with_profile(
+                harvest_manager, PROFILE_ID, 0, [10**30]
+            )
+        vault_contract.harvest_with_profile(
+            harvest_manager, PROFILE_ID, 0, [0]
+        )
@@ -0,0 +1,124 @@
+import boa
+from boa.util.abi import abi_encode
+from eth_utils import function_signature_to_4byte_selector
+
+from src import raac_vault, strategy
+from tests.conftest import PYUSD_POOL_NAME
+from tests.utils.constants import CRV_TOKEN, CRVUSD_POOLS, CVX_TOKEN
+
+
+def test_harvest_emits_receipt(
+    vault_list,
+    crvusd_token,
+    funded_accounts,
+    pool_list,
+    harvest_manager,
+    treasury,
+):
+    crvusd_pool = pool_list[PYUSD_POOL_NAME]
+    vault_addr, strategy_addr, _ = vault_list[PYUSD_POOL_NAME]
+    vault_contract = raac_vault.at(vault_addr)
+    strategy_contract = strategy.at(strategy_addr)
+    user = funded_accounts[0]
+    caller_fee_receiver = boa.env.generate_address()
+
+    with boa.env.prank(user):
+        crvusd_pool.approve(vault_addr, 10**18)
+        vault_contract.deposit(10**18, user)
+
+    boa.env.time_travel(seconds=86400 * 7)
+    initial_strategy_assets = strategy_contract.total_assets()
+    initial_treasury_crvusd = crvusd_token.balanceOf(treasury)
+
+    target_hook_calldata = function_signature_to_4byte_selector(
+        "add_liquidity(address,address,uint256,uint256)"
+    ) + abi_encode(
+        "(address,address,uint256,uint256)",
+        [
+            crvusd_pool.address,
+            crvusd_token.address,
+            CRVUSD_POOLS[PYUSD_POOL_NAME]["crvusd_index"],
+            0,
+        ],
+    )
+    with boa.env.prank(harvest_manager):
+        vault_contract.harvest(
+            caller_fee_receiver, 0, [], b"", target_hook_calldata, b""
+        )
+        harvested = vault_contract.get_logs()[-1]
+
+    assert harvested.caller_fee_receiver == caller_fee_receiver
+    receipt = harvested.receipt
+    assert receipt.tokens_sold[:2] == [CVX_TOKEN, CRV_TOKEN]
+    assert len(receipt.amounts_sold) == len(receipt.tokens_sold)
+    assert receipt.amounts_sold[1] > 0
+
+    # fees are taken from the gross crvUSD, the rest is added as liquidity
+    assert receipt.platform_fee == (
+        crvusd_token.balanceOf(treasury) - initial_treasury_crvusd
+    )
+    assert receipt.caller_fee == crvusd_token.balanceOf(caller_fee_receiver)
+    assert receipt.crvusd_gross > receipt.platform_fee + receipt.caller_fee
+
+    # the profit streamed by the vault is the LP deposited by the strategy
+    assert receipt.profit == receipt.lp_deposited > 0
+    assert receipt.total_assets == strategy_contract.total_assets()
+    assert receipt.total_assets == initial_strategy_assets + receipt.profit
+
+
+def test_receipt_with_extra_reward_left_by_hook(
+    vault_list,
+    crvusd_token,
+    rsup_token,
+    funded_accounts,
+    pool_list,
+    harvest_manager,
+    strategy_manager,
+):
+    crvusd_pool = pool_list[PYUSD_POOL_NAME]
+    vault_addr, _, harvester_addr = vault_list[PYUSD_POOL_NAME]
+    vault_contract = raac_vault.at(vault_addr)
+    user = funded_accounts[0]
+
+    with boa.env.prank(user):
+        crvusd_pool.approve(vault_addr, 10**18)
+        vault_contract.deposit(10**18, user)
+    boa.env.time_travel(seconds=86400 * 7)
+
+    # the reward hook pays RSUP into the harvester instead of selling it
+    payer = boa.env.generate_address()
+    boa.deal(rsup_token, payer, 10**18)
+    with boa.env.prank(payer):
+        rsup_token.approve(harvester_addr, 10**18)
+    with boa.env.prank(strategy_manager):
+        vault_contract.set_extra_reward_hook(rsup_token.address)
+    reward_hook_calldata = function_signature_to_4byte_selector(
+        "transferFrom(address,address,uint256)"
+    ) + abi_encode(
+        "(address,address,uint256)", [payer, harvester_addr, 10**18]
+    )
+    target_hook_calldata = function_signature_to_4byte_selector(
+        "add_liquidity(address,address,uint256,uint256)"
+    ) + abi_encode(
+        "(address,address,uint256,uint256)",
+        [
+            crvusd_pool.address,
+            crvusd_token.address,
+            CRVUSD_POOLS[PYUSD_POOL_NAME]["crvusd_index"],
+            0,
+        ],
+    )
+    with boa.env.prank(harvest_manager):
+        vault_contract.harvest(
+            user,
+            0,
+            [rsup_token.address],
+            reward_hook_calldata,
+            target_hook_calldata,
+            b"",
+        )
+        receipt = vault_contract.get_logs()[-1].receipt
+
+    assert receipt.tokens_sold[2] == rsup_token.address
+    assert receipt.amounts_sold[2] == 0
+    assert rsup_token.balanceOf(harvester_addr) >= 10**18
@@ -0,0 +1,120 @@
+import boa
+import pytest
+from boa.util.abi import abi_encode
+from eth_utils import function_signature_to_4byte_selector
+
+from src import raac_vault
+from tests.utils.signatures import new_signer, sign_erc2612_permit
+
+
+def encode_call(signature, types, args):
+    return function_signature_to_4byte_selector(signature) + abi_encode(
+        f"({','.join(types)})", tuple(args)
+    )
+
+
+def test_multicall_deposit_and_transfer(
+    pyusd_vault, pyusd_pool, funded_accounts
+):
+    vault = raac_vault.at(pyusd_vault[0])
+    user, friend = funded_accounts[0], funded_accounts[1]
+    amount = 1_000 * 10**18
+
+    with boa.env.prank(user):
+        pyusd_pool.approve(vault.address, amount)
+        results = vault.multicall(
+            [
+                encode_call(
+                    "deposit(uint256,address)",
+                    ["uint256", "address"],
+                    [amount, user],
+                ),
+                encode_call(
+                    "transfer(address,uint256)",
+                    ["address", "uint256"],
+                    [friend, 10**18],
+                ),
+            ]
+        )
+
+    shares = int.from_bytes(results[0], "big")
+    assert shares > 0
+    assert vault.balanceOf(user) == shares - 10**18
+    assert vault.balanceOf(friend) == 10**18
+
+
+def test_multicall_permit_and_redeem(pyusd_vault, pyusd_pool, funded_accounts):
+    vault = raac_vault.at(pyusd_vault[0])
+    owner = new_signer()
+    relayer = funded_accounts[1]
+    amount = 1_000 * 10**18
+
+    with boa.env.prank(funded_accounts[0]):
+        pyusd_pool.approve(vault.address, amount)
+        shares = vault.deposit(amount, owner.address)
+
+    deadline = boa.env.evm.patch.timestamp + 3600
+    v, r, s = sign_erc2612_permit(
+        owner,
+        vault.DOMAIN_SEPARATOR(),
+        relayer,
+        shares,
+        vault.nonces(owner.address),
+        deadline,
+    )
+
+    # the relayer's msg.sender is preserved through the batch
+    with boa.env.prank(relayer):
+        vault.multicall(
+            [
+                encode_call(
+                    "permit(address,address,uint256,uint256,uint8,bytes32,bytes32)",
+                    [
+                        "address",
+                        "address",
+                        "uint256",
+                        "uint256",
+                        "uint8",
+                        "bytes32",
+                        "bytes32",
+                    ],
+                    [owner.address, relayer, shares, deadline, v, r, s],
+                ),
+                encode_call(
+                    "redeem(uint256,address,address)",
+                    ["uint256", "address", "address"],
+                    [shares, owner.address, owner.address],
+                ),
+            ]
+        )
+
+    assert vault.balanceOf(owner.address) == 0
+    assert pyusd_pool.balanceOf(owner.address) > 0
+
+
+def test_multicall_reverts_atomically(
+    pyusd_vault, pyusd_pool, funded_accounts
+):
+    vault = raac_vault.at(pyusd_vault[0])
+    user = funded_accounts[0]
+    amount = 1_000 * 10**18
+
+    with boa.env.prank(user):
+        pyusd_pool.approve(vault.address, amount)
+        with pytest.raises(Exception):
+            vault.multicall(
+                [
+                    encode_call(
+                        "deposit(uint256,address)",
+                        ["uint256", "address"],
+                        [amount, user],
+                    ),
+                    encode_call(
+                        "redeem(uint256,address,address)",
+                        ["uint256", "address", "address"],
+                        [2 * amount, user, user],
+                    ),
+                ]
+            )
+
+    assert vault.balanceOf(user) == 0
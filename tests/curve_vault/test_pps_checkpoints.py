@@ -0,0 +1,142 @@
+import boa
+import pytest
+from boa.util.abi import abi_encode
+from eth_utils import function_signature_to_4byte_selector
+
+from src import raac_vault
+from tests.conftest import PYUSD_POOL_NAME
+from tests.utils.constants import CRVUSD_POOLS
+
+
+@pytest.fixture(scope="function")
+def checkpoint_vault(
+    deploy_permissioned_vault_for_pool, add_liquidity_ng_hook
+):
+    vault_addr, _, _ = deploy_permissioned_vault_for_pool(
+        PYUSD_POOL_NAME, target_hook=add_liquidity_ng_hook.address
+    )
+    return raac_vault.at(vault_addr)
+
+
+def _harvest(vault_contract, pool, crvusd_token, harvest_manager):
+    target_hook_calldata = function_signature_to_4byte_selector(
+        "add_liquidity(address,address,uint256,uint256)"
+    ) + abi_encode(
+        "(address,address,uint256,uint256)",
+        [
+            pool.address,
+            crvusd_token.address,
+            CRVUSD_POOLS[PYUSD_POOL_NAME]["crvusd_index"],
+            0,
+        ],
+    )
+    with boa.env.prank(harvest_manager):
+        vault_contract.harvest(
+            harvest_manager, 0, [], b"", target_hook_calldata, b""
+        )
+
+
+def test_checkpoints_written_once_per_interval(
+    checkpoint_vault, pool_list, funded_accounts
+):
+    pool = pool_list[PYUSD_POOL_NAME]
+    user = funded_accounts[0]
+    with boa.env.prank(user):
+        pool.approve(checkpoint_vault.address, 3 * 10**18)
+        checkpoint_vault.deposit(10**18, user)
+        assert checkpoint_vault.pps_checkpoint_count() == 1
+        checkpoint_vault.deposit(10**18, user)
+        assert checkpoint_vault.pps_checkpoint_count() == 1
+
+        boa.env.time_travel(seconds=checkpoint_vault.PPS_CHECKPOINT_INTERVAL())
+        checkpoint_vault.withdraw(10**18, user, user)
+        assert checkpoint_vault.pps_checkpoint_count() == 2
+
+    checkpoint = checkpoint_vault.pps_checkpoints(1)
+    assert checkpoint.timestamp == boa.env.evm.patch.timestamp
+    assert checkpoint.total_assets == checkpoint_vault.totalAssets()
+    assert checkpoint.supply == checkpoint_vault.totalSupply()
+
+
+def test_same_block_checkpoint_replaces_latest(
+    checkpoint_vault,
+    pool_list,
+    crvusd_token,
+    funded_accounts,
+    harvest_manager,
+    lens,
+):
+    pool = pool_list[PYUSD_POOL_NAME]
+    user = funded_accounts[0]
+    with boa.env.prank(user):
+        pool.approve(checkpoint_vault.address, 2 * 10**18)
+        checkpoint_vault.deposit(10**18, user)
+    boa.env.time_travel(seconds=86400 * 7)
+    with boa.env.prank(user):
+        checkpoint_vault.deposit(10**18, user)
+    assert checkpoint_vault.pps_checkpoint_count() == 2
+
+    # the harvest checkpoint lands in the same block as the deposit one
+    _harvest(checkpoint_vault, pool, crvusd_token, harvest_manager)
+    assert checkpoint_vault.pps_checkpoint_count() == 2
+    checkpoint = checkpoint_vault.pps_checkpoints(1)
+    assert checkpoint.timestamp == boa.env.evm.patch.timestamp
+    assert checkpoint.total_assets == checkpoint_vault.totalAssets()
+    # the checkpoints span the week between the deposits
+    lens.apy(checkpoint_vault.address, 1)
+
+
+def test_apy_from_checkpoints(
+    checkpoint_vault,
+    pool_list,
+    crvusd_token,
+    funded_accounts,
+    harvest_manager,
+    lens,
+):
+    pool = pool_list[PYUSD_POOL_NAME]
+    user = funded_accounts[0]
+    with boa.env.prank(user):
+        pool.approve(checkpoint_vault.address, 2 * 10**18)
+        checkpoint_vault.deposit(10**18, user)
+    with boa.reverts("Not enough checkpoints"):
+        lens.apy(checkpoint_vault.address, 1)
+
+    # harvests always checkpoint, the profit then unlocks over time
+    boa.env.time_travel(seconds=86400 * 7)
+    _harvest(checkpoint_vault, pool, crvusd_token, harvest_manager)
+    assert checkpoint_vault.pps_checkpoint_count() == 2
+    boa.env.time_travel(seconds=checkpoint_vault.profit_max_unlock_time())
+    with boa.env.prank(user):
+        checkpoint_vault.deposit(10**18, user)
+    assert checkpoint_vault.pps_checkpoint_count() == 3
+
+    assert lens.apy(checkpoint_vault.address, 1) > 0
+    assert lens.apy(checkpoint_vault.address, 2) > 0
+    with boa.reverts("Not enough checkpoints"):
+        lens.apy(checkpoint_vault.address, 3)
+    with boa.reverts("Not enough checkpoints"):
+        lens.apy(checkpoint_vault.address, 0)
+
+
+def test_checkpoints_wrap_around(
+    checkpoint_vault, pool_list, funded_accounts, lens
+):
+    pool = pool_list[PYUSD_POOL_NAME]
+    user = funded_accounts[0]
+    size = checkpoint_vault.PPS_CHECKPOINTS()
+    with boa.env.prank(user):
+        pool.approve(checkpoint_vault.address, (size + 1) * 10**18)
+        for _ in range(size + 1):
+            checkpoint_vault.deposit(10**18, user)
+            boa.env.time_travel(
+                seconds=checkpoint_vault.PPS_CHECKPOINT_INTERVAL()
+            )
+
+    assert checkpoint_vault.pps_checkpoint_count() == size + 1
+    # the oldest checkpoint was overwritten by the latest one
+    assert (
+        checkpoint_vault.pps_checkpoints(0).supply
+        == checkpoint_vault.totalSupply()
+    )
+    assert lens.apy(checkpoint_vault.address, size - 1) == 0
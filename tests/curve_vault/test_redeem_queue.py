@@ -0,0 +1,325 @@
+import boa
+import pytest
+from tabulate import tabulate
+
+from src import raac_vault
+
+DEPOSIT_AMOUNT = 1_000 * 10**18
+
+
+@pytest.fixture(scope="function")
+def queue_vault(pyusd_vault, pyusd_pool, funded_accounts):
+    vault = raac_vault.at(pyusd_vault[0])
+    for user in funded_accounts[:4]:
+        with boa.env.prank(user):
+            pyusd_pool.approve(vault.address, 2**256 - 1)
+            vault.deposit(DEPOSIT_AMOUNT, user)
+    return vault
+
+
+def _settle(vault):
+    boa.env.time_travel(seconds=vault.redeem_epoch_duration())
+    vault.settle_redemptions()
+
+
+def test_request_escrows_shares(queue_vault, funded_accounts):
+    user = funded_accounts[0]
+    shares = queue_vault.balanceOf(user)
+    total_assets = queue_vault.totalAssets()
+    total_supply = queue_vault.totalSupply()
+
+    with boa.env.prank(user):
+        request_id = queue_vault.requestRedeem(shares, user, user)
+
+    assert request_id == queue_vault.current_redeem_epoch()
+    assert queue_vault.balanceOf(user) == 0
+    assert queue_vault.balanceOf(queue_vault.REDEEM_ESCROW()) == shares
+    assert queue_vault.pendingRedeemRequest(request_id, user) == shares
+    assert queue_vault.claimableRedeemRequest(request_id, user) == 0
+    # escrowed shares stay in the supply until settlement
+    assert queue_vault.totalAssets() == total_assets
+    assert queue_vault.totalSupply() == total_supply
+
+
+def test_request_settle_claim(queue_vault, pyusd_pool, funded_accounts):
+    user, other = funded_accounts[0], funded_accounts[1]
+    shares = queue_vault.balanceOf(user)
+    expected_assets = queue_vault.previewRedeem(shares)
+    lp_before = pyusd_pool.balanceOf(user)
+
+    with boa.env.prank(user):
+        request_id = queue_vault.requestRedeem(shares, user, user)
+
+    with boa.env.prank(other):
+        with pytest.raises(Exception, match="Epoch not over"):
+            queue_vault.settle_redemptions()
+
+    _settle(queue_vault)
+
+    assert queue_vault.current_redeem_epoch() == request_id + 1
+    assert queue_vault.pendingRedeemRequest(request_id, user) == 0
+    assert queue_vault.claimableRedeemRequest(request_id, user) == shares
+    assert queue_vault.balanceOf(queue_vault.REDEEM_ESCROW()) == 0
+    assert queue_vault.claimable_assets() == expected_assets
+
+    with boa.env.prank(other):
+        with pytest.raises(Exception, match="caller is not controller"):
+            queue_vault.claim_redeem(other, user)
+
+    with boa.env.prank(user):
+        assets = queue_vault.claim_redeem(user, user)
+
+    assert assets == expected_assets
+    assert pyusd_pool.balanceOf(user) == lp_before + assets
+    assert queue_vault.claimable_assets() == 0
+    assert queue_vault.claimableRedeemRequest(request_id, user) == 0
+
+
+def test_claim_before_settlement_reverts(queue_vault, funded_accounts):
+    user = funded_accounts[0]
+    with boa.env.prank(user):
+        queue_vault.requestRedeem(DEPOSIT_AMOUNT // 2, user, user)
+        with pytest.raises(Exception, match="request not settled"):
+            queue_vault.claim_redeem(user, user)
+
+
+def test_settle_with_dust_supply_left(
+    pyusd_vault, pyusd_pool, funded_accounts
+):
+    vault = raac_vault.at(pyusd_vault[0])
+    user, dust_holder = funded_accounts[0], funded_accounts[1]
+    with boa.env.prank(user):
+        pyusd_pool.approve(vault.address, 2**256 - 1)
+        vault.deposit(DEPOSIT_AMOUNT, user)
+        vault.transfer(dust_holder, vault.MIN_SHARES() // 2)
+        request_id = vault.requestRedeem(vault.balanceOf(user), user, user)
+
+    # the remaining supply is below MIN_SHARES, settlement still goes through
+    _settle(vault)
+
+    assert vault.totalSupply() == vault.MIN_SHARES() // 2
+    assert vault.balanceOf(dust_holder) == vault.MIN_SHARES() // 2
+    assert vault.claimableRedeemRequest(request_id, user) > 0
+    with boa.env.prank(user):
+        assert vault.claim_redeem(user, user) > 0
+
+
+def test_cancel_pending_request(queue_vault, funded_accounts):
+    user, other = funded_accounts[0], funded_accounts[1]
+    shares = queue_vault.balanceOf(user)
+    with boa.env.prank(user):
+        request_id = queue_vault.requestRedeem(shares, user, user)
+
+    with boa.env.prank(other):
+        with pytest.raises(Exception, match="caller is not controller"):
+            queue_vault.cancelRedeemRequest(other, user)
+
+    with boa.env.prank(user):
+        assert queue_vault.cancelRedeemRequest(user, user) == shares
+        event = queue_vault.get_logs()[-1]
+        with pytest.raises(Exception, match="no request"):
+            queue_vault.cancelRedeemRequest(user, user)
+
+    assert event.request_id == request_id
+    assert event.shares == shares
+    assert queue_vault.balanceOf(user) == shares
+    assert queue_vault.balanceOf(queue_vault.REDEEM_ESCROW()) == 0
+    assert queue_vault.pendingRedeemRequest(request_id, user) == 0
+    assert queue_vault.redeem_epochs(request_id).shares == 0
+
+
+def test_cancel_settled_request_reverts(queue_vault, funded_accounts):
+    user = funded_accounts[0]
+    with boa.env.prank(user):
+        queue_vault.requestRedeem(DEPOSIT_AMOUNT // 2, user, user)
+
+    _settle(queue_vault)
+
+    with boa.env.prank(user):
+        with pytest.raises(Exception, match="request settled"):
+            queue_vault.cancelRedeemRequest(user, user)
+        queue_vault.claim_redeem(user, user)
+
+
+def test_new_request_requires_claim(queue_vault, funded_accounts):
+    user = funded_accounts[0]
+    with boa.env.prank(user):
+        queue_vault.requestRedeem(DEPOSIT_AMOUNT // 4, user, user)
+        # requests in the same epoch accumulate
+        queue_vault.requestRedeem(DEPOSIT_AMOUNT // 4, user, user)
+    assert (
+        queue_vault.pendingRedeemRequest(
+            queue_vault.current_redeem_epoch(), user
+        )
+        == queue_vault.redeem_epochs(queue_vault.current_redeem_epoch()).shares
+    )
+
+    _settle(queue_vault)
+
+    with boa.env.prank(user):
+        with pytest.raises(Exception, match="claim settled request first"):
+            queue_vault.requestRedeem(DEPOSIT_AMOUNT // 4, user, user)
+
+
+def test_request_on_behalf_requires_allowance(queue_vault, funded_accounts):
+    owner, operator = funded_accounts[0], funded_accounts[1]
+    with boa.env.prank(operator):
+        with pytest.raises(Exception):
+            queue_vault.requestRedeem(1, operator, owner)
+
+    with boa.env.prank(owner):
+        queue_vault.approve(operator, 10**18)
+    with boa.env.prank(operator):
+        queue_vault.requestRedeem(10**18, operator, owner)
+    assert queue_vault.allowance(owner, operator) == 0
+
+
+def test_deposits_are_netted_against_requests(
+    queue_vault, pyusd_vault, pyusd_pool, funded_accounts
+):
+    strategy_addr = pyusd_vault[1]
+    user, depositor = funded_accounts[0], funded_accounts[1]
+    shares = queue_vault.balanceOf(user)
+    pending_assets = queue_vault.previewRedeem(shares)
+
+    with boa.env.prank(user):
+        queue_vault.requestRedeem(shares, user, user)
+
+    total_assets = queue_vault.totalAssets()
+    deposit = pending_assets // 2
+    with boa.env.prank(depositor):
+        queue_vault.deposit(deposit, depositor)
+
+    # the deposit stays in the vault and is still accounted for
+    assert queue_vault.idle_assets() == deposit
+    assert pyusd_pool.balanceOf(queue_vault.address) == deposit
+    assert queue_vault.totalAssets() == total_assets + deposit
+
+    staked_before = queue_vault.totalAssets() - deposit
+    _settle(queue_vault)
+
+    # only the shortfall is unstaked
+    event = queue_vault.get_logs()[-1]
+    assert event.unstaked == event.assets - deposit
+    assert queue_vault.idle_assets() == 0
+    assert queue_vault.totalAssets() == staked_before - event.unstaked
+    assert pyusd_pool.balanceOf(strategy_addr) == 0
+
+
+def test_idle_assets_capped_and_restaked(
+    queue_vault, pyusd_pool, funded_accounts
+):
+    user, depositor = funded_accounts[0], funded_accounts[1]
+    with boa.env.prank(user):
+        queue_vault.requestRedeem(DEPOSIT_AMOUNT // 10, user, user)
+    pending_assets = queue_vault.previewRedeem(DEPOSIT_AMOUNT // 10)
+
+    with boa.env.prank(depositor):
+        queue_vault.deposit(DEPOSIT_AMOUNT, depositor)
+
+    # only the value of the pending requests is kept idle
+    idle = queue_vault.idle_assets()
+    assert pending_assets <= idle <= pending_assets + 1
+
+    _settle(queue_vault)
+
+    event = queue_vault.get_logs()[-1]
+    assert event.unstaked == 0
+    assert queue_vault.idle_assets() == 0
+    assert (
+        pyusd_pool.balanceOf(queue_vault.address)
+        == queue_vault.claimable_assets()
+    )
+
+
+def test_sync_redeem_uses_idle_assets(queue_vault, funded_accounts):
+    user, depositor, redeemer = funded_accounts[:3]
+    with boa.env.prank(user):
+        queue_vault.requestRedeem(DEPOSIT_AMOUNT // 2, user, user)
+    with boa.env.prank(depositor):
+        queue_vault.deposit(DEPOSIT_AMOUNT, depositor)
+    idle = queue_vault.idle_assets()
+
+    with boa.env.prank(redeemer):
+        assets = queue_vault.redeem(
+            queue_vault.convertToShares(idle // 2), redeemer, redeemer
+        )
+    assert queue_vault.idle_assets() == idle - assets
+
+    _settle(queue_vault)
+    event = queue_vault.get_logs()[-1]
+    assert event.unstaked == event.assets - (idle - assets)
+
+
+def test_set_redeem_epoch_duration(queue_vault, strategy_manager, accounts):
+    with boa.env.prank(accounts[0]):
+        with pytest.raises(Exception):
+            queue_vault.set_redeem_epoch_duration(3600)
+    with boa.env.prank(strategy_manager):
+        with pytest.raises(Exception, match="epoch too long"):
+            queue_vault.set_redeem_epoch_duration(8 * 86400)
+        queue_vault.set_redeem_epoch_duration(3600)
+    assert queue_vault.redeem_epoch_duration() == 3600
+
+
+@pytest.mark.parametrize("n_requests", [1, 10, 100])
+def test_gas_per_user_benchmark(
+    pyusd_vault, pyusd_pool, funded_accounts, harvest_manager, n_requests
+):
+    vault = raac_vault.at(pyusd_vault[0])
+    whale = funded_accounts[0]
+    users = [boa.env.generate_address() for _ in range(2 * n_requests)]
+
+    with boa.env.prank(whale):
+        pyusd_pool.approve(vault.address, 2**256 - 1)
+        vault.deposit(DEPOSIT_AMOUNT * (len(users) + 1), whale)
+        for user in users:
+            vault.transfer(user, vault.convertToShares(DEPOSIT_AMOUNT))
+
+    sync_users, async_users = users[:n_requests], users[n_requests:]
+
+    sync_gas = 0
+    for user in sync_users:
+        with boa.env.prank(user):
+            vault.redeem(vault.balanceOf(user), user, user)
+        sync_gas += vault._computation.get_gas_used()
+
+    request_gas = 0
+    for user in async_users:
+        with boa.env.prank(user):
+            vault.requestRedeem(vault.balanceOf(user), user, user)
+        request_gas += vault._computation.get_gas_used()
+
+    with boa.env.prank(harvest_manager):
+        vault.settle_redemptions()
+    settle_gas = vault._computation.get_gas_used()
+
+    claim_gas = 0
+    for user in async_users:
+        with boa.env.prank(user):
+            vault.claim_redeem(user, user)
+        claim_gas += vault._computation.get_gas_used()
+
+    sync_per_user = sync_gas // n_requests
+    async_per_user = (request_gas + settle_gas + claim_gas) // n_requests
+    print(f"\n--- Redemption gas per user, {n_requests} request(s) ---")
+    print(
+        tabulate(
+            [
+                ["redeem", sync_per_user, "-", "-", sync_per_user],
+                [
+                    "queue",
+                    request_gas // n_requests,
+                    settle_gas // n_requests,
+                    claim_gas // n_requests,
+                    async_per_user,
+                ],
+            ],
+            headers=["Path", "Request", "Settle share", "Claim", "Total"],
+            tablefmt="grid",
+        )
+    )
+
+    assert all(pyusd_pool.balanceOf(user) > 0 for user in users)
+    if n_requests >= 10:
+        assert async_per_user < sync_per_user
@@ -0,0 +1,24 @@
+import pytest
+
+from src import raac_vault, strategy
+from src.harvesters import cow_harvester, curve_harvester
+
+# EIP-170 code size limit, blueprints hold the whole initcode behind the
+# ERC-5202 preamble
+MAX_CODE_SIZE = 24_576
+BLUEPRINT_PREAMBLE_SIZE = 3
+# headroom left for future changes before blueprint deployments fail
+MIN_HEADROOM = 256
+
+
+@pytest.mark.parametrize(
+    "deployer", [raac_vault, strategy, curve_harvester, cow_harvester]
+)
+def test_blueprint_size(deployer):
+    blueprint_size = (
+        len(deployer.compiler_data.bytecode) + BLUEPRINT_PREAMBLE_SIZE
+    )
+    assert blueprint_size + MIN_HEADROOM <= MAX_CODE_SIZE, (
+        f"{deployer.compiler_data.contract_path} blueprint is "
+        f"{blueprint_size} bytes"
+    )
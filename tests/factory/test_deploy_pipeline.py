@@ -0,0 +1,186 @@
+import json
+import threading
+import time
+
+import pytest
+from boa.util.abi import abi_encode
+from moccasin.config import get_config
+
+from script.deploy_pipeline import BoaChain, DeploymentPipeline, call_step
+from script.mock_deployment import TREASURY, core_steps, deployment_steps
+from src import factory
+
+CONTRACTS = [
+    "curve_harvester",
+    "cow_harvester",
+    "strategy",
+    "raac_vault",
+    "add_liquidity_hook",
+    "factory",
+]
+NEW_TREASURY = "0x" + "11" * 20
+
+
+def offline_steps() -> list:
+    """Core steps and a factory call, none of which need mainnet contracts"""
+    return core_steps() + [
+        call_step(
+            "set_treasury",
+            "factory",
+            factory,
+            "set_treasury",
+            lambda _: (NEW_TREASURY,),
+        )
+    ]
+
+
+class RecordingChain(BoaChain):
+    """Logs sends and receipt queries, optionally failing calls"""
+
+    def __init__(self, fail_calls: bool = False):
+        super().__init__()
+        self.events = []
+        self.fail_calls = fail_calls
+
+    def send(self, tx):
+        if self.fail_calls and tx["to"]:
+            raise ConnectionError("RPC unavailable")
+        tx_hash = super().send(tx)
+        self.events.append(("send", tx["nonce"], tx_hash))
+        return tx_hash
+
+    def receipt(self, tx_hash):
+        self.events.append(("receipt", tx_hash))
+        return super().receipt(tx_hash)
+
+
+class StubVerifier:
+    """Records verifications, failing the first attempt for `flaky`"""
+
+    def __init__(self, flaky=(), delay=0.2):
+        self.flaky = set(flaky)
+        self.delay = delay
+        self.verified = []
+        self.active = 0
+        self.max_active = 0
+        self._lock = threading.Lock()
+
+    def __call__(self, name, address, deployer, constructor_calldata):
+        with self._lock:
+            self.active += 1
+            self.max_active = max(self.max_active, self.active)
+        time.sleep(self.delay)
+        with self._lock:
+            self.active -= 1
+            if name in self.flaky:
+                self.flaky.discard(name)
+                raise RuntimeError("explorer timeout")
+            self.verified.append((name, address, constructor_calldata))
+
+
+def test_pipeline_deploys_in_waves(tmp_path):
+    chain = RecordingChain()
+    verifier = StubVerifier()
+    start_nonce = chain.nonce()
+    pipeline = DeploymentPipeline(
+        chain,
+        offline_steps(),
+        str(tmp_path / "manifest.json"),
+        verifier=verifier,
+    )
+    addresses = pipeline.run()
+
+    # the independent contracts are sent back-to-back before any receipt
+    first_wave = chain.events[:5]
+    assert [event[0] for event in first_wave] == ["send"] * 5
+    assert [event[1] for event in first_wave] == list(
+        range(start_nonce, start_nonce + 5)
+    )
+    assert chain.nonce() == start_nonce + 7
+
+    assert factory.at(addresses["factory"]).treasury() == NEW_TREASURY
+
+    # every contract is verified, concurrently
+    assert sorted(name for name, _, _ in verifier.verified) == sorted(
+        CONTRACTS
+    )
+    assert verifier.max_active > 1
+    factory_ctor = next(
+        calldata
+        for name, _, calldata in verifier.verified
+        if name == "factory"
+    )
+    assert factory_ctor == abi_encode(
+        "(address,address,(string,address)[],address)",
+        (
+            addresses["raac_vault"],
+            addresses["strategy"],
+            [
+                ("curve", addresses["curve_harvester"]),
+                ("cow", addresses["cow_harvester"]),
+            ],
+            TREASURY,
+        ),
+    )
+
+    with open(tmp_path / "manifest.json") as f:
+        manifest = json.load(f)
+    assert all(
+        step["status"] == "mined" for step in manifest["steps"].values()
+    )
+    assert all(manifest["steps"][name]["verified"] for name in CONTRACTS)
+
+
+def test_pipeline_resumes_from_manifest(tmp_path):
+    manifest_path = str(tmp_path / "manifest.json")
+    chain = RecordingChain(fail_calls=True)
+    verifier = StubVerifier(flaky=["strategy"])
+    pipeline = DeploymentPipeline(
+        chain,
+        offline_steps(),
+        manifest_path,
+        verifier=verifier,
+    )
+    with pytest.raises(ConnectionError):
+        pipeline.run()
+    pipeline.wait_for_verification()
+    assert len(verifier.verified) == len(CONTRACTS) - 1
+
+    with open(manifest_path) as f:
+        manifest = json.load(f)
+    assert "set_treasury" not in manifest["steps"]
+    assert manifest["steps"]["strategy"]["verified"] is False
+
+    # the rerun only sends the factory call and retries the verification
+    chain.fail_calls = False
+    chain.events.clear()
+    verifier.verified.clear()
+    addresses = DeploymentPipeline(
+        chain,
+        offline_steps(),
+        manifest_path,
+        verifier=verifier,
+    ).run()
+    assert [event[0] for event in chain.events].count("send") == 1
+    assert [name for name, _, _ in verifier.verified] == ["strategy"]
+    assert addresses["factory"] == manifest["steps"]["factory"]["address"]
+    assert factory.at(addresses["factory"]).treasury() == NEW_TREASURY
+
+
+def test_pipeline_deploys_vault(tmp_path, harvest_manager):
+    if not get_config().get_active_network().is_fork:
+        pytest.skip("deploys a vault against the mainnet Convex Booster")
+
+    addresses = DeploymentPipeline(
+        RecordingChain(),
+        deployment_steps(harvest_manager),
+        str(tmp_path / "manifest.json"),
+        verifier=StubVerifier(delay=0),
+    ).run()
+
+    deployed = factory.at(addresses["factory"])
+    assert deployed.treasury().lower() == TREASURY
+    assert deployed.vaults_deployed() == 1
+    with open(tmp_path / "manifest.json") as f:
+        manifest = json.load(f)
+    assert manifest["steps"]["usdt_vault"]["status"] == "mined"
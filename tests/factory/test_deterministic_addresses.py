@@ -0,0 +1,117 @@
+import boa
+import pytest
+
+from tests.conftest import ZERO_ADDRESS
+from tests.utils.constants import CRVUSD_POOLS
+
+
+@pytest.mark.parametrize("harvester_index", [0, 1])
+def test_compute_vault_addresses_matches_deployment(
+    vault_factory,
+    harvest_manager,
+    strategy_manager,
+    add_liquidity_hook,
+    harvester_index,
+):
+    booster_id = CRVUSD_POOLS["pyusd"]["booster_id"]
+    deployer = boa.env.eoa
+    nonce = vault_factory.deploy_nonces(deployer)
+
+    predicted = vault_factory.compute_vault_addresses(
+        deployer, booster_id, harvester_index, nonce
+    )
+
+    deployed = vault_factory.deploy_new_vault(
+        booster_id,
+        harvester_index,
+        harvest_manager,
+        strategy_manager,
+        ZERO_ADDRESS,
+        add_liquidity_hook.address,
+        0,
+    )
+
+    assert tuple(predicted) == tuple(deployed)
+    assert vault_factory.deploy_nonces(deployer) == nonce + 1
+
+
+def test_compute_vault_addresses_depends_on_unlock_time(vault_factory):
+    booster_id = CRVUSD_POOLS["pyusd"]["booster_id"]
+    deployer = boa.env.eoa
+    nonce = vault_factory.deploy_nonces(deployer)
+
+    default = vault_factory.compute_vault_addresses(
+        deployer, booster_id, 0, nonce
+    )
+    custom = vault_factory.compute_vault_addresses(
+        deployer, booster_id, 0, nonce, 86400
+    )
+
+    # harvester and strategy do not depend on the unlock time
+    assert default[1:] == custom[1:]
+    assert default[0] != custom[0]
+
+
+def test_same_parameters_yield_distinct_addresses(
+    vault_factory, harvest_manager, strategy_manager
+):
+    booster_id = CRVUSD_POOLS["pyusd"]["booster_id"]
+    first = vault_factory.deploy_new_vault(
+        booster_id,
+        0,
+        harvest_manager,
+        strategy_manager,
+        ZERO_ADDRESS,
+        ZERO_ADDRESS,
+        0,
+    )
+    second = vault_factory.deploy_new_vault(
+        booster_id,
+        0,
+        harvest_manager,
+        strategy_manager,
+        ZERO_ADDRESS,
+        ZERO_ADDRESS,
+        0,
+    )
+    assert set(first).isdisjoint(set(second))
+
+
+def test_addresses_are_deployer_specific(vault_factory, accounts):
+    booster_id = CRVUSD_POOLS["pyusd"]["booster_id"]
+    assert vault_factory.compute_vault_addresses(
+        accounts[0], booster_id, 0, 0
+    ) != vault_factory.compute_vault_addresses(accounts[1], booster_id, 0, 0)
+
+
+def test_compute_harvester_instance_address(
+    vault_factory, harvest_manager, strategy_manager
+):
+    vault_address, _, _ = vault_factory.deploy_new_vault(
+        CRVUSD_POOLS["pyusd"]["booster_id"],
+        0,
+        harvest_manager,
+        strategy_manager,
+        ZERO_ADDRESS,
+        ZERO_ADDRESS,
+        0,
+    )
+    deployer = boa.env.eoa
+    for harvester_index in (0, 1):
+        predicted = vault_factory.compute_harvester_instance_address(
+            deployer,
+            vault_address,
+            harvester_index,
+            vault_factory.deploy_nonces(deployer),
+        )
+        deployed = vault_factory.deploy_harvester_instance(
+            harvester_index, vault_address
+        )
+        assert predicted == deployed
+
+
+def test_compute_addresses_reverts_invalid_harvester_index(vault_factory):
+    with pytest.raises(Exception, match="Invalid harvester index"):
+        vault_factory.compute_vault_addresses(
+            boa.env.eoa, CRVUSD_POOLS["pyusd"]["booster_id"], 10, 0
+        )
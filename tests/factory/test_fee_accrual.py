@@ -0,0 +1,128 @@
+import boa
+import pytest
+from boa.util.abi import abi_encode
+from eth_utils import function_signature_to_4byte_selector
+
+from src import raac_vault
+from src.harvesters import curve_harvester
+from tests.conftest import PYUSD_POOL_NAME
+from tests.utils.constants import CRVUSD_POOLS
+
+
+@pytest.fixture(scope="function")
+def accruing_vaults(
+    deploy_permissioned_vault_for_pool,
+    add_liquidity_ng_hook,
+    pool_list,
+    funded_accounts,
+    strategy_manager,
+):
+    vaults = []
+    user = funded_accounts[0]
+    for _ in range(2):
+        vault_addr, _, harvester_addr = deploy_permissioned_vault_for_pool(
+            PYUSD_POOL_NAME, target_hook=add_liquidity_ng_hook.address
+        )
+        vault_contract = raac_vault.at(vault_addr)
+        harvester = curve_harvester.at(harvester_addr)
+        with boa.env.prank(user):
+            pool_list[PYUSD_POOL_NAME].approve(vault_addr, 10**18)
+            vault_contract.deposit(10**18, user)
+        with boa.env.prank(strategy_manager):
+            harvester.set_fee_accrual(True)
+        vaults.append((vault_contract, harvester))
+    return vaults
+
+
+def _harvest(vault_contract, caller, pool, crvusd_token, harvest_manager):
+    target_hook_calldata = function_signature_to_4byte_selector(
+        "add_liquidity(address,address,uint256,uint256)"
+    ) + abi_encode(
+        "(address,address,uint256,uint256)",
+        [
+            pool.address,
+            crvusd_token.address,
+            CRVUSD_POOLS[PYUSD_POOL_NAME]["crvusd_index"],
+            0,
+        ],
+    )
+    with boa.env.prank(harvest_manager):
+        vault_contract.harvest(caller, 0, [], b"", target_hook_calldata, b"")
+        return vault_contract.get_logs()[-1].receipt
+
+
+def test_set_fee_accrual(accruing_vaults, harvest_manager, strategy_manager):
+    _, harvester = accruing_vaults[0]
+    assert harvester.fee_accrual()
+    with boa.env.prank(harvest_manager):
+        with boa.reverts("Manager only"):
+            harvester.set_fee_accrual(False)
+    with boa.env.prank(strategy_manager):
+        harvester.set_fee_accrual(False)
+    assert not harvester.fee_accrual()
+
+
+def test_fees_accrue_to_factory(
+    accruing_vaults,
+    vault_factory,
+    pool_list,
+    crvusd_token,
+    harvest_manager,
+    treasury,
+):
+    pool = pool_list[PYUSD_POOL_NAME]
+    caller = boa.env.generate_address()
+    treasury_balance = crvusd_token.balanceOf(treasury)
+
+    boa.env.time_travel(seconds=86400 * 7)
+    receipts = [
+        _harvest(vault_contract, caller, pool, crvusd_token, harvest_manager)
+        for vault_contract, _ in accruing_vaults
+    ]
+
+    # nothing is paid out during the harvests
+    assert crvusd_token.balanceOf(caller) == 0
+    assert crvusd_token.balanceOf(treasury) == treasury_balance
+    assert crvusd_token.balanceOf(vault_factory.address) == sum(
+        receipt.platform_fee + receipt.caller_fee for receipt in receipts
+    )
+    for (_, harvester), receipt in zip(accruing_vaults, receipts):
+        assert harvester.accrued_fees(caller) == receipt.caller_fee > 0
+        assert harvester.accrued_platform_fees() == receipt.platform_fee > 0
+
+
+def test_claim_fees(
+    accruing_vaults,
+    vault_factory,
+    pool_list,
+    crvusd_token,
+    harvest_manager,
+    treasury,
+):
+    pool = pool_list[PYUSD_POOL_NAME]
+    caller = boa.env.generate_address()
+    harvesters = [harvester.address for _, harvester in accruing_vaults]
+
+    boa.env.time_travel(seconds=86400 * 7)
+    receipts = [
+        _harvest(vault_contract, caller, pool, crvusd_token, harvest_manager)
+        for vault_contract, _ in accruing_vaults
+    ]
+
+    with boa.reverts("Factory only"):
+        accruing_vaults[0][1].take_fees(caller, False)
+    with boa.reverts("Unknown harvester"):
+        vault_factory.claim_fees([caller])
+
+    with boa.env.prank(caller):
+        claimed = vault_factory.claim_fees(harvesters)
+        assert vault_factory.claim_fees(harvesters) == 0
+    assert claimed == sum(receipt.caller_fee for receipt in receipts)
+    assert crvusd_token.balanceOf(caller) == claimed
+
+    treasury_balance = crvusd_token.balanceOf(treasury)
+    with boa.env.prank(treasury):
+        claimed = vault_factory.claim_fees(harvesters)
+    assert claimed == sum(receipt.platform_fee for receipt in receipts)
+    assert crvusd_token.balanceOf(treasury) == treasury_balance + claimed
+    assert crvusd_token.balanceOf(vault_factory.address) == 0
@@ -0,0 +1,170 @@
+import boa
+import requests
+from boa.util.abi import abi_encode
+
+from script.exporter import Exporter, FleetReader
+from script.watch_tower import CallReverted
+from src import raac_vault
+from src.harvesters import cow_harvester
+from tests.utils.boa_rpc import BoaRpc
+from tests.utils.constants import CURVE_TRICRV_POOL
+
+
+def _labels(vault, booster_id):
+    return (("vault", vault), ("booster_id", str(booster_id)))
+
+
+def test_fleet_metrics(
+    vault_factory,
+    test_cow_vault,
+    test_permissioned_vault,
+    funded_accounts,
+    crvusd_pool,
+    crv_token,
+    harvest_manager,
+):
+    vault_addr, _, harvester_addr = test_cow_vault
+    vault_contract = raac_vault.at(vault_addr)
+    harvester_contract = cow_harvester.at(harvester_addr)
+    rpc = BoaRpc()
+    reader = FleetReader(rpc, vault_factory.address)
+
+    # the first read also fetches the vault records and checks which
+    # harvesters are CoW harvesters
+    metrics = reader.read()
+    assert rpc.calls == 3 + len(reader.records)
+    calls = rpc.calls
+    assert metrics[("vaults", ())] == vault_factory.vaults_deployed()
+    record = next(r for r in reader.records if r.vault == vault_addr)
+    labels = _labels(vault_addr, record.booster_id)
+    curve_labels = _labels(
+        test_permissioned_vault[0],
+        next(
+            r.booster_id
+            for r in reader.records
+            if r.vault == test_permissioned_vault[0]
+        ),
+    )
+    assert (
+        metrics[("total_assets", labels)]
+        == vault_contract.totalAssets() / 10**18
+    )
+    assert metrics[("platform_fee_bps", labels)] == 2000
+    assert metrics[("cow_order_open", labels + (("token", "CRV"),))] == 0
+    # curve harvesters have no CoW orders
+    assert ("cow_order_open", curve_labels + (("token", "CRV"),)) not in (
+        metrics
+    )
+
+    with boa.env.prank(CURVE_TRICRV_POOL):
+        crv_token.transfer(harvester_addr, int(1000 * 1e18))
+    user = funded_accounts[0]
+    with boa.env.prank(user):
+        crvusd_pool.approve(vault_addr, 10**18)
+        vault_contract.deposit(10**18, user)
+    with boa.env.prank(harvest_manager):
+        vault_contract.harvest(
+            harvest_manager,
+            0,
+            [],
+            b"",
+            b"",
+            abi_encode("(uint256[])", [[int(100 * 1e18), 0]]),
+        )
+    boa.env.time_travel(seconds=600)
+
+    # an unchanged fleet is read in a single call
+    metrics = reader.read()
+    assert rpc.calls == calls + 1
+    crv_labels = labels + (("token", "CRV"),)
+    _, order = harvester_contract.get_order_info(crv_token.address)
+    assert metrics[("cow_order_open", crv_labels)] == 1
+    assert metrics[("cow_order_sell_amount", crv_labels)] == (
+        order.sell_amount / 10**18
+    )
+    assert metrics[("cow_order_age_seconds", crv_labels)] == 600
+    assert metrics[("seconds_since_harvest", labels)] == 600
+    assert (
+        metrics[("total_assets", labels)]
+        == vault_contract.totalAssets() / 10**18
+    )
+
+
+def test_exporter_serves_cached_metrics(vault_factory, test_cow_vault):
+    rpc = BoaRpc()
+    exporter = Exporter(FleetReader(rpc, vault_factory.address), 60)
+    exporter.refresh()
+    calls = rpc.calls
+
+    server = exporter.serve(0)
+    try:
+        url = f"http://127.0.0.1:{server.server_address[1]}/metrics"
+        for _ in range(3):
+            response = requests.get(url, timeout=10)
+            assert response.status_code == 200
+        assert requests.get(url[:-7], timeout=10).status_code == 404
+    finally:
+        server.shutdown()
+
+    # scrapes do not hit the RPC
+    assert rpc.calls == calls
+    text = response.text
+    assert "# TYPE raac_total_assets gauge" in text
+    assert f'raac_total_assets{{vault="{test_cow_vault[0]}"' in text
+    assert f"raac_exporter_rpc_calls {calls}" in text
+
+
+def test_reader_follows_harvester_migration(
+    vault_factory, test_cow_vault, strategy_manager
+):
+    vault_addr, strategy_addr, old_harvester = test_cow_vault
+    rpc = BoaRpc()
+    reader = FleetReader(rpc, vault_factory.address)
+    reader.read()
+    calls = rpc.calls
+    record = next(r for r in reader.records if r.vault == vault_addr)
+    assert record.harvester == old_harvester
+
+    new_harvester = cow_harvester.deploy(vault_factory.address)
+    new_harvester.set_strategy(strategy_addr)
+    with boa.env.prank(strategy_manager):
+        raac_vault.at(vault_addr).update_harvester(new_harvester.address, [])
+
+    # the fleet is read again with the new harvester, the records are kept
+    metrics = reader.read()
+    assert rpc.calls == calls + 3
+    assert record.harvester == new_harvester.address
+    labels = _labels(vault_addr, record.booster_id)
+    assert metrics[("cow_order_open", labels + (("token", "CRV"),))] == 0
+
+    reader.read()
+    assert rpc.calls == calls + 4
+
+
+def test_reader_splits_large_fleet(
+    vault_factory, deploy_permissioned_vault_for_pool
+):
+    for _ in range(30):
+        deploy_permissioned_vault_for_pool("pyusd")
+    vault_count = vault_factory.vaults_deployed()
+    rpc = BoaRpc()
+    expected = FleetReader(rpc, vault_factory.address, vault_count).read()
+    assert len([key for key in expected if key[0] == "total_assets"]) == (
+        vault_count
+    )
+
+    # a node capping eth_call gas below the cost of the whole fleet
+    gas_cap = rpc.max_gas_used // 2
+    reader = FleetReader(BoaRpc(gas_cap), vault_factory.address, vault_count)
+    try:
+        assert reader.read() != expected
+    except CallReverted:
+        pass
+
+    rpc = BoaRpc(gas_cap)
+    vaults_per_call = vault_count // 4
+    reader = FleetReader(rpc, vault_factory.address, vaults_per_call)
+    reader.read()
+    calls = rpc.calls
+    assert reader.read() == expected
+    assert rpc.calls == calls + -(-vault_count // vaults_per_call)
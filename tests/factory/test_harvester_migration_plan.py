@@ -0,0 +1,189 @@
+import json
+
+import boa
+import pytest
+
+from script.update_harvester import (
+    Checkpoint,
+    dry_run_fleet,
+    execute_plan,
+    plan_batches,
+    plan_key,
+    plan_migration,
+    read_fleet,
+    write_plan,
+)
+from src import raac_vault, strategy
+from tests.utils.constants import CRV_TOKEN, CVX_TOKEN
+
+
+@pytest.fixture(scope="module")
+def fleet(deploy_permissioned_vault_for_pool, add_liquidity_ng_hook):
+    return [
+        deploy_permissioned_vault_for_pool(
+            pool_name, target_hook=add_liquidity_ng_hook.address
+        )
+        for pool_name in ("pyusd", "usdc", "usdt")
+    ]
+
+
+@pytest.fixture(scope="function")
+def stranded_fleet(fleet, crv_token, cvx_token):
+    # the last vault only has CRV left in its harvester
+    for i, (_, _, harvester) in enumerate(fleet):
+        boa.deal(crv_token, harvester, (i + 1) * 10**18)
+        if i < len(fleet) - 1:
+            boa.deal(cvx_token, harvester, (i + 1) * 10**17)
+    return fleet
+
+
+def test_plan_dry_runs_without_side_effects(
+    vault_factory, stranded_fleet, crv_token, tmp_path
+):
+    vaults = [vault for vault, _, _ in stranded_fleet]
+    plan = plan_migration(
+        vault_factory,
+        1,
+        str(tmp_path / "plan.json"),
+        str(tmp_path / "checkpoint.json"),
+        vaults=vaults,
+    )
+
+    assert plan["failed"] == []
+    assert len(plan["batches"]) == 1
+    batch = plan["batches"][0]
+    assert sorted(batch["vaults"]) == sorted(vaults)
+    assert batch["migration_tokens"] == sorted([CRV_TOKEN, CVX_TOKEN])
+    assert batch["gas"] > 0
+    assert plan["stranded"][vaults[2]][CRV_TOKEN] == 3 * 10**18
+    assert plan["stranded"][vaults[2]][CVX_TOKEN] == 0
+    with open(tmp_path / "plan.json") as f:
+        assert json.load(f) == plan
+
+    # the dry runs are rolled back
+    for _, strategy_addr, harvester in stranded_fleet:
+        assert strategy.at(strategy_addr).harvester() == harvester
+    assert crv_token.balanceOf(stranded_fleet[0][2]) == 10**18
+
+    # a restart reuses the recorded dry runs
+    checkpoint = Checkpoint(
+        str(tmp_path / "checkpoint.json"),
+        boa.env.evm.patch.block_number,
+        1,
+    )
+    assert set(checkpoint.dry_runs) == set(vaults)
+
+
+def test_batches_share_migration_tokens(
+    vault_factory, stranded_fleet, tmp_path
+):
+    checkpoint = Checkpoint(str(tmp_path / "checkpoint.json"), 0, 1)
+    migrations = dry_run_fleet(
+        vault_factory,
+        read_fleet(vault_factory, [v for v, _, _ in stranded_fleet]),
+        checkpoint,
+    )
+
+    batches = plan_batches(migrations, max_batch_size=2)
+    assert [len(b.migrations) for b in batches] == [2, 1]
+    # a batch forwards the tokens stranded in any of its harvesters
+    for batch in batches:
+        assert batch.migration_tokens == sorted([CRV_TOKEN, CVX_TOKEN])
+
+    gas = [m.gas_used for m in migrations]
+    batches = plan_batches(migrations, max_gas=max(gas) + min(gas))
+    assert all(b.gas <= max(gas) + min(gas) for b in batches)
+    assert sum(len(b.migrations) for b in batches) == 3
+
+
+def test_execute_resumes_from_checkpoint(
+    vault_factory, stranded_fleet, crv_token, tmp_path
+):
+    vaults = [vault for vault, _, _ in stranded_fleet]
+    checkpoint_path = str(tmp_path / "checkpoint.json")
+    block = boa.env.evm.patch.block_number
+    checkpoint = Checkpoint(checkpoint_path, block, 1)
+    migrations = dry_run_fleet(
+        vault_factory, read_fleet(vault_factory, vaults), checkpoint
+    )
+    plan = write_plan(
+        str(tmp_path / "plan.json"),
+        vault_factory,
+        checkpoint,
+        plan_batches(migrations, max_batch_size=1),
+        migrations,
+    )
+    planned = [batch["vaults"][0] for batch in plan["batches"]]
+
+    # the factory lost its admin role on the second vault: the run stops
+    failing = raac_vault.at(planned[1])
+    admin_role = failing.DEFAULT_ADMIN_ROLE()
+    admin = boa.env.generate_address()
+    with boa.env.prank(vault_factory.address):
+        failing.grantRole(admin_role, admin)
+        failing.revokeRole(admin_role, vault_factory.address)
+    with pytest.raises(Exception):
+        execute_plan(vault_factory, plan, checkpoint)
+    assert list(checkpoint.executed[plan_key(plan)]) == ["0"]
+
+    with boa.env.prank(admin):
+        failing.grantRole(admin_role, vault_factory.address)
+    # the first batch is mined but its checkpoint entry was lost
+    with open(checkpoint_path) as f:
+        data = json.load(f)
+    data["executed"] = {}
+    with open(checkpoint_path, "w") as f:
+        json.dump(data, f)
+
+    checkpoint = Checkpoint(checkpoint_path, block, 1)
+    execute_plan(vault_factory, plan, checkpoint)
+    executed = checkpoint.executed[plan_key(plan)]
+    assert executed["0"] == {"vaults": [], "new_harvesters": []}
+    for i in (1, 2):
+        assert executed[str(i)]["vaults"] == [planned[i]]
+
+    for migration in migrations:
+        new_harvester = strategy.at(migration.strategy).harvester()
+        assert new_harvester != migration.harvester
+        assert (
+            crv_token.balanceOf(new_harvester) == migration.stranded[CRV_TOKEN]
+        )
+
+
+def test_execute_plans_sharing_checkpoint(
+    vault_factory, stranded_fleet, tmp_path
+):
+    checkpoint_path = str(tmp_path / "checkpoint.json")
+    block = boa.env.evm.patch.block_number
+    checkpoint = Checkpoint(checkpoint_path, block, 1)
+    migrations = dry_run_fleet(
+        vault_factory,
+        read_fleet(vault_factory, [v for v, _, _ in stranded_fleet]),
+        checkpoint,
+    )
+
+    # two plans of the same block and harvester index, one vault each
+    plans = [
+        write_plan(
+            str(tmp_path / f"plan_{i}.json"),
+            vault_factory,
+            checkpoint,
+            plan_batches([migration]),
+            [migration],
+        )
+        for i, migration in enumerate(migrations[:2])
+    ]
+    for plan in plans:
+        execute_plan(
+            vault_factory, plan, Checkpoint(checkpoint_path, block, 1)
+        )
+
+    # the second plan did not reuse the batch executed by the first
+    checkpoint = Checkpoint(checkpoint_path, block, 1)
+    for plan, migration in zip(plans, migrations):
+        assert checkpoint.executed[plan_key(plan)]["0"]["vaults"] == [
+            migration.vault
+        ]
+        assert (
+            strategy.at(migration.strategy).harvester() != migration.harvester
+        )
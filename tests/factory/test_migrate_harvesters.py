@@ -0,0 +1,65 @@
+import boa
+import pytest
+
+from src import strategy
+from src.harvesters import cow_harvester
+from tests.utils.constants import CRV_TOKEN, CVX_TOKEN
+
+
+@pytest.fixture(scope="module")
+def fleet(deploy_permissioned_vault_for_pool, add_liquidity_ng_hook):
+    return [
+        deploy_permissioned_vault_for_pool(
+            pool_name, target_hook=add_liquidity_ng_hook.address
+        )
+        for pool_name in ("pyusd", "usdc", "usdt")
+    ]
+
+
+def test_migrate_harvesters_updates_fleet(
+    vault_factory, fleet, crv_token, cvx_token, add_liquidity_ng_hook
+):
+    for _, _, harvester in fleet:
+        boa.deal(crv_token, harvester, 100 * 10**18)
+        boa.deal(cvx_token, harvester, 50 * 10**18)
+
+    new_harvesters = vault_factory.migrate_harvesters(
+        [vault for vault, _, _ in fleet], 1, [CRV_TOKEN, CVX_TOKEN]
+    )
+    assert len(new_harvesters) == len(fleet)
+
+    for (vault, strategy_addr, old_harvester), new_harvester in zip(
+        fleet, new_harvesters
+    ):
+        assert strategy.at(strategy_addr).harvester() == new_harvester
+        assert cow_harvester.at(new_harvester).strategy() == strategy_addr
+        assert (
+            cow_harvester.at(new_harvester).target_hook()
+            == add_liquidity_ng_hook.address
+        )
+
+        record = vault_factory.get_vault_by_harvester(new_harvester)
+        assert record.vault == vault
+        assert record.strategy == strategy_addr
+        assert vault_factory.harvester_to_id(old_harvester) == 0
+
+        assert crv_token.balanceOf(old_harvester) == 0
+        assert cvx_token.balanceOf(old_harvester) == 0
+        assert crv_token.balanceOf(new_harvester) == 100 * 10**18
+        assert cvx_token.balanceOf(new_harvester) == 50 * 10**18
+
+
+def test_migrate_harvesters_owner_only(vault_factory, fleet, strategy_manager):
+    with boa.env.prank(strategy_manager):
+        with pytest.raises(
+            Exception, match="ownable: caller is not the owner"
+        ):
+            vault_factory.migrate_harvesters([fleet[0][0]], 0)
+
+
+def test_migrate_harvesters_reverts_for_unknown_vault(vault_factory, fleet):
+    with pytest.raises(Exception, match="Vault not factory deployed"):
+        vault_factory.migrate_harvesters(
+            [fleet[0][0], boa.env.generate_address()], 0
+        )
+    assert strategy.at(fleet[0][1]).harvester() == fleet[0][2]
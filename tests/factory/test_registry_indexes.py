@@ -0,0 +1,115 @@
+import boa
+import pytest
+
+from src import raac_vault
+from tests.utils.constants import CRVUSD_POOLS, POOL_MANAGER
+
+
+@pytest.fixture(scope="module")
+def indexed_vaults(deploy_permissioned_vault_for_pool):
+    return [
+        deploy_permissioned_vault_for_pool(pool_name)
+        for pool_name in ("pyusd", "usdc", "pyusd")
+    ]
+
+
+def test_get_vault_records_pagination(vault_factory, indexed_vaults):
+    last_id = vault_factory.vaults_deployed()
+    first_id = last_id - len(indexed_vaults) + 1
+
+    records = vault_factory.get_vault_records(first_id, 100)
+    assert [r.vault for r in records] == [v for v, _, _ in indexed_vaults]
+    for record, (vault, strategy, harvester) in zip(records, indexed_vaults):
+        assert record.strategy == strategy
+        assert record.harvester == harvester
+
+    page = vault_factory.get_vault_records(first_id + 1, 1)
+    assert len(page) == 1
+    assert page[0].vault == indexed_vaults[1][0]
+
+    assert len(vault_factory.get_vault_records(last_id + 1, 10)) == 0
+    assert len(vault_factory.get_vault_records(first_id, 0)) == 0
+
+
+def test_get_vault_records_rejects_id_zero(vault_factory, indexed_vaults):
+    with boa.reverts("Vault ids start at 1"):
+        vault_factory.get_vault_records(0, 10)
+
+
+def test_index_by_booster_id(vault_factory, indexed_vaults):
+    booster_id = CRVUSD_POOLS["pyusd"]["booster_id"]
+    count = vault_factory.booster_id_vault_count(booster_id)
+    records = vault_factory.get_vaults_by_booster_id(booster_id, 0, count)
+    assert len(records) == count
+    assert all(r.booster_id == booster_id for r in records)
+    vaults = [r.vault for r in records]
+    assert indexed_vaults[0][0] in vaults
+    assert indexed_vaults[2][0] in vaults
+    assert indexed_vaults[1][0] not in vaults
+
+    offset_page = vault_factory.get_vaults_by_booster_id(
+        booster_id, count - 1, 10
+    )
+    assert [r.vault for r in offset_page] == [records[-1].vault]
+
+
+def test_index_by_token(vault_factory, indexed_vaults):
+    token = raac_vault.at(indexed_vaults[1][0]).asset()
+    count = vault_factory.token_vault_count(token)
+    records = vault_factory.get_vaults_by_token(token, 0, count)
+    assert len(records) == count
+    assert all(r.token == token for r in records)
+    assert records[-1].vault == indexed_vaults[1][0]
+
+
+def test_index_by_harvester(vault_factory, indexed_vaults):
+    for vault, _, harvester in indexed_vaults:
+        assert vault_factory.get_vault_by_harvester(harvester).vault == vault
+        assert vault_factory.harvester_to_id(
+            harvester
+        ) == vault_factory.vault_to_id(vault)
+
+
+def test_harvester_index_follows_update_harvester(
+    vault_factory, indexed_vaults, strategy_manager
+):
+    vault, _, old_harvester = indexed_vaults[0]
+    new_harvester = vault_factory.deploy_harvester_instance(0, vault)
+
+    with boa.env.prank(strategy_manager):
+        raac_vault.at(vault).update_harvester(new_harvester, [])
+
+    assert vault_factory.harvester_to_id(old_harvester) == 0
+    assert vault_factory.get_vault_by_harvester(new_harvester).vault == vault
+    assert (
+        vault_factory.get_vault_records(vault_factory.vault_to_id(vault), 1)[
+            0
+        ].harvester
+        == new_harvester
+    )
+
+
+def test_booster_id_index_follows_booster_migration(
+    vault_factory, indexed_vaults, convex_booster, strategy_manager
+):
+    vault, _, _ = indexed_vaults[1]
+    old_pid = CRVUSD_POOLS["usdc"]["booster_id"]
+    old_count = vault_factory.booster_id_vault_count(old_pid)
+
+    lptoken, _, gauge, _, _, _ = convex_booster.poolInfo(old_pid)
+    with boa.env.prank(POOL_MANAGER):
+        convex_booster.shutdownPool(old_pid)
+        convex_booster.addPool(lptoken, gauge, 3)
+    new_pid = convex_booster.poolLength() - 1
+
+    with boa.env.prank(strategy_manager):
+        raac_vault.at(vault).migrate_booster(new_pid, [])
+
+    assert vault_factory.booster_id_vault_count(old_pid) == old_count - 1
+    assert vault not in [
+        r.vault
+        for r in vault_factory.get_vaults_by_booster_id(old_pid, 0, old_count)
+    ]
+    new_records = vault_factory.get_vaults_by_booster_id(new_pid, 0, 10)
+    assert [r.vault for r in new_records] == [vault]
+    assert new_records[0].booster_id == new_pid
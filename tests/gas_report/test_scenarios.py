@@ -0,0 +1,122 @@
+import boa
+import pytest
+from boa.util.abi import abi_encode
+from eth_utils import function_signature_to_4byte_selector
+
+from src import raac_vault, strategy
+from src.harvesters import cow_harvester, curve_harvester
+from tests.conftest import PYUSD_POOL_NAME
+from tests.cow_vault.test_harvest_gas import EXTRA_REWARD_TOKENS
+from tests.utils.constants import CRVUSD_POOLS
+
+
+def _register(vault_addr, strategy_addr, harvester_addr, harvester_deployer):
+    # contracts must be known to boa for their nested calls to be profiled
+    strategy.at(strategy_addr)
+    return raac_vault.at(vault_addr), harvester_deployer.at(harvester_addr)
+
+
+@pytest.fixture(scope="function")
+def curve_vault(
+    gas_report,
+    deploy_permissioned_vault_for_pool,
+    add_liquidity_ng_hook,
+    pool_list,
+    funded_accounts,
+):
+    vault_contract, _ = _register(
+        *deploy_permissioned_vault_for_pool(
+            PYUSD_POOL_NAME, target_hook=add_liquidity_ng_hook.address
+        ),
+        curve_harvester,
+    )
+    user = funded_accounts[0]
+    with boa.env.prank(user):
+        pool_list[PYUSD_POOL_NAME].approve(vault_contract.address, 10**24)
+        vault_contract.deposit(10**20, user)
+    return vault_contract
+
+
+def test_curve_harvest(
+    gas_report,
+    gas_report_runs,
+    curve_vault,
+    pool_list,
+    crvusd_token,
+    harvest_manager,
+):
+    target_hook_calldata = function_signature_to_4byte_selector(
+        "add_liquidity(address,address,uint256,uint256)"
+    ) + abi_encode(
+        "(address,address,uint256,uint256)",
+        [
+            pool_list[PYUSD_POOL_NAME].address,
+            crvusd_token.address,
+            CRVUSD_POOLS[PYUSD_POOL_NAME]["crvusd_index"],
+            0,
+        ],
+    )
+    for _ in range(gas_report_runs):
+        boa.env.time_travel(seconds=86400)
+        with boa.env.prank(harvest_manager):
+            gas_report.profile(
+                "curve harvest",
+                curve_vault.harvest,
+                harvest_manager,
+                0,
+                [],
+                b"",
+                target_hook_calldata,
+                b"",
+            )
+
+
+def test_cow_harvest_max_tokens(
+    gas_report,
+    gas_report_runs,
+    test_cow_vault,
+    crvusd_pool,
+    funded_accounts,
+    harvest_manager,
+):
+    vault_contract, harvester_contract = _register(
+        *test_cow_vault, cow_harvester
+    )
+    user = funded_accounts[0]
+    with boa.env.prank(user):
+        crvusd_pool.approve(vault_contract.address, 10**18)
+        vault_contract.deposit(10**18, user)
+
+    buy_amounts = [10**18] * harvester_contract.MAX_TOKENS()
+    scenario = f"cow harvest, {len(buy_amounts)} tokens"
+    for _ in range(gas_report_runs):
+        # let the previous orders expire so each run creates or refreshes
+        boa.env.time_travel(seconds=harvester_contract.delay())
+        with boa.env.prank(harvest_manager):
+            gas_report.profile(
+                scenario,
+                vault_contract.harvest,
+                harvest_manager,
+                0,
+                EXTRA_REWARD_TOKENS,
+                b"",
+                b"",
+                abi_encode("(uint256[])", [buy_amounts]),
+            )
+
+
+def test_deposit(gas_report, gas_report_runs, curve_vault, funded_accounts):
+    user = funded_accounts[0]
+    for _ in range(gas_report_runs):
+        with boa.env.prank(user):
+            gas_report.profile("deposit", curve_vault.deposit, 10**18, user)
+
+
+def test_redeem(gas_report, gas_report_runs, curve_vault, funded_accounts):
+    user = funded_accounts[0]
+    shares = curve_vault.balanceOf(user) // (gas_report_runs + 1)
+    for _ in range(gas_report_runs):
+        with boa.env.prank(user):
+            gas_report.profile(
+                "redeem", curve_vault.redeem, shares, user, user
+            )
@@ -0,0 +1,80 @@
+import boa
+import numpy as np
+import pytest
+
+from script.backtest import (
+    ProfitStreaming,
+    backtest,
+    collect_fees,
+    demo_data,
+)
+
+
+def test_collect_fees_matches_swapper():
+    gross = 123_456_789_012_345_678
+    platform, caller, net = collect_fees(np.float64(gross), 1500, 25)
+    assert platform == gross * 1500 // 10_000
+    assert caller == gross * 25 // 10_000
+    assert net == pytest.approx(gross - platform - caller, abs=64)
+
+
+def test_streaming_model_matches_vault(
+    mock_vault,
+    funded_mock_vault_users,
+    harvest_caller,
+):
+    user = funded_mock_vault_users[0]
+    deposit_amount = int(100_000 * 10**18)
+    with boa.env.prank(user):
+        mock_vault.deposit(deposit_amount, user)
+
+    model = ProfitStreaming(
+        mock_vault.totalAssets(),
+        mock_vault.totalSupply(),
+        mock_vault.profit_max_unlock_time(),
+    )
+    start = boa.env.evm.patch.timestamp
+    # harvests landing before, at and after the end of the previous stream
+    for delay, profit in [
+        (0, 5_000),
+        (86400, 1_000),
+        (3 * 86400, 20_000),
+        (10 * 86400, 700),
+        (3600, 12_345),
+    ]:
+        boa.env.time_travel(seconds=delay)
+        now = boa.env.evm.patch.timestamp - start
+        with boa.env.prank(harvest_caller):
+            mock_vault.harvest(
+                harvest_caller, int(profit * 10**18), [], b"", b"", b""
+            )
+        model.process_profit(np.float64(profit * 10**18), now)
+
+        assert model.full_profit_unlock_date + start == pytest.approx(
+            mock_vault.full_profit_unlock_date(), abs=1
+        )
+        for elapsed in [0, 3600, 2 * 86400]:
+            boa.env.time_travel(seconds=elapsed)
+            now = boa.env.evm.patch.timestamp - start
+            assert model.unlocked_shares(now) == pytest.approx(
+                mock_vault.unlocked_shares(), rel=1e-5
+            )
+            assert model.price_per_share(now) == pytest.approx(
+                mock_vault.convertToAssets(10**18) / 10**18, rel=1e-5
+            )
+
+
+def test_backtest_grid():
+    data = demo_data(n_vaults=5, n_steps=60)
+    result = backtest(data, [1, 7, 30], [0, 50], [0, 1000, 2000])
+
+    assert result.net_apy.shape == (5, 3, 2, 3)
+    assert result.harvests[:, :, 0, 0].tolist() == [[60, 8, 2]] * 5
+    # fees are taken from depositors
+    assert (np.diff(result.net_apy, axis=3) < 0).all()
+    assert (result.net_apy[:, :, 1, :] < result.net_apy[:, :, 0, :]).all()
+    assert (result.platform_revenue[..., 0] == 0).all()
+    # without caller fee the caller only pays gas
+    assert (result.caller_profit[:, :, 0, :] < 0).all()
+    assert (result.caller_profitable[:, :, 0, :] == 0).all()
+    assert result.fleet_apy(data.tvl).shape == (3, 2, 3)
@@ -0,0 +1,97 @@
+import boa
+import numpy as np
+import pytest
+
+from script.backtest import ProfitStreaming
+from script.jit_simulator import (
+    AttackParams,
+    set_unlock_time_transaction,
+    simulate,
+)
+
+
+def test_attack_model_matches_vault(
+    mock_vault,
+    funded_mock_vault_users,
+    harvest_caller,
+):
+    user, attacker = funded_mock_vault_users[0], funded_mock_vault_users[1]
+    with boa.env.prank(user):
+        mock_vault.deposit(int(100_000 * 10**18), user)
+
+    model = ProfitStreaming(
+        mock_vault.totalAssets(),
+        mock_vault.totalSupply(),
+        mock_vault.profit_max_unlock_time(),
+    )
+    start = boa.env.evm.patch.timestamp
+    profit = int(500 * 10**18)
+    deposit = int(300_000 * 10**18)
+
+    with boa.env.prank(harvest_caller):
+        mock_vault.harvest(harvest_caller, profit, [], b"", b"", b"")
+    model.process_profit(np.float64(profit), 0)
+
+    boa.env.time_travel(seconds=86400)
+    with boa.env.prank(attacker):
+        shares = mock_vault.deposit(deposit, attacker)
+    model_shares = model.deposit(np.float64(deposit), 86400)
+    assert model_shares == pytest.approx(shares, rel=1e-9)
+
+    boa.env.time_travel(seconds=60)
+    with boa.env.prank(harvest_caller):
+        mock_vault.harvest(harvest_caller, profit, [], b"", b"", b"")
+    model.process_profit(np.float64(profit), 86460)
+
+    boa.env.time_travel(seconds=2 * 86400)
+    now = boa.env.evm.patch.timestamp - start
+    with boa.env.prank(attacker):
+        assets = mock_vault.redeem(shares, attacker, attacker)
+    assert model.redeem(model_shares, now) == pytest.approx(assets, rel=1e-6)
+    # only part of the harvests is captured within the unlock time
+    assert deposit < assets < deposit + profit
+
+
+def test_longer_unlock_time_reduces_attacks():
+    # attackers leaving within a day of the harvest, without costs
+    params = AttackParams(gas_cost=0, capital_rate=0, max_hold_time=86400)
+    result = simulate(
+        2_000_000,
+        [0, 86400, 7 * 86400],
+        [0.0005, 0.002],
+        trials=50_000,
+        params=params,
+    )
+
+    assert result.mean_profit.shape == (3, 2)
+    assert (np.diff(result.captured, axis=0) < 0).all()
+    assert (np.diff(result.mean_profit, axis=0) < 0).all()
+    # bigger harvests are worth more to the attacker
+    assert (result.mean_profit[:, 1] > result.mean_profit[:, 0]).all()
+    # without costs, depositing before a harvest always pays
+    assert (result.profitable == 1).all()
+
+
+def test_unlock_time_transaction(mock_vault, harvest_caller):
+    result = simulate(
+        2_000_000, [0, 86400, 30 * 86400], [0.0001], trials=20_000
+    )
+    unlock_time = result.safe_unlock_time()
+    assert unlock_time is not None and unlock_time > 0
+
+    transaction = set_unlock_time_transaction(
+        mock_vault.address,
+        unlock_time,
+        result,
+        mock_vault.profit_max_unlock_time(),
+    )
+    assert transaction["simulation"]["profitable"] == [
+        result.profitable[list(result.unlock_times).index(unlock_time)][0]
+    ]
+
+    boa.env.raw_call(
+        transaction["to"],
+        sender=harvest_caller,
+        data=bytes.fromhex(transaction["data"][2:]),
+    )
+    assert mock_vault.profit_max_unlock_time() == unlock_time
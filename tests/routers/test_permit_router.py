@@ -0,0 +1,196 @@
+import boa
+import pytest
+from boa.contracts.abi.abi_contract import ABIContractFactory
+
+from src import raac_vault
+from tests.utils.abis import ERC20_ABI
+from tests.utils.constants import PERMIT2
+from tests.utils.signatures import (
+    new_signer,
+    sign_erc2612_permit,
+    sign_permit2_transfer,
+)
+
+DEPOSIT_AMOUNT = 1_000 * 10**18
+
+
+@pytest.fixture(scope="function")
+def signer(funded_accounts, pyusd_pool):
+    account = new_signer()
+    with boa.env.prank(funded_accounts[0]):
+        pyusd_pool.transfer(account.address, DEPOSIT_AMOUNT)
+    return account
+
+
+def test_deposit_with_permit(
+    pyusd_vault, pyusd_pool, vault_permit_router, signer
+):
+    vault = raac_vault.at(pyusd_vault[0])
+    deadline = boa.env.evm.patch.timestamp + 3600
+    v, r, s = sign_erc2612_permit(
+        signer,
+        pyusd_pool.DOMAIN_SEPARATOR(),
+        vault_permit_router.address,
+        DEPOSIT_AMOUNT,
+        pyusd_pool.nonces(signer.address),
+        deadline,
+    )
+
+    with boa.env.prank(signer.address):
+        shares = vault_permit_router.deposit_with_permit(
+            vault.address, DEPOSIT_AMOUNT, signer.address, deadline, v, r, s
+        )
+
+    assert shares > 0
+    assert vault.balanceOf(signer.address) == shares
+    assert pyusd_pool.balanceOf(signer.address) == 0
+    assert pyusd_pool.balanceOf(vault_permit_router.address) == 0
+
+
+def test_deposit_with_front_run_permit(
+    pyusd_vault, pyusd_pool, vault_permit_router, signer
+):
+    vault = raac_vault.at(pyusd_vault[0])
+    deadline = boa.env.evm.patch.timestamp + 3600
+    v, r, s = sign_erc2612_permit(
+        signer,
+        pyusd_pool.DOMAIN_SEPARATOR(),
+        vault_permit_router.address,
+        DEPOSIT_AMOUNT,
+        pyusd_pool.nonces(signer.address),
+        deadline,
+    )
+
+    # anyone can submit the permit before the router does
+    pyusd_pool.permit(
+        signer.address,
+        vault_permit_router.address,
+        DEPOSIT_AMOUNT,
+        deadline,
+        v,
+        r,
+        s,
+    )
+
+    with boa.env.prank(signer.address):
+        shares = vault_permit_router.deposit_with_permit(
+            vault.address, DEPOSIT_AMOUNT, signer.address, deadline, v, r, s
+        )
+    assert vault.balanceOf(signer.address) == shares > 0
+
+
+def test_deposit_with_invalid_permit_reverts(
+    pyusd_vault, pyusd_pool, vault_permit_router, signer
+):
+    deadline = boa.env.evm.patch.timestamp + 3600
+    v, r, s = sign_erc2612_permit(
+        signer,
+        pyusd_pool.DOMAIN_SEPARATOR(),
+        vault_permit_router.address,
+        DEPOSIT_AMOUNT - 1,
+        pyusd_pool.nonces(signer.address),
+        deadline,
+    )
+    with boa.env.prank(signer.address):
+        with pytest.raises(Exception, match="Permit failed"):
+            vault_permit_router.deposit_with_permit(
+                pyusd_vault[0],
+                DEPOSIT_AMOUNT,
+                signer.address,
+                deadline,
+                v,
+                r,
+                s,
+            )
+
+
+def test_deposit_with_permit2(
+    pyusd_vault, pyusd_pool, vault_permit_router, signer, accounts
+):
+    vault = raac_vault.at(pyusd_vault[0])
+    receiver = accounts[5]
+    deadline = boa.env.evm.patch.timestamp + 3600
+    nonce = 42
+
+    # one-time Permit2 approval
+    with boa.env.prank(signer.address):
+        pyusd_pool.approve(PERMIT2, 2**256 - 1)
+
+    signature = sign_permit2_transfer(
+        signer,
+        PERMIT2,
+        pyusd_pool.address,
+        DEPOSIT_AMOUNT,
+        vault_permit_router.address,
+        nonce,
+        deadline,
+    )
+    permit = ((pyusd_pool.address, DEPOSIT_AMOUNT), nonce, deadline)
+
+    with boa.env.prank(signer.address):
+        shares = vault_permit_router.deposit_with_permit2(
+            vault.address, permit, signature, receiver
+        )
+
+    assert vault.balanceOf(receiver) == shares > 0
+    assert pyusd_pool.balanceOf(signer.address) == 0
+
+    # signature cannot be replayed
+    with boa.env.prank(signer.address):
+        with pytest.raises(Exception):
+            vault_permit_router.deposit_with_permit2(
+                vault.address, permit, signature, receiver
+            )
+
+
+def test_permit2_signature_bound_to_signer(
+    pyusd_vault, pyusd_pool, vault_permit_router, signer, accounts
+):
+    deadline = boa.env.evm.patch.timestamp + 3600
+    with boa.env.prank(signer.address):
+        pyusd_pool.approve(PERMIT2, 2**256 - 1)
+    signature = sign_permit2_transfer(
+        signer,
+        PERMIT2,
+        pyusd_pool.address,
+        DEPOSIT_AMOUNT,
+        vault_permit_router.address,
+        0,
+        deadline,
+    )
+    permit = ((pyusd_pool.address, DEPOSIT_AMOUNT), 0, deadline)
+
+    # a third party cannot use the signature to deposit to itself
+    with boa.env.prank(accounts[1]):
+        with pytest.raises(Exception):
+            vault_permit_router.deposit_with_permit2(
+                pyusd_vault[0], permit, signature, accounts[1]
+            )
+
+
+def test_permit2_wrong_token_reverts(
+    pyusd_vault, usdc_pool, vault_permit_router, signer
+):
+    permit = ((usdc_pool.address, DEPOSIT_AMOUNT), 0, 2**40)
+    with boa.env.prank(signer.address):
+        with pytest.raises(Exception, match="Wrong token"):
+            vault_permit_router.deposit_with_permit2(
+                pyusd_vault[0], permit, b"\x00" * 65, signer.address
+            )
+
+
+def test_router_rejects_unknown_vault(vault_permit_router, signer):
+    fake_vault = ABIContractFactory("ERC20", ERC20_ABI).at(
+        boa.env.generate_address()
+    )
+    with boa.env.prank(signer.address):
+        with pytest.raises(Exception, match="Vault not factory deployed"):
+            vault_permit_router.deposit_with_permit(
+                fake_vault.address,
+                DEPOSIT_AMOUNT,
+                signer.address,
+                0,
+                0,
+                b"\x00" * 32,
+                b"\x00" * 32,
+            )
@@ -0,0 +1,126 @@
+import boa
+import pytest
+
+from src import raac_vault
+from tests.utils.constants import CRVUSD_POOLS, CRVUSD_TOKEN
+
+ZAP_AMOUNT = 10_000 * 10**18
+
+
+@pytest.mark.parametrize("pool_name", ["pyusd", "usdc", "usdt"])
+def test_zap_in_and_out_crvusd(
+    vault_list,
+    pool_list,
+    vault_zap,
+    funded_accounts,
+    crvusd_token,
+    pool_name,
+):
+    vault = raac_vault.at(vault_list[pool_name][0])
+    pool = pool_list[pool_name]
+    user = funded_accounts[0]
+    crvusd_before = crvusd_token.balanceOf(user)
+    lp_before = pool.balanceOf(user)
+
+    expected_lp = pool.calc_token_amount(
+        [
+            ZAP_AMOUNT if i == CRVUSD_POOLS[pool_name]["crvusd_index"] else 0
+            for i in range(2)
+        ],
+        True,
+    )
+
+    with boa.env.prank(user):
+        crvusd_token.approve(vault_zap.address, ZAP_AMOUNT)
+        shares = vault_zap.zap_in(
+            vault.address, CRVUSD_TOKEN, ZAP_AMOUNT, 0, user
+        )
+
+    assert vault.balanceOf(user) == shares
+    assert vault.convertToAssets(shares) == pytest.approx(
+        expected_lp, rel=1e-6
+    )
+    assert crvusd_token.balanceOf(user) == crvusd_before - ZAP_AMOUNT
+    assert pool.balanceOf(user) == lp_before
+    assert crvusd_token.balanceOf(vault_zap.address) == 0
+    assert pool.balanceOf(vault_zap.address) == 0
+
+    with boa.env.prank(user):
+        vault.approve(vault_zap.address, shares)
+        amount_out = vault_zap.zap_out(
+            vault.address, shares, CRVUSD_TOKEN, 0, user
+        )
+
+    assert vault.balanceOf(user) == 0
+    assert (
+        crvusd_token.balanceOf(user) == crvusd_before - ZAP_AMOUNT + amount_out
+    )
+    assert amount_out == pytest.approx(ZAP_AMOUNT, rel=1e-2)
+    assert pool.balanceOf(vault_zap.address) == 0
+
+
+def test_zap_in_slippage(
+    pyusd_vault, vault_zap, funded_accounts, crvusd_token
+):
+    user = funded_accounts[0]
+    with boa.env.prank(user):
+        crvusd_token.approve(vault_zap.address, ZAP_AMOUNT)
+        with pytest.raises(Exception, match="Slippage"):
+            vault_zap.zap_in(
+                pyusd_vault[0], CRVUSD_TOKEN, ZAP_AMOUNT, 2 * ZAP_AMOUNT, user
+            )
+
+
+def test_zap_out_slippage(
+    pyusd_vault, vault_zap, funded_accounts, crvusd_token
+):
+    vault = raac_vault.at(pyusd_vault[0])
+    user = funded_accounts[0]
+    with boa.env.prank(user):
+        crvusd_token.approve(vault_zap.address, ZAP_AMOUNT)
+        shares = vault_zap.zap_in(
+            vault.address, CRVUSD_TOKEN, ZAP_AMOUNT, 0, user
+        )
+        vault.approve(vault_zap.address, shares)
+        with pytest.raises(Exception):
+            vault_zap.zap_out(
+                vault.address, shares, CRVUSD_TOKEN, 2 * ZAP_AMOUNT, user
+            )
+
+
+def test_zap_out_requires_share_allowance(
+    pyusd_vault, vault_zap, funded_accounts, crvusd_token
+):
+    user, other = funded_accounts[0], funded_accounts[1]
+    with boa.env.prank(user):
+        crvusd_token.approve(vault_zap.address, ZAP_AMOUNT)
+        shares = vault_zap.zap_in(
+            pyusd_vault[0], CRVUSD_TOKEN, ZAP_AMOUNT, 0, user
+        )
+
+    # shares are redeemed from the caller, not from an arbitrary owner
+    with boa.env.prank(other):
+        with pytest.raises(Exception):
+            vault_zap.zap_out(pyusd_vault[0], shares, CRVUSD_TOKEN, 0, other)
+
+
+def test_zap_rejects_coin_not_in_pool(
+    pyusd_vault, vault_zap, funded_accounts, crv_token
+):
+    with boa.env.prank(funded_accounts[0]):
+        with pytest.raises(Exception, match="Coin not in pool"):
+            vault_zap.zap_in(
+                pyusd_vault[0], crv_token.address, 1, 0, funded_accounts[0]
+            )
+
+
+def test_zap_rejects_unknown_vault(vault_zap, funded_accounts):
+    with boa.env.prank(funded_accounts[0]):
+        with pytest.raises(Exception, match="Vault not factory deployed"):
+            vault_zap.zap_in(
+                boa.env.generate_address(),
+                CRVUSD_TOKEN,
+                1,
+                0,
+                funded_accounts[0],
+            )
@@ -0,0 +1,127 @@
+import boa
+import pytest
+from boa.contracts.abi.abi_contract import ABIContractFactory
+from boa.util.abi import abi_encode
+from eth_utils import function_signature_to_4byte_selector
+
+from src import raac_vault, strategy
+from tests.conftest import PYUSD_POOL_NAME
+from tests.utils.abis import ERC20_ABI
+from tests.utils.constants import CRVUSD_POOLS
+
+
+@pytest.fixture(scope="function")
+def tracked_vault(
+    deploy_permissioned_vault_for_pool,
+    add_liquidity_ng_hook,
+    pool_list,
+    funded_accounts,
+    get_base_reward_pool,
+):
+    vault_addr, strategy_addr, _ = deploy_permissioned_vault_for_pool(
+        PYUSD_POOL_NAME, target_hook=add_liquidity_ng_hook.address
+    )
+    vault_contract = raac_vault.at(vault_addr)
+    user = funded_accounts[0]
+    with boa.env.prank(user):
+        pool_list[PYUSD_POOL_NAME].approve(vault_addr, 10**20)
+        vault_contract.deposit(10**18, user)
+    strategy_contract = strategy.at(strategy_addr)
+    reward_pool = get_base_reward_pool(strategy_contract.rewards_contract())
+    return vault_contract, strategy_contract, reward_pool
+
+
+def test_set_asset_tracking(tracked_vault, strategy_manager, harvest_manager):
+    vault_contract, strategy_contract, reward_pool = tracked_vault
+    with boa.env.prank(harvest_manager):
+        with boa.reverts("Manager only"):
+            strategy_contract.set_asset_tracking(True)
+    with boa.env.prank(strategy_manager):
+        with boa.reverts("Tracking disabled"):
+            strategy_contract.reconcile_assets()
+        strategy_contract.set_asset_tracking(True)
+
+    assert strategy_contract.asset_tracking()
+    assert strategy_contract.tracked_assets() == reward_pool.balanceOf(
+        strategy_contract.address
+    )
+    assert vault_contract.totalAssets() == strategy_contract.tracked_assets()
+
+    with boa.env.prank(strategy_manager):
+        strategy_contract.set_asset_tracking(False)
+    assert not strategy_contract.asset_tracking()
+
+
+def test_tracked_assets_follow_vault_flows(
+    tracked_vault,
+    strategy_manager,
+    harvest_manager,
+    funded_accounts,
+    pool_list,
+    crvusd_token,
+):
+    vault_contract, strategy_contract, reward_pool = tracked_vault
+    user = funded_accounts[0]
+    with boa.env.prank(strategy_manager):
+        strategy_contract.set_asset_tracking(True)
+
+    with boa.env.prank(user):
+        vault_contract.deposit(5 * 10**18, user)
+        vault_contract.withdraw(2 * 10**18, user, user)
+    assert strategy_contract.tracked_assets() == reward_pool.balanceOf(
+        strategy_contract.address
+    )
+
+    boa.env.time_travel(seconds=86400 * 7)
+    target_hook_calldata = function_signature_to_4byte_selector(
+        "add_liquidity(address,address,uint256,uint256)"
+    ) + abi_encode(
+        "(address,address,uint256,uint256)",
+        [
+            pool_list[PYUSD_POOL_NAME].address,
+            crvusd_token.address,
+            CRVUSD_POOLS[PYUSD_POOL_NAME]["crvusd_index"],
+            0,
+        ],
+    )
+    assets_before = strategy_contract.total_assets()
+    with boa.env.prank(harvest_manager):
+        vault_contract.harvest(
+            harvest_manager, 0, [], b"", target_hook_calldata, b""
+        )
+    assert strategy_contract.total_assets() > assets_before
+    assert strategy_contract.tracked_assets() == reward_pool.balanceOf(
+        strategy_contract.address
+    )
+
+
+def test_reconcile_assets(
+    tracked_vault,
+    strategy_manager,
+    funded_accounts,
+    pool_list,
+    convex_booster,
+):
+    vault_contract, strategy_contract, reward_pool = tracked_vault
+    with boa.env.prank(strategy_manager):
+        strategy_contract.set_asset_tracking(True)
+    tracked = strategy_contract.tracked_assets()
+
+    # LP staked on behalf of the strategy is ignored until reconciled
+    donor = funded_accounts[1]
+    pool = pool_list[PYUSD_POOL_NAME]
+    booster_id = strategy_contract.booster_id()
+    deposit_token = ABIContractFactory("ERC20", ERC20_ABI).at(
+        convex_booster.poolInfo(booster_id)[1]
+    )
+    with boa.env.prank(donor):
+        pool.approve(convex_booster.address, 10**18)
+        convex_booster.deposit(booster_id, 10**18, False)
+        deposit_token.approve(reward_pool.address, 10**18)
+        reward_pool.stakeFor(strategy_contract.address, 10**18)
+
+    assert strategy_contract.total_assets() == tracked
+    assert vault_contract.totalAssets() == tracked
+    with boa.env.prank(strategy_manager):
+        strategy_contract.reconcile_assets()
+    assert strategy_contract.total_assets() == tracked + 10**18
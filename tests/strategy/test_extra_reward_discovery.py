@@ -0,0 +1,105 @@
+import boa
+from boa.util.abi import abi_encode
+
+from src import raac_vault, strategy
+from src.harvesters import cow_harvester
+from tests.utils.constants import FXN_TOKEN, RSUP_TOKEN
+
+
+def test_refresh_discovers_stash_rewards(
+    test_cow_vault, set_up_extra_rewards_for_pool, strategy_manager
+):
+    _, strategy_addr, _ = test_cow_vault
+    strategy_contract = strategy.at(strategy_addr)
+    assert strategy_contract.extra_rewards() == []
+
+    set_up_extra_rewards_for_pool()
+    with boa.env.prank(boa.env.generate_address()):
+        with boa.reverts("Manager only"):
+            strategy_contract.refresh_extra_rewards()
+    with boa.env.prank(strategy_manager):
+        strategy_contract.refresh_extra_rewards()
+
+    # stash token wrappers are resolved to the tokens paid out
+    extra_rewards = strategy_contract.extra_rewards()
+    assert RSUP_TOKEN in extra_rewards
+    assert FXN_TOKEN in extra_rewards
+    assert len(set(extra_rewards)) == len(extra_rewards)
+
+
+def _cow_harvest(vault_contract, harvest_manager, token_count):
+    with boa.env.prank(harvest_manager):
+        vault_contract.harvest(
+            harvest_manager,
+            0,
+            [],
+            b"",
+            b"",
+            abi_encode("(uint256[])", [[10**18] * token_count]),
+        )
+
+
+def test_empty_list_ignores_disabled_cache(
+    test_cow_vault,
+    set_up_extra_rewards_for_pool,
+    funded_accounts,
+    crvusd_pool,
+    rsup_token,
+    harvest_manager,
+    strategy_manager,
+):
+    vault_addr, strategy_addr, harvester_addr = test_cow_vault
+    vault_contract = raac_vault.at(vault_addr)
+    strategy_contract = strategy.at(strategy_addr)
+
+    user = funded_accounts[0]
+    with boa.env.prank(user):
+        crvusd_pool.approve(vault_addr, 10**18)
+        vault_contract.deposit(10**18, user)
+    set_up_extra_rewards_for_pool()
+    with boa.env.prank(strategy_manager):
+        strategy_contract.refresh_extra_rewards()
+    assert len(strategy_contract.extra_rewards()) > 0
+    assert not strategy_contract.extra_reward_cache_enabled()
+
+    # an empty list still means CRV and CVX only
+    boa.env.time_travel(seconds=86400 * 7)
+    _cow_harvest(vault_contract, harvest_manager, 2)
+    assert rsup_token.balanceOf(harvester_addr) == 0
+
+
+def test_harvest_uses_cached_extra_rewards(
+    test_cow_vault,
+    set_up_extra_rewards_for_pool,
+    funded_accounts,
+    crvusd_pool,
+    rsup_token,
+    harvest_manager,
+    strategy_manager,
+):
+    vault_addr, strategy_addr, harvester_addr = test_cow_vault
+    vault_contract = raac_vault.at(vault_addr)
+    strategy_contract = strategy.at(strategy_addr)
+    harvester_contract = cow_harvester.at(harvester_addr)
+
+    user = funded_accounts[0]
+    with boa.env.prank(user):
+        crvusd_pool.approve(vault_addr, 10**18)
+        vault_contract.deposit(10**18, user)
+    set_up_extra_rewards_for_pool()
+    with boa.env.prank(harvest_manager):
+        with boa.reverts("Manager only"):
+            strategy_contract.set_extra_reward_cache(True)
+    with boa.env.prank(strategy_manager):
+        strategy_contract.refresh_extra_rewards()
+        strategy_contract.set_extra_reward_cache(True)
+    extra_rewards = strategy_contract.extra_rewards()
+
+    boa.env.time_travel(seconds=86400 * 7)
+    # no extra reward list in the calldata, one buy amount per cached token
+    _cow_harvest(vault_contract, harvest_manager, 2 + len(extra_rewards))
+
+    assert rsup_token.balanceOf(harvester_addr) > 0
+    for token in extra_rewards:
+        exists, _ = harvester_contract.get_order_info(token)
+        assert exists
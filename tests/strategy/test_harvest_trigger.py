@@ -0,0 +1,119 @@
+import boa
+from boa.util.abi import abi_encode
+from eth_utils import function_signature_to_4byte_selector
+
+from src import raac_vault, strategy
+from tests.conftest import PYUSD_POOL_NAME
+from tests.utils.constants import CRVUSD_POOLS
+from tests.utils.harvest_calculations import approx, calc_gross_harvest_amount
+
+GWEI = 10**9
+
+
+def _deposit(vault_addr, pool, user):
+    amount = pool.balanceOf(user) // 2
+    with boa.env.prank(user):
+        pool.approve(vault_addr, amount)
+        raac_vault.at(vault_addr).deposit(amount, user)
+
+
+def _harvest(vault_addr, pool, crvusd_token, harvest_manager):
+    target_hook_calldata = function_signature_to_4byte_selector(
+        "add_liquidity(address,address,uint256,uint256)"
+    ) + abi_encode(
+        "(address,address,uint256,uint256)",
+        [
+            pool.address,
+            crvusd_token.address,
+            CRVUSD_POOLS[PYUSD_POOL_NAME]["crvusd_index"],
+            0,
+        ],
+    )
+    with boa.env.prank(harvest_manager.address):
+        raac_vault.at(vault_addr).harvest(
+            harvest_manager.address, 0, [], b"", target_hook_calldata, b""
+        )
+
+
+def test_harvest_trigger_empty_vault(test_permissioned_vault):
+    _, strategy_addr, _ = test_permissioned_vault
+    strategy_contract = strategy.at(strategy_addr)
+
+    assert strategy_contract.pending_rewards_value() == 0
+    assert not strategy_contract.harvest_trigger(0)
+
+
+def test_harvest_trigger_gas_price(
+    test_permissioned_vault, pyusd_pool, funded_accounts, strategy_manager
+):
+    vault_addr, strategy_addr, _ = test_permissioned_vault
+    strategy_contract = strategy.at(strategy_addr)
+    _deposit(vault_addr, pyusd_pool, funded_accounts[0])
+
+    # only the gas price condition
+    with boa.env.prank(strategy_manager.address):
+        raac_vault.at(vault_addr).set_harvest_trigger(1_000_000, 0)
+
+    # no rewards accrued yet in the block of the deposit
+    assert not strategy_contract.harvest_trigger(0)
+
+    boa.env.time_travel(seconds=86400 * 3)
+
+    assert approx(
+        strategy_contract.pending_rewards_value(),
+        calc_gross_harvest_amount(
+            strategy_addr, strategy_contract.rewards_contract()
+        ),
+        1e-2,
+    )
+    assert strategy_contract.harvest_trigger(0)
+    assert not strategy_contract.harvest_trigger(10**6 * GWEI)
+
+
+def test_harvest_trigger_max_interval(
+    test_permissioned_vault,
+    pyusd_pool,
+    crvusd_token,
+    funded_accounts,
+    strategy_manager,
+    harvest_manager,
+):
+    vault_addr, strategy_addr, _ = test_permissioned_vault
+    vault_contract = raac_vault.at(vault_addr)
+    strategy_contract = strategy.at(strategy_addr)
+    _deposit(vault_addr, pyusd_pool, funded_accounts[0])
+
+    with boa.env.prank(strategy_manager.address):
+        vault_contract.set_harvest_trigger(1_500_000, 86400)
+
+    assert strategy_contract.harvest_gas_estimate() == 1_500_000
+    assert strategy_contract.max_harvest_interval() == 86400
+
+    # a vault that was never harvested is always due once rewards accrue
+    boa.env.time_travel(seconds=3600)
+    assert strategy_contract.harvest_trigger(10**6 * GWEI)
+
+    _harvest(vault_addr, pyusd_pool, crvusd_token, harvest_manager)
+    assert vault_contract.last_harvest() == boa.env.evm.patch.timestamp
+
+    boa.env.time_travel(seconds=3600)
+    assert not strategy_contract.harvest_trigger(10**6 * GWEI)
+
+    boa.env.time_travel(seconds=86400)
+    assert strategy_contract.harvest_trigger(10**6 * GWEI)
+
+    with boa.env.prank(strategy_manager.address):
+        vault_contract.set_harvest_trigger(1_500_000, 0)
+    assert not strategy_contract.harvest_trigger(10**6 * GWEI)
+
+
+def test_set_harvest_trigger_permissions(test_permissioned_vault, accounts):
+    vault_addr, strategy_addr, _ = test_permissioned_vault
+
+    with boa.env.prank(accounts[0]):
+        with boa.reverts():
+            raac_vault.at(vault_addr).set_harvest_trigger(1, 1)
+
+    with boa.env.prank(accounts[0]):
+        with boa.reverts("Vault only"):
+            strategy.at(strategy_addr).set_harvest_trigger(1, 1)
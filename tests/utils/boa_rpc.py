@@ -0,0 +1,26 @@
+"""JSON-RPC stand-in serving the off-chain scripts from the boa fork"""
+
+import boa
+
+from script.watch_tower import CallReverted
+
+
+class BoaRpc:
+    def __init__(self, gas_cap=None):
+        self.calls = 0
+        # eth_call gas cap of the node, e.g. 50M on geth
+        self.gas_cap = gas_cap
+        self.max_gas_used = 0
+
+    def eth_call(self, to, data):
+        self.calls += 1
+        computation = boa.env.execute_code(
+            to_address=to, data=data, gas=self.gas_cap, simulate=True
+        )
+        self.max_gas_used = max(self.max_gas_used, computation.get_gas_used())
+        if computation.is_error:
+            raise CallReverted(computation.output)
+        return computation.output
+
+    def block_timestamp(self):
+        return boa.env.evm.patch.timestamp
@@ -55,3 +55,4 @@ MAX_PLATFORM_FEE = 3000
 MAX_CALLER_FEE = 1000
 
 POOL_MANAGER = "0x5F47010F230cE1568BeA53a06eBAF528D05c5c1B"
+PERMIT2 = "0x000000000022D473030F116dDEE9F6B43aC78BA3"
@@ -0,0 +1,120 @@
+"""
+Local stand-in for the CoW Protocol settlement of harvester orders.
+
+Orders are read with `getTradeableOrder` and checked through the harvester's
+`isValidSignature` exactly as GPv2Settlement would (called by the settlement
+with the EIP-712 order hash). Sell tokens are pulled with the allowance
+granted to the VAULT_RELAYER and crvUSD is paid to the order receiver at a
+configurable price, so CoW harvest cycles can run without solvers.
+"""
+
+from dataclasses import dataclass
+
+import boa
+from boa.contracts.abi.abi_contract import ABIContractFactory
+from boa.contracts.base_evm_contract import BoaError
+
+from script.gpv2 import (
+    encode_conditional_order_signature,
+    gpv2_domain_separator,
+    gpv2_order_hash,
+)
+from tests.utils.abis import ERC20_ABI
+
+GPV2_SETTLEMENT = "0x9008D19f58AAbD9eD0D60971565AA8510560ab41"
+VAULT_RELAYER = "0xC92E8bdf79f0507f65a392b0ab4667716BFE0110"
+ERC1271_MAGIC_VALUE = bytes.fromhex("1626ba7e")
+
+
+@dataclass
+class Fill:
+    order_hash: bytes
+    sell_token: str
+    sell_amount: int
+    buy_amount: int
+
+
+class CowSettlementSimulator:
+    """
+    Settles harvester orders at `prices[sell_token]` (crvUSD per sell token,
+    18 decimals). `mint_buy_token(receiver, amount)` pays the crvUSD, e.g.
+    with the crvUSD minter.
+    """
+
+    def __init__(self, mint_buy_token, prices: dict[str, int]):
+        self.mint_buy_token = mint_buy_token
+        self.prices = prices
+        self.domain_separator = gpv2_domain_separator(
+            GPV2_SETTLEMENT, boa.env.evm.patch.chain_id
+        )
+        # amount of sell token filled per order hash, as in GPv2Settlement
+        self.filled_amount: dict[bytes, int] = {}
+        self.fills: list[Fill] = []
+
+    def tradeable_order(self, harvester, sell_token: str):
+        """The order a watch-tower would post, None if there is none"""
+        try:
+            return harvester.getTradeableOrder(
+                harvester.address,
+                GPV2_SETTLEMENT,
+                b"\x00" * 32,
+                bytes.fromhex(str(sell_token)[2:]),
+                b"",
+            )
+        except BoaError:
+            return None
+
+    def settle(self, harvester, sell_token: str, fill_ratio: float = 1.0):
+        """
+        Fill `fill_ratio` of the remaining amount of the current order of
+        `sell_token`. Returns the Fill, or None when there is no order, it
+        has expired, is already filled or its limit price is not met.
+        """
+        order = self.tradeable_order(harvester, sell_token)
+        if order is None or order.validTo < boa.env.evm.patch.timestamp:
+            return None
+
+        order_hash = gpv2_order_hash(order, self.domain_separator)
+        with boa.env.prank(GPV2_SETTLEMENT):
+            assert (
+                harvester.isValidSignature(
+                    order_hash,
+                    encode_conditional_order_signature(
+                        order,
+                        harvester.address,
+                        bytes.fromhex(str(sell_token)[2:]),
+                    ),
+                )
+                == ERC1271_MAGIC_VALUE
+            ), "Invalid signature"
+
+        remaining = order.sellAmount - self.filled_amount.get(order_hash, 0)
+        sell_amount = int(remaining * fill_ratio)
+        if not order.partiallyFillable and sell_amount != order.sellAmount:
+            return None
+        if sell_amount == 0:
+            return None
+
+        buy_amount = sell_amount * self.prices[sell_token] // 10**18
+        # limit price: buy_amount / sell_amount >= order.buyAmount / order.sellAmount
+        if buy_amount * order.sellAmount < order.buyAmount * sell_amount:
+            return None
+
+        token = ABIContractFactory("ERC20", ERC20_ABI).at(sell_token)
+        with boa.env.prank(VAULT_RELAYER):
+            token.transferFrom(harvester.address, GPV2_SETTLEMENT, sell_amount)
+        self.mint_buy_token(order.receiver, buy_amount)
+
+        self.filled_amount[order_hash] = (
+            self.filled_amount.get(order_hash, 0) + sell_amount
+        )
+        fill = Fill(order_hash, sell_token, sell_amount, buy_amount)
+        self.fills.append(fill)
+        return fill
+
+    def settle_all(self, harvester, sell_tokens, fill_ratio: float = 1.0):
+        """Settle the current order of every token, returns the fills"""
+        fills = [
+            self.settle(harvester, token, fill_ratio) for token in sell_tokens
+        ]
+        return [fill for fill in fills if fill is not None]
@@ -0,0 +1,279 @@
+import json
+import os
+import statistics
+from dataclasses import asdict, dataclass
+
+import boa
+from boa.contracts.vyper.ast_utils import get_fn_ancestor_from_node
+from boa.vm.gas_meters import ProfilingGasMeter
+from eth_utils import to_checksum_address
+from tabulate import tabulate
+
+# lines beyond this are only written to the JSON report
+TEXT_REPORT_LINES = 100
+SOURCE_WIDTH = 70
+
+
+@dataclass
+class LineStats:
+    contract: str
+    module: str
+    line: int
+    function: str
+    source: str
+    # number of calls that executed the line
+    hits: int = 0
+    # gas spent by the line itself
+    gas: int = 0
+    # gas spent by the calls made on the line
+    call_gas: int = 0
+    # refunds earned by the line, credited at the end of the transaction
+    refund: int = 0
+
+
+def _summary(samples):
+    return {
+        "count": len(samples),
+        "total": sum(samples),
+        "mean": int(statistics.mean(samples)),
+        "median": int(statistics.median(samples)),
+        "min": min(samples),
+        "max": max(samples),
+    }
+
+
+def _relpath(path):
+    try:
+        return os.path.relpath(path)
+    except ValueError:
+        return path
+
+
+class GasReport:
+    """
+    Collects line-level gas profiles of the profiled calls, including every
+    nested call they make, and aggregates them per contract, per external
+    call and per source line across all runs of all scenarios.
+
+    Vyper contracts are grouped by source file, so several vaults deployed
+    from the same blueprint add up to a single entry. Contracts without
+    source (Curve pools, Convex, tokens...) are only reported per call.
+    """
+
+    def __init__(self):
+        self.scenarios = {}
+        # (contract, function) => gas used by each call, nested calls included
+        self.calls = {}
+        # contract => [calls, gas spent in its own code, refunds]
+        self.contracts = {}
+        # (contract, module path, line) => LineStats
+        self.lines = {}
+        self._sources = {}
+
+    def profile(self, scenario, function, *args, **kwargs):
+        """
+        Calls a contract function with line-level gas profiling enabled and
+        records its gas under `scenario`.
+        """
+        with boa.env.gas_meter_class(ProfilingGasMeter):
+            result = function(*args, **kwargs)
+        computation = function.contract._computation
+        self.scenarios.setdefault(scenario, []).append(
+            computation.get_gas_used()
+        )
+        self._record(function.contract, computation)
+        return result
+
+    def _record(self, contract, computation):
+        if getattr(contract, "_can_line_profile", False):
+            name = _relpath(contract.compiler_data.contract_path)
+            fn = contract._get_fn_from_computation(computation)
+            function = fn.name if fn is not None else "<unknown>"
+            self._record_lines(name, contract, computation)
+        else:
+            name, function = self._describe_black_box(contract, computation)
+
+        gas_used = computation.get_gas_used()
+        self.calls.setdefault((name, function), []).append(gas_used)
+        stats = self.contracts.setdefault(name, [0, 0, 0])
+        stats[0] += 1
+        stats[1] += gas_used - sum(
+            child.get_gas_used() for child in computation.children
+        )
+        stats[2] += sum(computation._gas_meter._gas_refunded_of.values())
+
+        for child in computation.children:
+            self._record(
+                boa.env.lookup_contract(child.msg.code_address), child
+            )
+
+    def _record_lines(self, name, contract, computation):
+        gas_meter = computation._gas_meter
+        # calls are recorded at the pc following the call opcode, while
+        # the gas forwarded to them is charged to the call opcode itself
+        call_gas = {}
+        for pc, child in zip(computation._child_pcs, computation.children):
+            call_gas[pc - 1] = call_gas.get(pc - 1, 0) + child.get_gas_used()
+
+        source_map = contract.source_map["pc_raw_ast_map"]
+        node = None
+        seen = set()
+        executed = {}
+        # the gas meter sums the gas of each pc, so every pc is counted once
+        # even when it runs in a loop
+        for pc in computation.code._trace:
+            node = source_map.get(pc, node)
+            if node is None or pc in seen:
+                continue
+            seen.add(pc)
+            stats = self._line_stats(name, node)
+            executed[id(stats)] = stats
+            stats.gas += gas_meter._gas_used_of.get(pc, 0) - call_gas.get(
+                pc, 0
+            )
+            stats.call_gas += call_gas.get(pc, 0)
+            stats.refund += gas_meter._gas_refunded_of.get(pc, 0)
+
+        for stats in executed.values():
+            stats.hits += 1
+
+    def _line_stats(self, name, node):
+        path = node.module_node.resolved_path
+        key = (name, path, node.lineno)
+        if key not in self.lines:
+            if path not in self._sources:
+                self._sources[path] = node.full_source_code.splitlines()
+            fn = get_fn_ancestor_from_node(node)
+            self.lines[key] = LineStats(
+                contract=name,
+                module=_relpath(path),
+                line=node.lineno,
+                function=fn.name if fn is not None else "",
+                source=self._sources[path][node.lineno - 1].strip(),
+            )
+        return self.lines[key]
+
+    @staticmethod
+    def _describe_black_box(contract, computation):
+        address = to_checksum_address(computation.msg.code_address)
+        selector = bytes(computation.msg.data[:4])
+        if contract is None:
+            return address, "0x" + selector.hex()
+        fn = contract.method_id_map.get(selector)
+        function = fn.name if fn is not None else "0x" + selector.hex()
+        return f"{contract.contract_name} ({address})", function
+
+    def to_dict(self):
+        total_gas = sum(gas for _, gas, _ in self.contracts.values()) or 1
+        return {
+            "scenarios": [
+                {"scenario": scenario, **_summary(samples)}
+                for scenario, samples in self.scenarios.items()
+            ],
+            "contracts": sorted(
+                (
+                    {
+                        "contract": name,
+                        "calls": calls,
+                        "gas": gas,
+                        "share": round(gas / total_gas, 4),
+                        "refund": refund,
+                    }
+                    for name, (calls, gas, refund) in self.contracts.items()
+                ),
+                key=lambda row: row["gas"],
+                reverse=True,
+            ),
+            "calls": sorted(
+                (
+                    {"contract": name, "function": function, **_summary(gas)}
+                    for (name, function), gas in self.calls.items()
+                ),
+                key=lambda row: row["total"],
+                reverse=True,
+            ),
+            "lines": sorted(
+                (asdict(stats) for stats in self.lines.values()),
+                key=lambda row: row["gas"],
+                reverse=True,
+            ),
+        }
+
+    def to_text(self):
+        report = self.to_dict()
+        call_columns = ["count", "total", "mean", "median", "min", "max"]
+        sections = [
+            (
+                "Scenarios",
+                ["scenario", *call_columns],
+                [
+                    [row["scenario"], *(row[col] for col in call_columns)]
+                    for row in report["scenarios"]
+                ],
+            ),
+            (
+                "Contracts (gas spent in their own code)",
+                ["contract", "calls", "gas", "share", "refund"],
+                [
+                    [
+                        row["contract"],
+                        row["calls"],
+                        row["gas"],
+                        f"{row['share']:.2%}",
+                        row["refund"],
+                    ]
+                    for row in report["contracts"]
+                ],
+            ),
+            (
+                "External calls (gas including nested calls)",
+                ["contract", "function", *call_columns],
+                [
+                    [
+                        row["contract"],
+                        row["function"],
+                        *(row[col] for col in call_columns),
+                    ]
+                    for row in report["calls"]
+                ],
+            ),
+            (
+                f"Source lines (top {TEXT_REPORT_LINES} by own gas)",
+                [
+                    "location",
+                    "function",
+                    "hits",
+                    "gas",
+                    "call gas",
+                    "refund",
+                    "source",
+                ],
+                [
+                    [
+                        f"{row['module']}:{row['line']}",
+                        row["function"],
+                        row["hits"],
+                        row["gas"],
+                        row["call_gas"],
+                        row["refund"],
+                        row["source"][:SOURCE_WIDTH],
+                    ]
+                    for row in report["lines"][:TEXT_REPORT_LINES]
+                ],
+            ),
+        ]
+        return "\n\n".join(
+            f"--- {title} ---\n"
+            + tabulate(rows, headers=headers, tablefmt="simple")
+            for title, headers, rows in sections
+        )
+
+    def write(self, directory):
+        """
+        Writes gas_report.txt and gas_report.json to `directory`.
+        """
+        os.makedirs(directory, exist_ok=True)
+        with open(os.path.join(directory, "gas_report.json"), "w") as f:
+            json.dump(self.to_dict(), f, indent=2)
+        with open(os.path.join(directory, "gas_report.txt"), "w") as f:
+            f.write(self.to_text() + "\n")
@@ -0,0 +1,87 @@
+from eth_abi import encode
+from eth_account import Account
+from eth_utils import keccak
+
+ERC2612_PERMIT_TYPEHASH = keccak(
+    text="Permit(address owner,address spender,uint256 value,uint256 nonce,uint256 deadline)"
+)
+PERMIT2_TOKEN_PERMISSIONS_TYPEHASH = keccak(
+    text="TokenPermissions(address token,uint256 amount)"
+)
+PERMIT2_TRANSFER_FROM_TYPEHASH = keccak(
+    text="PermitTransferFrom(TokenPermissions permitted,address spender,uint256 nonce,uint256 deadline)"
+    "TokenPermissions(address token,uint256 amount)"
+)
+EIP712_DOMAIN_NO_VERSION_TYPEHASH = keccak(
+    text="EIP712Domain(string name,uint256 chainId,address verifyingContract)"
+)
+
+
+def _sign_digest(account, domain_separator, struct_hash):
+    digest = keccak(b"\x19\x01" + domain_separator + struct_hash)
+    signed = account.unsafe_sign_hash(digest)
+    return signed.v, signed.r.to_bytes(32, "big"), signed.s.to_bytes(32, "big")
+
+
+def new_signer():
+    return Account.create()
+
+
+def sign_erc2612_permit(
+    account, domain_separator, spender, value, nonce, deadline
+):
+    struct_hash = keccak(
+        encode(
+            ["bytes32", "address", "address", "uint256", "uint256", "uint256"],
+            [
+                ERC2612_PERMIT_TYPEHASH,
+                account.address,
+                spender,
+                value,
+                nonce,
+                deadline,
+            ],
+        )
+    )
+    return _sign_digest(account, domain_separator, struct_hash)
+
+
+def permit2_domain_separator(permit2_address, chain_id=1):
+    return keccak(
+        encode(
+            ["bytes32", "bytes32", "uint256", "address"],
+            [
+                EIP712_DOMAIN_NO_VERSION_TYPEHASH,
+                keccak(text="Permit2"),
+                chain_id,
+                permit2_address,
+            ],
+        )
+    )
+
+
+def sign_permit2_transfer(
+    account, permit2_address, token, amount, spender, nonce, deadline
+):
+    permitted_hash = keccak(
+        encode(
+            ["bytes32", "address", "uint256"],
+            [PERMIT2_TOKEN_PERMISSIONS_TYPEHASH, token, amount],
+        )
+    )
+    struct_hash = keccak(
+        encode(
+            ["bytes32", "bytes32", "address", "uint256", "uint256"],
+            [
+                PERMIT2_TRANSFER_FROM_TYPEHASH,
+                permitted_hash,
+                spender,
+                nonce,
+                deadline,
+            ],
+        )
+    )
+    v, r, s = _sign_digest(
+        account, permit2_domain_separator(permit2_address), struct_hash
+    )
+    return r + s + bytes([v])